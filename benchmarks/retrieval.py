@@ -0,0 +1,336 @@
+# benchmarks/retrieval.py
+"""
+Benchmark GracieKnowledgeSystem ingest, update and query performance on synthetic corpora.
+
+    python -m benchmarks.retrieval --sizes 1000 100000 --output results.json
+    python -m benchmarks.retrieval --sizes 1000 100000 --compare previous.json
+
+Topics are generated from a seeded Zipf-distributed vocabulary and
+embedded with the deterministic HashingEncoder, so runs are reproducible
+and need no model download. Each size runs in a fresh process so peak RSS
+and startup time are measured per corpus rather than accumulated.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+import multiprocessing
+import numpy as np
+from gracie.core.embeddings import EmbeddingProcessor
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.core.model_registry import LazySentenceTransformer, registry
+from gracie.models.topic import Topic
+from .stub_encoder import HashingEncoder
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+ENCODER_NAME = "benchmark-hashing-encoder"
+
+# Metrics where a larger value is an improvement, for --compare
+HIGHER_IS_BETTER = ("per_second", "recall")
+
+class SyntheticCorpus:
+    """Seeded topics and queries drawn from a Zipf-distributed vocabulary."""
+    def __init__(self, size: int, vocabulary: int = 50000, words_per_topic: int = 12, seed: int = 0):
+        self.size = size
+        self.words_per_topic = words_per_topic
+        self.seed = seed
+        self.vocabulary = np.array([f"w{i}" for i in range(vocabulary)])
+        ranks = np.arange(1, vocabulary + 1, dtype=np.float64)
+        self.cdf = np.cumsum(1 / ranks)
+        self.cdf /= self.cdf[-1]
+
+    def _words(self, index: int, count: int) -> List[str]:
+        rng = np.random.default_rng((self.seed, 0, index))
+        return list(self.vocabulary[np.searchsorted(self.cdf, rng.random(count))])
+
+    def topic(self, index: int) -> Topic:
+        words = self._words(index, self.words_per_topic)
+        half = self.words_per_topic // 2
+        return Topic(
+            name=f"topic_{index}",
+            definition=" ".join(words[:half]),
+            facts=[" ".join(words[half:])]
+        )
+
+    def topics(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Topic]:
+        for index in range(start, self.size if stop is None else stop):
+            yield self.topic(index)
+
+    def queries(self, count: int) -> List[str]:
+        """Queries made of a few words from randomly chosen topics."""
+        rng = np.random.default_rng((self.seed, 1))
+        queries = []
+        for index in rng.choice(self.size, min(count, self.size), replace=False):
+            words = self._words(int(index), self.words_per_topic)
+            queries.append(" ".join(rng.choice(words, 3, replace=False)))
+        return queries
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(np.mean(samples))
+    }
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def _exact_kth_distance(knowledge: GracieKnowledgeSystem, queries: np.ndarray, k: int, chunk_size: int = 16384) -> np.ndarray:
+    """Brute-force k-th smallest squared L2 distance per query, scanning the matrix in chunks so no copy of it is made."""
+    matrix = knowledge.memory.get_matrix()
+    live = knowledge.memory.get_live_mask()
+    query_norms = (queries ** 2).sum(axis=1, keepdims=True)
+    best = np.full((len(queries), k), np.inf, dtype=np.float32)
+    for start in range(0, len(matrix), chunk_size):
+        chunk = matrix[start:start + chunk_size].astype(np.float32)
+        distances = query_norms - 2 * queries @ chunk.T + (chunk ** 2).sum(axis=1)
+        distances[:, ~live[start:start + chunk_size]] = np.inf
+        distances = np.concatenate([best, distances], axis=1)
+        best = np.partition(distances, k - 1, axis=1)[:, :k]
+    return best.max(axis=1)
+
+def _recall(knowledge: GracieKnowledgeSystem, queries: List[str], k: int) -> Optional[float]:
+    """
+    Fraction of the configured FAISS index's top-k that belongs to the exact top-k.
+
+    A returned row counts when its exact distance is within the true k-th
+    distance, so neighbours tied with the k-th are not penalised for
+    coming back in a different order.
+    """
+    if knowledge.faiss_index is None:
+        return None
+    embeddings = knowledge.encode(queries)
+    k = min(k, knowledge.faiss_index.ntotal)
+    _, rows = knowledge.faiss_index.search(embeddings, k)
+    kth = _exact_kth_distance(knowledge, embeddings, k)
+    matrix = knowledge.memory.get_matrix()
+    found = 0
+    for embedding, returned, limit in zip(embeddings, rows, kth):
+        returned = returned[returned >= 0]
+        distances = ((matrix[returned].astype(np.float32) - embedding) ** 2).sum(axis=1)
+        found += int((distances <= limit + 1e-5).sum())
+    return found / (len(queries) * k)
+
+def _embedding_throughput(corpus: SyntheticCorpus, count: int, batch_size: int) -> Dict[str, float]:
+    """EmbeddingProcessor texts per second, cold (encoder calls) and warm (cache hits)."""
+    processor = EmbeddingProcessor(ENCODER_NAME, cache_size=count)
+    texts = [topic.definition for topic in corpus.topics(0, count)]
+    rates = {}
+    for name in ("cold", "warm"):
+        start = time.perf_counter()
+        for offset in range(0, len(texts), batch_size):
+            processor.encode(texts[offset:offset + batch_size])
+        rates[f"{name}_per_second"] = len(texts) / (time.perf_counter() - start)
+    return rates
+
+def run(
+    size: int,
+    num_queries: int = 1000,
+    k: int = 10,
+    batch_size: int = 2048,
+    index_type: str = "flat",
+    dimension: int = 384,
+    updates: int = 200,
+    seed: int = 0
+) -> Dict:
+    """Benchmark one corpus size and return its metrics."""
+    encoder = HashingEncoder(dimension)
+    registry.get(LazySentenceTransformer(ENCODER_NAME).key, lambda: encoder)
+    corpus = SyntheticCorpus(size, seed=seed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = KnowledgeConfig(
+            db_path=os.path.join(tmp_dir, "bench.db"),
+            embedding_model=ENCODER_NAME,
+            index_type=index_type,
+            max_contexts=k,
+            index_autosave_interval=max(size, 10000)
+        )
+
+        start = time.perf_counter()
+        knowledge = GracieKnowledgeSystem(config, embedding_model=encoder)
+        startup_empty = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ingested = knowledge.add_topics(corpus.topics(), batch_size=batch_size)
+        ingest_seconds = time.perf_counter() - start
+
+        extra = corpus.topics(size, size + min(updates, 1000))
+        start = time.perf_counter()
+        singles = sum(knowledge.add_topic(topic) for topic in extra)
+        single_seconds = time.perf_counter() - start
+
+        rng = np.random.default_rng(seed)
+        update_latencies = []
+        for index in rng.choice(size, min(updates, size), replace=False):
+            topic = knowledge.db.get_topics_by_ids([ingested.added[index]])[0]
+            topic.definition = f"revised {topic.definition}"
+            start = time.perf_counter()
+            knowledge.update_topic(topic)
+            update_latencies.append((time.perf_counter() - start) * 1000)
+
+        queries = corpus.queries(num_queries)
+        knowledge.get_relevant_knowledge(queries[0])
+        query_latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            knowledge.get_relevant_knowledge(query, top_k=k)
+            query_latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        knowledge.get_relevant_knowledge_batch(queries, top_k=k)
+        batch_seconds = time.perf_counter() - start
+
+        recall = _recall(knowledge, queries, k)
+        knowledge.save_index()
+        knowledge.close()
+
+        start = time.perf_counter()
+        restarted = GracieKnowledgeSystem(config, embedding_model=encoder)
+        startup_restart = time.perf_counter() - start
+        start = time.perf_counter()
+        restarted.get_relevant_knowledge(queries[0], top_k=k)
+        first_query = time.perf_counter() - start
+        restarted.close()
+
+    return {
+        "size": size,
+        "index_type": index_type,
+        "dimension": dimension,
+        "k": k,
+        "ingest": {
+            "topics": len(ingested.added),
+            "failed": len(ingested.failed),
+            "batch_per_second": len(ingested.added) / ingest_seconds,
+            "single_per_second": singles / single_seconds if singles else None
+        },
+        "update": _latency(update_latencies) if update_latencies else None,
+        "query": {
+            **_latency(query_latencies),
+            "batch_per_second": len(queries) / batch_seconds,
+            f"recall_at_{k}": recall
+        },
+        "embedding": _embedding_throughput(corpus, min(size, 10000), batch_size=256),
+        "startup": {
+            "empty_seconds": startup_empty,
+            "restart_seconds": startup_restart,
+            "first_query_seconds": first_query
+        },
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+def _metadata() -> Dict:
+    import faiss
+    from importlib import metadata
+    try:
+        version = metadata.version("gracie")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "gracie_version": version,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", None),
+        "cpu_count": os.cpu_count()
+    }
+
+def _flatten(result: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def compare(previous: Dict, current: Dict, tolerance: float = 0.1) -> List[str]:
+    """
+    Lines describing metrics that moved by more than tolerance between two result files.
+
+    Sizes are matched by corpus size and index type; a line is marked
+    REGRESSION when the change is in the unfavourable direction.
+    """
+    baseline = {(result["size"], result["index_type"]): result for result in previous["results"]}
+    lines = []
+    for result in current["results"]:
+        before = baseline.get((result["size"], result["index_type"]))
+        if before is None:
+            continue
+        old, new = _flatten(before), _flatten(result)
+        for name, value in new.items():
+            if name in ("size", "k", "dimension") or not old.get(name):
+                continue
+            change = (value - old[name]) / abs(old[name])
+            if abs(change) <= tolerance:
+                continue
+            better = change > 0 if any(marker in name for marker in HIGHER_IS_BETTER) else change < 0
+            lines.append(
+                f"{'improved  ' if better else 'REGRESSION'} {result['size']:>9} {name}: "
+                f"{old[name]:.4g} -> {value:.4g} ({change:+.1%})"
+            )
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=2048)
+    parser.add_argument("--index-type", default="flat")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier result file to report changes against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change reported by --compare")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        # A fresh interpreter per size keeps peak RSS and startup independent of earlier runs
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(
+                run, size, args.queries, args.k, args.batch_size, args.index_type,
+                args.dimension, args.updates, args.seed
+            ).result()
+        results.append(result)
+        print(
+            f"{size:>9} topics  ingest {result['ingest']['batch_per_second']:.0f}/s  "
+            f"query p50 {result['query']['p50_ms']:.2f} / p95 {result['query']['p95_ms']:.2f} / "
+            f"p99 {result['query']['p99_ms']:.2f} ms  "
+            f"recall@{args.k} {result['query'][f'recall_at_{args.k}']}  "
+            f"rss {result['peak_rss_mb']:.0f} MB  restart {result['startup']['restart_seconds']:.2f} s"
+        )
+
+    report = {"meta": {**_metadata(), "arguments": vars(args)}, "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        for line in compare(previous, report, args.tolerance) or ["No changes beyond tolerance"]:
+            print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# benchmarks/stub_encoder.py
+import hashlib
+from typing import List, Union
+import numpy as np
+
+class HashingEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer.
+
+    Hashes each token into a fixed-size bag-of-words vector, so benchmarks
+    run without downloading a model while similar texts still land close
+    together.
+    """
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in str(text).lower().split():
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                embeddings[row, int.from_bytes(digest, "little") % self.dimension] += 1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.maximum(norms, 1e-12)
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,77 @@
+# benchmarks/update_latency.py
+"""
+Measure GracieKnowledgeSystem.update_topic and delete_topic latency as the index grows.
+
+    python -m benchmarks.update_latency --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+import numpy as np
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.models.topic import Topic
+from .stub_encoder import HashingEncoder
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95))
+    }
+
+def run(size: int, operations: int, index_type: str) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        knowledge = GracieKnowledgeSystem(
+            KnowledgeConfig(db_path=os.path.join(tmp_dir, "bench.db"), index_type=index_type, persist_index=False),
+            embedding_model=HashingEncoder()
+        )
+        topics = [
+            Topic(name=f"topic_{i}", definition=f"topic {i} about subject {i % 997}", facts=[])
+            for i in range(size)
+        ]
+        knowledge.add_topics(topics, batch_size=2048)
+
+        rng = random.Random(0)
+        sample = rng.sample(topics, min(operations, size))
+        timings = {"update_definition": [], "update_confidence": [], "delete": []}
+        for topic in sample:
+            topic.definition = f"revised {topic.definition}"
+            start = time.perf_counter()
+            knowledge.update_topic(topic)
+            timings["update_definition"].append((time.perf_counter() - start) * 1000)
+
+            topic.confidence = 0.9
+            start = time.perf_counter()
+            knowledge.update_topic(topic)
+            timings["update_confidence"].append((time.perf_counter() - start) * 1000)
+
+        for topic in sample[:max(1, len(sample) // 10)]:
+            start = time.perf_counter()
+            knowledge.delete_topic(topic.id)
+            timings["delete"].append((time.perf_counter() - start) * 1000)
+
+        return {"size": size, "index_type": index_type, **{
+            name: _percentiles(samples) for name, samples in timings.items()
+        }}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--index-type", default="flat")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        result = run(size, args.operations, args.index_type)
+        print(
+            f"{size:>9} topics  "
+            + "  ".join(
+                f"{name}: p50 {stats['p50_ms']:.2f} ms / p95 {stats['p95_ms']:.2f} ms"
+                for name, stats in result.items() if isinstance(stats, dict)
+            )
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,587 @@
 # gracie/core/database.py
+import ast
+import hashlib
+import json
+import re
 import sqlite3
-from typing import List, Optional
-from ..models.topic import Topic
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from ..models.topic import DEFAULT_NAMESPACE, Topic
+from ..utils.logger import setup_logger
+
+# Stay under SQLite's default limit of 999 bound parameters per statement
+MAX_PARAMS = 900
+
+TOPIC_COLUMNS = "id, name, definition, facts, confidence, namespace"
+
+# Filterable attributes of a topic; created_at is stored as UTC text by SQLite
+ATTRIBUTE_COLUMNS = (
+    "id, namespace, confidence, CAST(strftime('%s', created_at) AS REAL), "
+    "COALESCE(updated_at, CAST(strftime('%s', created_at) AS REAL))"
+)
+
+# Full-text index over topics, kept in sync by triggers on the topics table
+FTS_SCHEMA = (
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS topics_fts USING fts5(
+        name, definition, facts,
+        content='topics', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS topics_fts_insert AFTER INSERT ON topics BEGIN
+        INSERT INTO topics_fts (rowid, name, definition, facts)
+        VALUES (new.rowid, new.name, new.definition, new.facts);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS topics_fts_delete AFTER DELETE ON topics BEGIN
+        INSERT INTO topics_fts (topics_fts, rowid, name, definition, facts)
+        VALUES ('delete', old.rowid, old.name, old.definition, old.facts);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS topics_fts_update AFTER UPDATE OF name, definition, facts ON topics BEGIN
+        INSERT INTO topics_fts (topics_fts, rowid, name, definition, facts)
+        VALUES ('delete', old.rowid, old.name, old.definition, old.facts);
+        INSERT INTO topics_fts (rowid, name, definition, facts)
+        VALUES (new.rowid, new.name, new.definition, new.facts);
+    END'''
+)
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Function words left out of lexical queries; matching them says nothing about relevance
+STOPWORDS = frozenset('''
+a about above after again against all am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+him his how i if in into is it its just me more most my no nor not of off on once only or other our out over own
+same she should so some such than that the their them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would you your
+'''.split())
+
+def query_terms(text: str) -> List[str]:
+    """Distinct lowercased, diacritic-free tokens of text, stopwords removed, as FTS5 matches them"""
+    text = "".join(
+        char for char in unicodedata.normalize("NFKD", text.lower()) if not unicodedata.combining(char)
+    )
+    return list(dict.fromkeys(token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS))
+
+def definition_hash(definition: str) -> str:
+    """Short digest of the text a topic is embedded from"""
+    return hashlib.blake2b((definition or "").encode("utf-8"), digest_size=8).hexdigest()
 
 class DatabaseManager:
-    """Manages SQLite database operations"""
+    """
+    Manages SQLite database operations
+
+    Connections are opened once per thread and reused, so SQLite's
+    prepared-statement cache stays warm. File databases run in WAL mode,
+    letting readers proceed while a writer commits. An in-memory database
+    exists only inside its connection, so it is shared by all threads
+    behind a lock.
+    """
+    PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=5000"
+    )
+
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.in_memory = db_path == ":memory:"
+        self._local = threading.local()
+        self._shared_lock = threading.RLock()
+        self._shared_conn: Optional[sqlite3.Connection] = None
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.fts_enabled = False
+        self.logger = setup_logger('GracieDatabase')
         self._initialize_db()
-        
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        if not self.in_memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self.in_memory:
+            if self._shared_conn is None:
+                self._shared_conn = self._connect()
+            return self._shared_conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's connection inside a transaction."""
+        if self.in_memory:
+            with self._shared_lock:
+                conn = self._get_connection()
+                with conn:
+                    yield conn
+        else:
+            conn = self._get_connection()
+            with conn:
+                yield conn
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._shared_conn = None
+        self._local = threading.local()
+
     def _initialize_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS topics (
                     id TEXT PRIMARY KEY,
                     name TEXT UNIQUE,
                     definition TEXT,
                     facts TEXT,
                     confidence REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at REAL,
+                    embedding BLOB,
+                    namespace TEXT NOT NULL DEFAULT '{DEFAULT_NAMESPACE}',
+                    definition_hash TEXT
                 )
             ''')
-            # Add other necessary tables
-            
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(topics)")}
+            if "updated_at" not in columns:
+                cursor.execute("ALTER TABLE topics ADD COLUMN updated_at REAL")
+            if "embedding" not in columns:
+                cursor.execute("ALTER TABLE topics ADD COLUMN embedding BLOB")
+            if "namespace" not in columns:
+                cursor.execute(f"ALTER TABLE topics ADD COLUMN namespace TEXT NOT NULL DEFAULT '{DEFAULT_NAMESPACE}'")
+            if "definition_hash" not in columns:
+                cursor.execute("ALTER TABLE topics ADD COLUMN definition_hash TEXT")
+                rows = cursor.execute("SELECT id, definition FROM topics").fetchall()
+                cursor.executemany(
+                    "UPDATE topics SET definition_hash = ? WHERE id = ?",
+                    [(definition_hash(definition), topic_id) for topic_id, definition in rows]
+                )
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS interactions (
+                    id TEXT PRIMARY KEY,
+                    agent TEXT,
+                    user_input TEXT,
+                    agent_response TEXT,
+                    confidence REAL,
+                    timestamp REAL,
+                    embedding BLOB
+                )
+            ''')
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(interactions)")}
+            if "embedding" not in columns:
+                cursor.execute("ALTER TABLE interactions ADD COLUMN embedding BLOB")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_interactions_agent_time ON interactions (agent, timestamp)"
+            )
+            self._migrate_facts(cursor)
+            self._initialize_fts(cursor)
+
+    def _initialize_fts(self, cursor: sqlite3.Cursor):
+        """Create the full-text index, backfilling it for databases that predate it."""
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'topics_fts'"
+        ).fetchone()
+        try:
+            for statement in FTS_SCHEMA:
+                cursor.execute(statement)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; lexical search stays off
+            return
+        if not exists:
+            cursor.execute("INSERT INTO topics_fts (topics_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+
+    def _migrate_facts(self, cursor: sqlite3.Cursor):
+        """Rewrite facts stored as Python list literals into JSON; unparseable values become a single fact."""
+        rows = cursor.execute(
+            "SELECT id, facts FROM topics WHERE facts IS NOT NULL AND NOT json_valid(facts)"
+        ).fetchall()
+        updates = []
+        for topic_id, facts in rows:
+            try:
+                parsed = ast.literal_eval(facts)
+            except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                parsed = None
+            if isinstance(parsed, (list, tuple)):
+                facts = [str(fact) for fact in parsed]
+            else:
+                self.logger.warning(f"Facts of topic {topic_id} are not a list literal, keeping them as one fact")
+                facts = [str(facts)]
+            updates.append((json.dumps(facts), topic_id))
+        if updates:
+            cursor.executemany("UPDATE topics SET facts = ? WHERE id = ?", updates)
+
+    @staticmethod
+    def _row_to_topic(row: Tuple) -> Topic:
+        return Topic(
+            id=row[0],
+            name=row[1],
+            definition=row[2],
+            facts=json.loads(row[3]) if row[3] else [],
+            confidence=row[4],
+            namespace=row[5]
+        )
+
     def store_topic(self, topic: Topic) -> bool:
+        return not self.store_topics([topic])
+
+    def store_topics(
+        self,
+        topics: List[Topic],
+        embeddings: Optional[List[bytes]] = None,
+        timestamps: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> Dict[str, str]:
+        """
+        Insert topics (optionally with full-precision embeddings) in a single transaction, returning failures by topic id
+
+        timestamps gives (created_at, updated_at) epoch seconds for topics
+        keeping their original times, e.g. when restored from a snapshot;
+        other topics are stamped now.
+        """
+        now = time.time()
+        embeddings = embeddings or [None] * len(topics)
+        timestamps = timestamps or {}
+        rows = []
+        for topic, embedding in zip(topics, embeddings):
+            created_at, updated_at = timestamps.get(topic.id, (None, None))
+            rows.append((
+                topic.id, topic.name, topic.definition, json.dumps(topic.facts), topic.confidence,
+                now if updated_at is None else updated_at, embedding, topic.namespace,
+                definition_hash(topic.definition), created_at
+            ))
+        query = (
+            "INSERT INTO topics (id, name, definition, facts, confidence, updated_at, embedding, namespace, definition_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(datetime(?, 'unixepoch'), CURRENT_TIMESTAMP))"
+        )
+        try:
+            with self._transaction() as conn:
+                conn.executemany(query, rows)
+            return {}
+        except sqlite3.IntegrityError:
+            pass
+        except Exception as e:
+            return {topic.id: f"Database error: {e}" for topic in topics}
+
+        # The batch was rolled back; retry row by row to isolate conflicts
+        failures = {}
+        try:
+            with self._transaction() as conn:
+                for row in rows:
+                    try:
+                        conn.execute(query, row)
+                    except sqlite3.Error as e:
+                        failures[row[0]] = f"Database error: {e}"
+        except Exception as e:
+            return {topic.id: f"Database error: {e}" for topic in topics}
+        return failures
+
+    def get_topic_count(self, max_rowid: Optional[int] = None) -> int:
+        """Count stored topics, optionally only those up to a rowid"""
+        with self._transaction() as conn:
+            if max_rowid is None:
+                row = conn.execute("SELECT COUNT(*) FROM topics").fetchone()
+            else:
+                row = conn.execute("SELECT COUNT(*) FROM topics WHERE rowid <= ?", (max_rowid,)).fetchone()
+            return row[0]
+
+    def get_max_rowid(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM topics").fetchone()[0]
+
+    def get_topic(self, topic_id: str) -> Optional[Topic]:
+        with self._transaction() as conn:
+            row = conn.execute(f"SELECT {TOPIC_COLUMNS} FROM topics WHERE id = ?", (topic_id,)).fetchone()
+        return None if row is None else self._row_to_topic(row)
+
+    def get_topics_by_ids(self, topic_ids: List[str]) -> List[Topic]:
+        """Fetch topics with one IN query per chunk, returned in the order of topic_ids"""
+        found: Dict[str, Topic] = {}
+        unique_ids = list(dict.fromkeys(topic_id for topic_id in topic_ids if topic_id is not None))
+        with self._transaction() as conn:
+            for start in range(0, len(unique_ids), MAX_PARAMS):
+                chunk = unique_ids[start:start + MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT {TOPIC_COLUMNS} FROM topics WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = self._row_to_topic(row)
+        return [found[topic_id] for topic_id in topic_ids if topic_id in found]
+
+    def get_existing_names(self, names: List[str]) -> Set[str]:
+        """Which of the given topic names are already stored"""
+        found = set()
+        unique_names = list(dict.fromkeys(names))
+        with self._transaction() as conn:
+            for start in range(0, len(unique_names), MAX_PARAMS):
+                chunk = unique_names[start:start + MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT name FROM topics WHERE name IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(name for name, in rows)
+        return found
+
+    def search_topics_lexical(self, query: str, limit: int = 20) -> List[Tuple[str, float, float]]:
+        """
+        BM25-ranked topics matching any query term in name, definition or facts.
+
+        Stopwords are dropped from the query, so a query made only of them
+        matches nothing.
+
+        Returns:
+            List[Tuple[str, float, float]]: (topic id, bm25 score, share of query
+                terms the topic contains) best first; lower scores are better
+        """
+        if not self.fts_enabled:
+            return []
+        terms = query_terms(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT topics.id, bm25(topics_fts), topics.name, topics.definition, topics.facts FROM topics_fts "
+                "JOIN topics ON topics.rowid = topics_fts.rowid "
+                "WHERE topics_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        results = []
+        for topic_id, score, *fields in rows:
+            present = set(query_terms(" ".join(field or "" for field in fields)))
+            results.append((topic_id, score, sum(term in present for term in terms) / len(terms)))
+        return results
+
+    def store_topic_embeddings(self, rows: List[Tuple[str, bytes]]) -> int:
+        """Write (id, embedding) pairs for existing topics, returning how many rows changed"""
+        try:
+            with self._transaction() as conn:
+                cursor = conn.executemany(
+                    "UPDATE topics SET embedding = ? WHERE id = ?", [(embedding, topic_id) for topic_id, embedding in rows]
+                )
+                return cursor.rowcount
+        except Exception:
+            return 0
+
+    def get_topic_embeddings(self, topic_ids: List[str]) -> Dict[str, bytes]:
+        """Stored embeddings by topic id; topics without one are left out"""
+        found: Dict[str, bytes] = {}
+        unique_ids = list(dict.fromkeys(topic_ids))
+        with self._transaction() as conn:
+            for start in range(0, len(unique_ids), MAX_PARAMS):
+                chunk = unique_ids[start:start + MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT id, embedding FROM topics WHERE embedding IS NOT NULL AND id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def iter_topic_embeddings(self, batch_size: int = 10000) -> Iterator[List[Tuple[str, Optional[bytes]]]]:
+        """Yield (id, embedding) batches for every topic in insertion order; embedding is None where not stored"""
+        last_rowid = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, id, embedding FROM topics WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [(topic_id, embedding) for _, topic_id, embedding in rows]
+
+    def get_topic_attributes(self, topic_ids: List[str]) -> List[Tuple[str, str, float, float, float]]:
+        """(id, namespace, confidence, created_at, updated_at) rows for existing topics, times in epoch seconds"""
+        rows = []
+        unique_ids = list(dict.fromkeys(topic_ids))
+        with self._transaction() as conn:
+            for start in range(0, len(unique_ids), MAX_PARAMS):
+                chunk = unique_ids[start:start + MAX_PARAMS]
+                rows.extend(conn.execute(
+                    f"SELECT {ATTRIBUTE_COLUMNS} FROM topics WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+        return rows
+
+    def iter_topic_attributes(self, batch_size: int = 10000) -> Iterator[List[Tuple[str, str, float, float, float]]]:
+        """Yield (id, namespace, confidence, created_at, updated_at) batches for every topic"""
+        last_rowid = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    f"SELECT rowid, {ATTRIBUTE_COLUMNS} FROM topics WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [row[1:] for row in rows]
+
+    def update_topic(self, topic: Topic) -> bool:
+        return self.update_topics([topic]) == 1
+
+    def update_topics(self, topics: List[Topic]) -> int:
+        """Update topics in one transaction, returning how many rows changed"""
+        now = time.time()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO topics (id, name, definition, facts, confidence) VALUES (?, ?, ?, ?, ?)",
-                    (topic.id, topic.name, topic.definition, str(topic.facts), topic.confidence)
+            with self._transaction() as conn:
+                cursor = conn.executemany(
+                    "UPDATE topics SET name = ?, definition = ?, facts = ?, confidence = ?, namespace = ?, updated_at = ?, "
+                    "definition_hash = ? WHERE id = ?",
+                    [
+                        (
+                            topic.name, topic.definition, json.dumps(topic.facts), topic.confidence, topic.namespace, now,
+                            definition_hash(topic.definition), topic.id
+                        )
+                        for topic in topics
+                    ]
                 )
-                return True
+                return cursor.rowcount
+        except Exception:
+            return 0
+
+    def delete_topic(self, topic_id: str) -> bool:
+        return self.delete_topics([topic_id]) == 1
+
+    def delete_topics(self, topic_ids: List[str]) -> int:
+        """Delete topics in one transaction, returning how many rows were removed"""
+        try:
+            with self._transaction() as conn:
+                cursor = conn.executemany("DELETE FROM topics WHERE id = ?", [(topic_id,) for topic_id in topic_ids])
+                return cursor.rowcount
+        except Exception:
+            return 0
+
+    def get_interaction_count(self, agent: Optional[str] = None) -> int:
+        with self._transaction() as conn:
+            if agent is None:
+                return conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM interactions WHERE agent = ?", (agent,)).fetchone()[0]
+
+    def store_interactions(self, rows: List[Tuple]) -> bool:
+        """Insert (id, agent, user_input, agent_response, confidence, timestamp, embedding) rows in one transaction"""
+        try:
+            with self._transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO interactions "
+                    "(id, agent, user_input, agent_response, confidence, timestamp, embedding) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            return True
         except Exception:
             return False
+
+    def get_interactions_by_ids(self, interaction_ids: List[str]) -> List[Tuple]:
+        """(id, agent, user_input, agent_response, confidence, timestamp) rows in the order of interaction_ids"""
+        found: Dict[str, Tuple] = {}
+        with self._transaction() as conn:
+            for start in range(0, len(interaction_ids), MAX_PARAMS):
+                chunk = interaction_ids[start:start + MAX_PARAMS]
+                rows = conn.execute(
+                    "SELECT id, agent, user_input, agent_response, confidence, timestamp FROM interactions "
+                    f"WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = row
+        return [found[interaction_id] for interaction_id in interaction_ids if interaction_id in found]
+
+    def iter_interaction_embeddings(self, agent: str, batch_size: int = 10000) -> Iterator[List[Tuple[str, float, bytes]]]:
+        """Yield (id, timestamp, embedding) batches for an agent, oldest first"""
+        last_rowid = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, id, timestamp, embedding FROM interactions "
+                    "WHERE agent = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (agent, last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [(interaction_id, timestamp, embedding) for _, interaction_id, timestamp, embedding in rows]
+
+    def delete_interactions(self, interaction_ids: List[str]) -> int:
+        try:
+            with self._transaction() as conn:
+                cursor = conn.executemany(
+                    "DELETE FROM interactions WHERE id = ?", [(interaction_id,) for interaction_id in interaction_ids]
+                )
+                return cursor.rowcount
+        except Exception:
+            return 0
+
+    def get_last_update_time(self) -> Optional[datetime]:
+        """Time of the most recent topic write or interaction"""
+        with self._transaction() as conn:
+            row = conn.execute('''
+                SELECT MAX(latest) FROM (
+                    SELECT MAX(updated_at) AS latest FROM topics
+                    UNION ALL
+                    SELECT MAX(timestamp) FROM interactions
+                )
+            ''').fetchone()
+        return datetime.fromtimestamp(row[0]) if row[0] is not None else None
+
+    def iter_topic_definitions(
+        self,
+        since_rowid: int = 0,
+        batch_size: int = 256,
+        updated_since: Optional[float] = None
+    ) -> Iterator[List[Tuple[str, str, str]]]:
+        """Yield (id, definition, definition_hash) batches for topics added after since_rowid or updated since a time"""
+        last_rowid = 0 if updated_since is not None else since_rowid
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, id, definition, definition_hash FROM topics "
+                    "WHERE rowid > ? AND (rowid > ? OR updated_at >= ?) ORDER BY rowid LIMIT ?",
+                    (last_rowid, since_rowid, updated_since if updated_since is not None else float("inf"), batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [row[1:] for row in rows]
+
+    def iter_definition_hashes(self, batch_size: int = 10000) -> Iterator[List[Tuple[str, str]]]:
+        """Yield (id, definition_hash) batches for every topic"""
+        last_rowid = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, id, definition_hash FROM topics WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [row[1:] for row in rows]
+
+    def iter_topic_ids(self, batch_size: int = 10000) -> Iterator[str]:
+        last_rowid = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, id FROM topics WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            for _, topic_id in rows:
+                yield topic_id
@@ -0,0 +1,163 @@
+# gracie/core/embedding_cache.py
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (model name, normalized text hash).
+
+    The memory tier is a bounded LRU. The optional disk tier is a SQLite
+    table that survives restarts; memory misses fall through to it before
+    the encoder is called.
+    """
+    def __init__(self, model_name: str, max_entries: int = 10000, disk_path: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dimension: Optional[int] = None
+        if disk_path:
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key BLOB PRIMARY KEY,
+                    dtype TEXT,
+                    vector BLOB
+                )
+            ''')
+            self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self.model_name}\0{self.normalize(text)}".encode("utf-8"),
+            digest_size=16
+        ).digest()
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for texts, calling encoder once for the distinct misses.
+
+        Args:
+            texts (List[str]): Texts to embed
+            encoder (Callable): Batch encoder returning one row per input text
+
+        Returns:
+            np.ndarray: Embedding matrix in input order; (0, dimension) for no texts
+        """
+        if not len(texts):
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        keys = [self.key(text) for text in texts]
+        found = self.get_many(keys)
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            embeddings = np.asarray(encoder(list(missing.values())))
+            computed = {key: np.array(embedding) for key, embedding in zip(missing.keys(), embeddings)}
+            self.put_many(computed)
+            found.update(computed)
+
+        return np.stack([found[key] for key in keys])
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = embedding
+            self.hits += sum(1 for key in keys if key in found)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in found]
+        if pending and self._conn is not None:
+            from_disk = self._read_disk(pending)
+            if from_disk:
+                self._remember(from_disk)
+                found.update(from_disk)
+
+        pending = set(pending)
+        with self._lock:
+            self.disk_hits += sum(1 for key in keys if key in pending and key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, embeddings: Dict[bytes, np.ndarray]):
+        self._remember(embeddings)
+        if self._conn is not None:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, dtype, vector) VALUES (?, ?, ?)",
+                    [
+                        (key, embedding.dtype.str, np.ascontiguousarray(embedding).tobytes())
+                        for key, embedding in embeddings.items()
+                    ]
+                )
+                self._conn.commit()
+
+    def _remember(self, embeddings: Dict[bytes, np.ndarray]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, embedding in embeddings.items():
+                self.dimension = len(embedding)
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _read_disk(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's default bound-parameter limit
+            for start in range(0, len(keys), 900):
+                chunk = keys[start:start + 900]
+                rows = self._conn.execute(
+                    f"SELECT key, dtype, vector FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, dtype, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.dtype(dtype))
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embedding_cache")
+                self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
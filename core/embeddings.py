@@ -1,17 +1,106 @@
 # gracie/core/embeddings.py
-from typing import List
+from typing import List, Optional, Sequence, Tuple, Union
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from .embedding_cache import EmbeddingCache
+from .model_registry import LazySentenceTransformer
+
+TextsOrEmbeddings = Union[Sequence[str], np.ndarray]
 
 class EmbeddingProcessor:
     """Handles text embeddings"""
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache_size: int = 10000,
+        cache_path: Optional[str] = None
+    ):
+        # Shared with every other user of model_name and loaded on first encode
+        self.model = LazySentenceTransformer(model_name)
+        self.cache = EmbeddingCache(model_name, max_entries=cache_size, disk_path=cache_path)
+
+    def warmup(self):
+        """Load the model now instead of on the first encode"""
+        self.model.warmup()
         
-    def encode(self, texts: List[str]) -> np.ndarray:
-        return self.model.encode(texts)
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        # A single string gives a single vector, as SentenceTransformer.encode does
+        if isinstance(texts, str):
+            return self.cache.encode([texts], self.model.encode)[0]
+        if not len(texts):
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return self.cache.encode(texts, self.model.encode)
         
     def get_similarity(self, text1: str, text2: str) -> float:
-        emb1 = self.encode([text1])[0]
-        emb2 = self.encode([text2])[0]
-        return np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
+        emb1, emb2 = self._normalized([text1, text2])
+        return float(np.dot(emb1, emb2))
+
+    def similarity_matrix(
+        self,
+        a: TextsOrEmbeddings,
+        b: TextsOrEmbeddings,
+        chunk_size: int = 4096
+    ) -> np.ndarray:
+        """
+        Cosine similarity between every item of a and every item of b.
+
+        Each side is encoded once in batch (or taken as precomputed
+        embeddings) and normalized once; scores are computed with one matrix
+        multiply per chunk of ``a`` rows so intermediates stay bounded.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(a), len(b))
+        """
+        b_norm = self._normalized(b)
+        a_items = a if isinstance(a, np.ndarray) else list(a)
+        scores = np.empty((len(a_items), len(b_norm)), dtype=np.float32)
+        if not len(b_norm):
+            return scores
+        for start in range(0, len(a_items), chunk_size):
+            chunk = self._normalized(a_items[start:start + chunk_size])
+            scores[start:start + len(chunk)] = chunk @ b_norm.T
+        return scores
+
+    def top_k_similar(
+        self,
+        query: Union[str, np.ndarray],
+        candidates: TextsOrEmbeddings,
+        k: int = 5,
+        chunk_size: int = 65536
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the k candidates most similar to the query.
+
+        Candidates are encoded and scored chunk by chunk, keeping only a
+        running top-k, so memory is bounded by chunk_size.
+
+        Returns:
+            List[Tuple[int, float]]: (candidate index, cosine score), best first
+        """
+        query_norm = self._normalized([query] if isinstance(query, str) else np.atleast_2d(query))[0]
+        items = candidates if isinstance(candidates, np.ndarray) else list(candidates)
+
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(items), chunk_size):
+            scores = self._normalized(items[start:start + chunk_size]) @ query_norm
+            ids = np.concatenate([best_ids, np.arange(start, start + len(scores))])
+            scores = np.concatenate([best_scores, scores])
+            if len(scores) > k:
+                keep = np.argpartition(-scores, k - 1)[:k]
+                ids, scores = ids[keep], scores[keep]
+            best_ids, best_scores = ids, scores
+
+        order = np.argsort(-best_scores, kind="stable")
+        return [(int(best_ids[i]), float(best_scores[i])) for i in order]
+
+    def _normalized(self, items: TextsOrEmbeddings) -> np.ndarray:
+        """Embed texts (or accept embeddings) and scale rows to unit length."""
+        if isinstance(items, np.ndarray):
+            embeddings = np.atleast_2d(items).astype(np.float32, copy=False)
+        else:
+            items = list(items)
+            if not items:
+                return np.empty((0, 0), dtype=np.float32)
+            embeddings = np.asarray(self.encode(items), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
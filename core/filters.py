@@ -0,0 +1,247 @@
+# gracie/core/filters.py
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+# Filterable topic attributes; times are seconds since the epoch
+FILTER_FIELDS = ("namespace", "confidence", "created_at", "updated_at")
+TIME_FIELDS = ("created_at", "updated_at")
+OPERATORS = ("==", "!=", ">=", "<=", ">", "<", "in", "not in")
+
+TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<string>'[^']*'|\"[^\"]*\")"
+    r"|(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"|(?P<op>==|!=|>=|<=|>|<)"
+    r"|(?P<word>\w+)"
+    r"|(?P<punct>[\[\](),]))"
+)
+
+@dataclass(frozen=True)
+class Condition:
+    """One attribute comparison; ``in`` and ``not in`` take a tuple of values"""
+    field: str
+    op: str
+    value: Any
+
+FilterSpec = Union[str, Sequence[Union[Condition, Tuple[str, str, Any]]]]
+
+def parse_filter(spec: Optional[FilterSpec]) -> Tuple[Condition, ...]:
+    """
+    Normalize a filter into conditions that must all hold.
+
+    Accepts an expression such as
+    ``namespace == 'tenant_a' and confidence >= 0.5 and created_at >= '2024-01-01'``
+    or a sequence of (field, op, value) tuples. Time fields take epoch
+    seconds or ISO 8601 strings (UTC unless an offset is given).
+
+    Raises:
+        ValueError: For unknown fields or operators, or malformed expressions
+    """
+    if not spec:
+        return ()
+    if isinstance(spec, str):
+        return _parse_expression(spec)
+    return tuple(_condition(*condition) if not isinstance(condition, Condition) else condition for condition in spec)
+
+@lru_cache(maxsize=256)
+def _parse_expression(expression: str) -> Tuple[Condition, ...]:
+    tokens = _tokenize(expression)
+    conditions, position = [], 0
+    while True:
+        if position >= len(tokens) or tokens[position][0] != "word":
+            raise ValueError(f"Expected a field name in filter: {expression}")
+        field_name = tokens[position][1]
+        position += 1
+        op, position = _read_operator(tokens, position, expression)
+        value, position = _read_value(tokens, position, expression, as_list=op in ("in", "not in"))
+        conditions.append(_condition(field_name, op, value))
+        if position == len(tokens):
+            return tuple(conditions)
+        if tokens[position] != ("word", "and"):
+            raise ValueError(f"Expected 'and' between conditions in filter: {expression}")
+        position += 1
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens, position = [], 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unexpected character in filter at {position}: {expression}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        tokens.append((kind, text.lower() if kind == "word" and text.lower() in ("and", "in", "not") else text))
+        position = match.end()
+    return tokens
+
+def _read_operator(tokens: List[Tuple[str, str]], position: int, expression: str) -> Tuple[str, int]:
+    if position < len(tokens) and tokens[position][0] == "op":
+        return tokens[position][1], position + 1
+    if position < len(tokens) and tokens[position] == ("word", "in"):
+        return "in", position + 1
+    if tokens[position:position + 2] == [("word", "not"), ("word", "in")]:
+        return "not in", position + 2
+    raise ValueError(f"Expected an operator in filter: {expression}")
+
+def _read_value(tokens: List[Tuple[str, str]], position: int, expression: str, as_list: bool) -> Tuple[Any, int]:
+    if not as_list:
+        if position >= len(tokens):
+            raise ValueError(f"Expected a value in filter: {expression}")
+        return _literal(tokens[position], expression), position + 1
+    if position >= len(tokens) or tokens[position][1] not in ("[", "("):
+        raise ValueError(f"Expected a list after 'in' in filter: {expression}")
+    closing = "]" if tokens[position][1] == "[" else ")"
+    values, position = [], position + 1
+    while position < len(tokens) and tokens[position][1] != closing:
+        values.append(_literal(tokens[position], expression))
+        position += 1
+        if position < len(tokens) and tokens[position][1] == ",":
+            position += 1
+    if position >= len(tokens):
+        raise ValueError(f"Unterminated list in filter: {expression}")
+    return tuple(values), position + 1
+
+def _literal(token: Tuple[str, str], expression: str) -> Any:
+    kind, text = token
+    if kind == "string":
+        return text[1:-1]
+    if kind == "number":
+        return float(text)
+    raise ValueError(f"Expected a quoted string or number, got {text!r} in filter: {expression}")
+
+def _condition(field_name: str, op: str, value: Any) -> Condition:
+    if field_name not in FILTER_FIELDS:
+        raise ValueError(f"Unsupported filter field: {field_name}")
+    if op not in OPERATORS:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    values = tuple(value) if op in ("in", "not in") else (value,)
+    if field_name == "namespace":
+        values = tuple(str(item) for item in values)
+    elif field_name in TIME_FIELDS:
+        values = tuple(_timestamp(item) for item in values)
+    else:
+        values = tuple(float(item) for item in values)
+    return Condition(field_name, op, values if op in ("in", "not in") else values[0])
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, str):
+        moment = datetime.fromisoformat(value)
+    else:
+        return float(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+class TopicAttributes:
+    """
+    Filterable topic attributes in columns aligned with memory rows.
+
+    Namespaces are dictionary-encoded to int32 codes, so equality filters
+    compare integers. The boolean row mask of each recently used filter is
+    kept and patched on every write, so repeated filters (such as one per
+    tenant) cost a lookup rather than a scan.
+    """
+    def __init__(self, initial_capacity: int = 1024, max_cached_masks: int = 64):
+        self.initial_capacity = initial_capacity
+        self.max_cached_masks = max_cached_masks
+        self._size = 0
+        self._codes: Dict[str, int] = {}
+        # Rows never written hold namespace -1 and NaN values, which no range condition matches
+        self.namespace = np.zeros(0, dtype=np.int32)
+        self.confidence = np.zeros(0, dtype=np.float32)
+        self.created_at = np.zeros(0, dtype=np.float64)
+        self.updated_at = np.zeros(0, dtype=np.float64)
+        self._masks: Dict[Tuple[Condition, ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def set(self, rows: np.ndarray, records: List[Tuple[str, float, float, float]]):
+        """Write (namespace, confidence, created_at, updated_at) records to rows."""
+        if not len(records):
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        self._reserve(int(rows.max()) + 1)
+        namespaces, confidences, created, updated = zip(*records)
+        self.namespace[rows] = [self._code(namespace) for namespace in namespaces]
+        self.confidence[rows] = [confidence or 0.0 for confidence in confidences]
+        self.created_at[rows] = created
+        self.updated_at[rows] = updated
+        self._size = max(self._size, int(rows.max()) + 1)
+        for conditions, mask in list(self._masks.items()):
+            if len(mask) < self._size:
+                mask = np.concatenate([mask, np.zeros(self._size - len(mask), dtype=bool)])
+                self._masks[conditions] = mask
+            mask[rows] = self._evaluate(conditions, rows)
+
+    def compact(self, keep: np.ndarray):
+        """Keep only the listed rows, renumbered in order, as MemoryManager.compact does."""
+        keep = np.asarray(keep, dtype=np.int64)
+        if len(keep):
+            self._reserve(int(keep.max()) + 1)
+        for name in ("namespace", "confidence", "created_at", "updated_at"):
+            setattr(self, name, getattr(self, name)[keep])
+        self._size = len(keep)
+        self._masks.clear()
+
+    def mask(self, conditions: Tuple[Condition, ...], size: int) -> np.ndarray:
+        """Rows (of size) matching every condition; rows without attributes never match."""
+        mask = self._masks.pop(conditions, None)
+        if mask is None:
+            mask = self._evaluate(conditions, np.arange(self._size))
+            if len(self._masks) >= self.max_cached_masks:
+                self._masks.pop(next(iter(self._masks)))
+        # Re-inserting keeps the dict ordered from least to most recently used
+        self._masks[conditions] = mask
+        if len(mask) >= size:
+            return mask[:size]
+        return np.concatenate([mask, np.zeros(size - len(mask), dtype=bool)])
+
+    def _evaluate(self, conditions: Tuple[Condition, ...], rows: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(rows), dtype=bool)
+        for condition in conditions:
+            column = getattr(self, condition.field)[rows]
+            value = condition.value
+            if condition.field == "namespace":
+                # Unknown namespaces get code -1, which no row holds
+                value = tuple(self._codes.get(item, -1) for item in value) if isinstance(value, tuple) else self._codes.get(value, -1)
+            mask &= _compare(column, condition.op, value)
+        return mask
+
+    def _code(self, namespace: str) -> int:
+        code = self._codes.get(namespace)
+        if code is None:
+            code = self._codes[namespace] = len(self._codes)
+        return code
+
+    def _reserve(self, rows: int):
+        capacity = len(self.namespace)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, self.initial_capacity)
+        for name in ("namespace", "confidence", "created_at", "updated_at"):
+            column = getattr(self, name)
+            grown = np.full(capacity, -1 if name == "namespace" else np.nan, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+def _compare(column: np.ndarray, op: str, value: Any) -> np.ndarray:
+    if op == "==":
+        return column == value
+    if op == "!=":
+        return column != value
+    if op == ">=":
+        return column >= value
+    if op == "<=":
+        return column <= value
+    if op == ">":
+        return column > value
+    if op == "<":
+        return column < value
+    matched = np.isin(column, np.asarray(value, dtype=column.dtype) if value else np.zeros(0, dtype=column.dtype))
+    return matched if op == "in" else ~matched
@@ -0,0 +1,127 @@
+# gracie/core/index_store.py
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from ..utils.lazy import lazy_import
+
+faiss = lazy_import("faiss")
+
+INDEX_FORMAT_VERSION = 1
+
+@dataclass
+class IndexSnapshot:
+    """A persisted vector index together with its row-to-topic mapping"""
+    index: "faiss.Index"
+    topic_ids: np.ndarray
+    vectors: np.ndarray
+    meta: Dict
+    codec_state: Optional[Dict[str, np.ndarray]] = None
+    definition_hashes: Optional[np.ndarray] = None
+
+class IndexStore:
+    """
+    Saves and loads the FAISS index next to the knowledge database.
+
+    A snapshot is five files sharing a base path: the FAISS index, the
+    topic ids, stored vectors (in their storage dtype) and hashes of the
+    embedded definitions as ``.npy`` arrays, and a JSON manifest, plus an
+    ``.npz`` of codec parameters for compressed storage modes. The
+    manifest is written last so an interrupted save is never loaded.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.index_path = f"{base_path}.faiss"
+        self.ids_path = f"{base_path}.ids.npy"
+        self.vectors_path = f"{base_path}.vectors.npy"
+        self.hashes_path = f"{base_path}.hashes.npy"
+        self.meta_path = f"{base_path}.meta.json"
+        self.codec_path = f"{base_path}.codec.npz"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def save(
+        self,
+        index: "faiss.Index",
+        topic_ids: List[str],
+        vectors: np.ndarray,
+        meta: Dict,
+        codec_state: Optional[Dict[str, np.ndarray]] = None,
+        definition_hashes: Optional[List[str]] = None
+    ):
+        """Write a snapshot, replacing any previous one; empty ids mark removed rows."""
+        manifest = dict(meta)
+        manifest.update({
+            "format_version": INDEX_FORMAT_VERSION,
+            "rows": len(topic_ids),
+            "ntotal": sum(1 for topic_id in topic_ids if topic_id),
+            "saved_at": time.time()
+        })
+
+        # Drop the manifest first so a crash mid-save leaves no valid snapshot
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+
+        faiss.write_index(index, self.index_path + ".tmp")
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self._save_array(self.ids_path, np.asarray(topic_ids, dtype=str))
+        self._save_array(self.vectors_path, np.asarray(vectors))
+        if definition_hashes is not None:
+            self._save_array(self.hashes_path, np.asarray(definition_hashes, dtype=str))
+        elif os.path.exists(self.hashes_path):
+            os.remove(self.hashes_path)
+        if codec_state is not None:
+            np.savez(self.codec_path + ".tmp.npz", **codec_state)
+            os.replace(self.codec_path + ".tmp.npz", self.codec_path)
+        elif os.path.exists(self.codec_path):
+            os.remove(self.codec_path)
+
+        with open(self.meta_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+
+    def load(self, mmap: bool = True) -> Optional[IndexSnapshot]:
+        """Load the snapshot, or return None if it is missing or unreadable."""
+        if not self.exists():
+            return None
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != INDEX_FORMAT_VERSION:
+            return None
+
+        # Memory-mapped IVF lists are read-only, so only flat and HNSW indexes are mapped
+        mmap_index = mmap and not str(meta.get("index_type", "")).startswith("ivf")
+        flags = getattr(faiss, "IO_FLAG_MMAP", 0) if mmap_index else 0
+        index = faiss.read_index(self.index_path, flags)
+        mmap_mode = "r" if mmap else None
+        topic_ids = np.load(self.ids_path, mmap_mode=mmap_mode)
+        vectors = np.load(self.vectors_path, mmap_mode=mmap_mode)
+
+        if not (len(topic_ids) == len(vectors) == meta["rows"]):
+            return None
+        codec_state = None
+        if os.path.exists(self.codec_path):
+            with np.load(self.codec_path) as arrays:
+                codec_state = dict(arrays)
+        definition_hashes = np.load(self.hashes_path) if os.path.exists(self.hashes_path) else None
+        if definition_hashes is not None and len(definition_hashes) != meta["rows"]:
+            definition_hashes = None
+        return IndexSnapshot(
+            index=index, topic_ids=topic_ids, vectors=vectors, meta=meta,
+            codec_state=codec_state, definition_hashes=definition_hashes
+        )
+
+    def clear(self):
+        for path in (self.meta_path, self.index_path, self.ids_path, self.vectors_path, self.hashes_path, self.codec_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _save_array(path: str, array: np.ndarray):
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
@@ -0,0 +1,253 @@
+# gracie/core/interaction_store.py
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from .database import DatabaseManager
+from .memory_manager import MemoryManager
+from .vector_index import VectorIndex
+from ..models.interaction import Interaction
+from ..utils.logger import setup_logger
+
+class InteractionStore:
+    """
+    Append-only, bounded log of an agent's interactions with embedding recall.
+
+    New interactions are buffered and written with one batched insert
+    (and one encoder call) per flush; recall also searches the buffer, so
+    it never forces a write. Each user input is embedded into a
+    MemoryManager/VectorIndex pair so relevant past turns can be recalled;
+    recall scores are cosine similarity decayed by ``memory_retention`` per
+    ``retention_period`` of age. Once an agent holds more than
+    max_interactions, the oldest are deleted from disk and memory, so both
+    stay bounded however long the agent runs.
+    """
+    def __init__(
+        self,
+        db: DatabaseManager,
+        agent: str,
+        encoder: Callable[[List[str]], np.ndarray],
+        memory_retention: float = 0.8,
+        retention_period: float = 86400.0,
+        max_interactions: int = 10000,
+        flush_size: int = 64,
+        dtype: str = "float32"
+    ):
+        """
+        Args:
+            db (DatabaseManager): Database holding the interactions table
+            agent (str): Agent whose interactions this store owns
+            encoder (Callable): Batch text encoder, e.g. GracieKnowledgeSystem.encode
+            memory_retention (float): Weight an interaction keeps after each retention_period
+            retention_period (float): Seconds per decay step
+            max_interactions (int): Interactions kept before the oldest are evicted
+            flush_size (int): Buffered interactions that trigger a write
+            dtype (str): Storage dtype for embeddings held in memory
+        """
+        self.db = db
+        self.agent = agent
+        self.encoder = encoder
+        self.memory_retention = memory_retention
+        self.retention_period = retention_period
+        self.max_interactions = max_interactions
+        self.flush_size = flush_size
+        self.logger = setup_logger(f"Interactions_{agent}")
+        self.memory = MemoryManager(dtype=dtype)
+        self.index: Optional[VectorIndex] = None
+        self._timestamps: Dict[str, float] = {}
+        self._order: Deque[str] = deque()
+        self._buffer: List[Interaction] = []
+        self._pending_vectors: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        """Rebuild the in-memory recall index from the stored embeddings."""
+        ids, timestamps, vectors = [], [], []
+        for batch in self.db.iter_interaction_embeddings(self.agent):
+            for interaction_id, timestamp, embedding in batch:
+                if embedding is None:
+                    continue
+                ids.append(interaction_id)
+                timestamps.append(timestamp)
+                vectors.append(np.frombuffer(embedding, dtype=np.float32))
+        if ids:
+            self._add_to_index(np.stack(vectors), ids, timestamps)
+        self._evict()
+
+    def record(self, interaction: Interaction) -> Interaction:
+        """Buffer an interaction, writing the buffer once flush_size are pending."""
+        with self._lock:
+            self._buffer.append(interaction)
+            if len(self._buffer) >= self.flush_size:
+                self.flush()
+        return interaction
+
+    def flush(self) -> int:
+        """Embed and write buffered interactions, then evict past max_interactions."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                # Inputs already embedded by recall are not encoded again
+                missing = [item for item in batch if item.interaction_id not in self._pending_vectors]
+                if missing:
+                    vectors = self._embed([item.user_input for item in missing])
+                    for item, vector in zip(missing, vectors):
+                        self._pending_vectors[item.interaction_id] = vector
+                embeddings = np.stack([self._pending_vectors[item.interaction_id] for item in batch])
+            except Exception as e:
+                self.logger.error(f"Error embedding interactions: {e}")
+                self._buffer = batch + self._buffer
+                return 0
+
+            timestamps = [self._epoch(item.timestamp) for item in batch]
+            stored = self.db.store_interactions([
+                (item.interaction_id, self.agent, item.user_input, item.agent_response,
+                 item.confidence, timestamp, embedding.tobytes())
+                for item, timestamp, embedding in zip(batch, timestamps, embeddings)
+            ])
+            if not stored:
+                self.logger.error(f"Error storing {len(batch)} interactions")
+                self._buffer = batch + self._buffer
+                return 0
+            for item in batch:
+                self._pending_vectors.pop(item.interaction_id, None)
+            self._add_to_index(embeddings, [item.interaction_id for item in batch], timestamps)
+            self._evict()
+            return len(batch)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.asarray(self.encoder(texts), dtype=np.float32).reshape(len(texts), -1)
+        return embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    def recall(self, query: str, top_k: int = 5, now: Optional[float] = None) -> List[Tuple[Interaction, float]]:
+        """
+        Past interactions most relevant to query, weighted toward recent ones.
+
+        Args:
+            query (str): Text to match against past user inputs
+            top_k (int): Number of interactions to return
+            now (float): Reference time for decay, defaults to the current time
+
+        Returns:
+            List[Tuple[Interaction, float]]: Interactions with their decayed scores, best first
+        """
+        try:
+            with self._lock:
+                pending = list(self._buffer)
+                missing = [item for item in pending if item.interaction_id not in self._pending_vectors]
+                if not pending and (self.index is None or not self.index.ntotal):
+                    return []
+            # Encoding runs unlocked, so recording and flushing carry on meanwhile
+            embeddings = self._embed([query] + [item.user_input for item in missing])
+            embedding = embeddings[:1]
+            now = time.time() if now is None else now
+            scored = []
+            with self._lock:
+                buffered = {item.interaction_id for item in self._buffer}
+                for item, vector in zip(missing, embeddings[1:]):
+                    if item.interaction_id in buffered:
+                        self._pending_vectors[item.interaction_id] = vector
+                candidates = []
+                if self.index is not None and self.index.ntotal:
+                    # Decay can reorder neighbours, so score a wider candidate pool
+                    distances, rows = self.index.search(embedding, min(top_k * 4, self.index.ntotal))
+                    for distance, row in zip(distances[0], rows[0]):
+                        interaction_id = self.memory.get_topic_id(row) if row >= 0 else None
+                        if interaction_id is not None:
+                            candidates.append((interaction_id, 1 - float(distance) / 2, self._timestamps[interaction_id]))
+                unflushed = {}
+                for item in pending:
+                    # An interaction flushed since the snapshot was found through the index
+                    vector = self._pending_vectors.get(item.interaction_id)
+                    if vector is not None and item.interaction_id not in self._timestamps:
+                        unflushed[item.interaction_id] = item
+                        candidates.append((item.interaction_id, float(vector @ embedding[0]), self._epoch(item.timestamp)))
+            for interaction_id, similarity, timestamp in candidates:
+                age = max(now - timestamp, 0.0)
+                decay = self.memory_retention ** (age / self.retention_period)
+                scored.append((interaction_id, similarity * decay))
+            scored.sort(key=lambda item: item[1], reverse=True)
+            scored = scored[:top_k]
+            rows = {
+                row[0]: row
+                for row in self.db.get_interactions_by_ids(
+                    [interaction_id for interaction_id, _ in scored if interaction_id not in unflushed]
+                )
+            }
+            results = []
+            for interaction_id, score in scored:
+                if interaction_id in unflushed:
+                    results.append((unflushed[interaction_id], score))
+                elif interaction_id in rows:
+                    results.append((self._to_interaction(rows[interaction_id]), score))
+            return results
+        except Exception as e:
+            self.logger.error(f"Error recalling interactions: {e}")
+            return []
+
+    def _add_to_index(self, embeddings: np.ndarray, ids: List[str], timestamps: List[float]):
+        if self.index is None:
+            self.index = VectorIndex(
+                embeddings.shape[1], vector_source=lambda: (self.memory.get_matrix(), self.memory.get_live_mask())
+            )
+        new = [i for i, interaction_id in enumerate(ids) if interaction_id not in self.memory]
+        self.memory.add_embeddings(embeddings, ids)
+        rows = np.array([self.memory.get_row(interaction_id) for interaction_id in ids], dtype=np.int64)
+        if len(new) == len(ids):
+            self.index.add(embeddings, rows)
+        else:
+            self.index.update(embeddings, rows)
+        for interaction_id, timestamp in zip(ids, timestamps):
+            if interaction_id not in self._timestamps:
+                self._order.append(interaction_id)
+            self._timestamps[interaction_id] = timestamp
+
+    def _evict(self):
+        excess = len(self._timestamps) - self.max_interactions
+        if excess <= 0:
+            return
+        evicted = [self._order.popleft() for _ in range(excess)]
+        self.db.delete_interactions(evicted)
+        rows = [self.memory.remove_embedding(interaction_id) for interaction_id in evicted]
+        for interaction_id in evicted:
+            del self._timestamps[interaction_id]
+        self.index.remove(np.array([row for row in rows if row is not None], dtype=np.int64))
+        if self.memory.needs_compaction:
+            self.memory.compact()
+            self.index.rebuild(self.memory.get_matrix(), self.memory.get_live_mask())
+        self.evictions += excess
+
+    @staticmethod
+    def _epoch(timestamp) -> float:
+        if isinstance(timestamp, datetime):
+            return timestamp.timestamp()
+        return float(timestamp) if timestamp is not None else time.time()
+
+    @staticmethod
+    def _to_interaction(row: Tuple) -> Interaction:
+        return Interaction(
+            user_input=row[2],
+            agent_response=row[3],
+            confidence=row[4],
+            timestamp=datetime.fromtimestamp(row[5]),
+            interaction_id=row[0]
+        )
+
+    def close(self):
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "stored": len(self._timestamps),
+                "buffered": len(self._buffer),
+                "max_interactions": self.max_interactions,
+                "evictions": self.evictions,
+                "memory_usage": self.memory.get_usage_stats()
+            }
@@ -1,12 +1,23 @@
 # gracie/core/memetic_system.py
-from typing import Dict, List, Optional
-from dataclasses import dataclass
-import faiss
-from sentence_transformers import SentenceTransformer
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
+from itertools import islice
+import time
+import numpy as np
 from .database import DatabaseManager
+from .embedding_cache import EmbeddingCache
+from .filters import FilterSpec, TopicAttributes, parse_filter
+from .index_store import IndexStore
 from .memory_manager import MemoryManager
+from .model_registry import LazySentenceTransformer
+from .quantization import EmbeddingCodec, STORAGE_MODES
+from .query_batcher import QueryBatcher
+from .snapshot import SnapshotReader, SnapshotWriter
+from .vector_index import VectorIndex, recall_report
 from ..models.topic import Topic
 from ..utils.logger import setup_logger
+from ..utils.metrics import StageMetrics
+from ..utils.validators import Validator
 
 @dataclass
 class KnowledgeConfig:
@@ -15,7 +26,87 @@ class KnowledgeConfig:
     db_path: str = "gracie_knowledge.db"
     enable_faiss: bool = True
     max_contexts: int = 5
-    confidence_threshold: float = 0.7
+    confidence_threshold: float = 0.25  # Cosine similarity a dense-only match needs; MiniLM relevant pairs mostly score 0.3-0.7
+    ingest_batch_size: int = 256
+    embedding_dtype: str = "float32"  # or "float16" to halve resident memory
+    embedding_cache_size: int = 10000
+    embedding_cache_path: Optional[str] = None  # SQLite file for a persistent cache tier
+    persist_index: bool = True
+    index_path: Optional[str] = None  # Defaults to "<db_path>.index"
+    mmap_index: bool = True
+    index_autosave_interval: int = 10000
+    index_type: str = "flat"  # flat, ivf_flat, ivf_pq or hnsw
+    nlist: int = 1024
+    nprobe: int = 16
+    pq_m: int = 16
+    hnsw_m: int = 32
+    ef_search: int = 64
+    min_train_size: Optional[int] = None  # Defaults to 39 points per centroid
+    retrain_drift_ratio: float = 1.5
+    query_batching: bool = False  # Coalesce concurrent get_relevant_knowledge calls
+    query_batch_size: int = 32
+    query_batch_wait_ms: float = 2.0
+    hybrid_search: bool = True  # Fuse BM25 over name, definition and facts with vector search
+    hybrid_candidates: int = 4  # Candidates per result fetched from each retriever before fusion
+    rrf_k: int = 60  # Reciprocal rank fusion constant
+    lexical_min_overlap: float = 0.5  # Share of query terms (stopwords aside) a lexical match below the threshold must contain
+    storage_mode: str = "float32"  # float16, int8, pca or matryoshka to shrink memory and the index
+    reduced_dimension: int = 128  # Dimensions kept by the pca and matryoshka modes
+    rerank_factor: int = 4  # Lossy modes re-rank top_k * rerank_factor candidates at full precision; 0 disables
+    codec_train_size: int = 10000  # Vectors sampled to fit the int8 scale or the PCA projection
+    filter_exact_threshold: int = 2048  # Filters matching at most this many topics are searched exhaustively
+
+@dataclass
+class IngestResult:
+    """Outcome of a bulk ingestion run"""
+    added: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.added) + len(self.failed)
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+def _recall(found: np.ndarray, vectors: np.ndarray, queries: np.ndarray, kth: np.ndarray) -> float:
+    """Share of found rows within each query's exact k-th distance, so ties count as hits."""
+    hits = 0
+    for query, rows, limit in zip(queries, found, kth):
+        rows = rows[rows >= 0]
+        hits += int((np.sum((vectors[rows] - query) ** 2, axis=1) <= limit + 1e-5).sum())
+    return hits / found.size
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.dot(a, b) / max(float(np.linalg.norm(a) * np.linalg.norm(b)), 1e-12))
+
+def fuse_rankings(
+    config: KnowledgeConfig,
+    dense: List[Tuple[str, float]],
+    lexical: List[Tuple[str, float]],
+    top_k: int
+) -> List[str]:
+    """
+    Reciprocal rank fusion of dense (id, cosine) and lexical (id, term overlap) rankings.
+
+    A fused topic is kept only if its cosine reaches config.confidence_threshold
+    or it contains config.lexical_min_overlap of the query's terms.
+    """
+    scores: Dict[str, float] = {}
+    for rank, (topic_id, _) in enumerate(dense):
+        scores[topic_id] = scores.get(topic_id, 0.0) + 1 / (config.rrf_k + rank + 1)
+    for rank, (topic_id, _) in enumerate(lexical):
+        scores[topic_id] = scores.get(topic_id, 0.0) + 1 / (config.rrf_k + rank + 1)
+    similarity = dict(dense)
+    overlap = dict(lexical)
+    eligible = [
+        topic_id for topic_id in scores
+        if similarity.get(topic_id, -1.0) >= config.confidence_threshold
+        or overlap.get(topic_id, 0.0) >= config.lexical_min_overlap
+    ]
+    eligible.sort(key=lambda topic_id: scores[topic_id], reverse=True)
+    return eligible[:top_k]
 
 class GracieKnowledgeSystem:
     """
@@ -24,31 +115,434 @@ class GracieKnowledgeSystem:
     A sophisticated memetic learning framework for AI agents.
     """
     
-    def __init__(self, config: Optional[KnowledgeConfig] = None):
-        """Initialize the knowledge system with optional configuration."""
+    def __init__(self, config: Optional[KnowledgeConfig] = None, embedding_model=None):
+        """
+        Initialize the knowledge system with optional configuration.
+        
+        Args:
+            config (KnowledgeConfig): System configuration
+            embedding_model: Encoder with a SentenceTransformer-compatible
+                ``encode``; when omitted, the shared config.embedding_model
+                instance is loaded on first use
+        """
         self.config = config or KnowledgeConfig()
         self.logger = setup_logger('GracieKnowledge')
         
         # Initialize components
         self.db = DatabaseManager(self.config.db_path)
-        self.memory = MemoryManager(enable_faiss=self.config.enable_faiss)
-        self.embedding_model = SentenceTransformer(self.config.embedding_model)
+        # Memory and the index hold codes; lossy modes keep full-precision vectors in the database
+        self.codec = EmbeddingCodec(
+            self.config.storage_mode, self.config.reduced_dimension, base_dtype=self.config.embedding_dtype
+        )
+        self.memory = MemoryManager(
+            enable_faiss=self.config.enable_faiss,
+            dtype=self.codec.code_dtype
+        )
+        self.embedding_model = embedding_model or LazySentenceTransformer(self.config.embedding_model)
+        self.embedding_cache = self._new_embedding_cache()
         
+        # Stage latency and error counts, surfaced by get_stats and export_metrics
+        self.metrics = StageMetrics("gracie_knowledge")
+        # Columns of filterable attributes by memory row, loaded on the first filtered search
+        self._attributes: Optional[TopicAttributes] = None
+
         # Initialize FAISS index
-        self._initialize_faiss()
+        self.faiss_index = None
+        self.index_store = None
+        self._unsaved_changes = 0
+        if self.config.persist_index and self.config.db_path != ":memory:":
+            self.index_store = IndexStore(self.config.index_path or f"{self.config.db_path}.index")
+        self._load_index()
+
+        self.query_batcher = None
+        if self.config.query_batching:
+            self.query_batcher = QueryBatcher(
+                self._search_batch,
+                max_batch_size=self.config.query_batch_size,
+                max_wait_ms=self.config.query_batch_wait_ms,
+                name="GracieQueryBatcher"
+            )
+
+    def _new_embedding_cache(self) -> EmbeddingCache:
+        """
+        Cache keyed by the encoder actually in use.
+
+        A caller-supplied encoder other than a LazySentenceTransformer
+        cannot be told apart from config.embedding_model across processes,
+        so its vectors are keyed by the instance and kept off the disk tier.
+        """
+        model, disk_path = self.config.embedding_model, self.config.embedding_cache_path
+        if isinstance(self.embedding_model, LazySentenceTransformer):
+            if self.embedding_model.kwargs or self.embedding_model.model_name != model:
+                model = repr(self.embedding_model.key)
+        else:
+            model = f"{type(self.embedding_model).__qualname__}@{id(self.embedding_model):x}"
+            if disk_path:
+                self.logger.warning("Persistent embedding cache disabled for a custom embedding model")
+                disk_path = None
+        return EmbeddingCache(model, max_entries=self.config.embedding_cache_size, disk_path=disk_path)
+
+    def warmup(self):
+        """
+        Load the embedding model and vector index dependencies up front.
+        
+        Models otherwise load on the first encode; call this at startup
+        in processes that want to pay that cost before serving queries.
+        """
+        embedding = self._encode_uncached(["warmup"])
+        if self.config.enable_faiss:
+            self._ensure_faiss(self.codec.code_dimension(embedding.shape[1]))
+
+    def _load_index(self):
+        """
+        Restore the vector index from disk and index any topics added since.
+        
+        Topics added after the snapshot was saved, or whose definition no
+        longer matches the hash saved with it, are re-embedded and topics
+        deleted since are dropped. Falls back to re-embedding every stored
+        topic when no usable snapshot exists.
+        """
+        since_rowid, updated_since, embedded_hashes = 0, None, None
+        try:
+            snapshot = self.index_store.load(mmap=self.config.mmap_index) if self.index_store else None
+            if snapshot and self._snapshot_usable(snapshot):
+                self.memory.load(snapshot.vectors, [str(i) for i in snapshot.topic_ids])
+                if snapshot.meta.get("index_type") == self.config.index_type:
+                    self.faiss_index = self._new_vector_index(
+                        snapshot.index.d, snapshot.index, self.memory.get_live_mask()
+                    )
+                else:
+                    self._initialize_faiss()
+                since_rowid = snapshot.meta["max_rowid"]
+                updated_since = snapshot.meta["updated_at"]
+                if snapshot.definition_hashes is not None:
+                    embedded_hashes = {
+                        str(topic_id): str(digest)
+                        for topic_id, digest in zip(snapshot.topic_ids, snapshot.definition_hashes) if topic_id
+                    }
+                if self.db.get_topic_count(max_rowid=since_rowid) != snapshot.meta["ntotal"]:
+                    self._drop_deleted_topics()
+                self.logger.info(f"Loaded FAISS index with {snapshot.meta['ntotal']} entries")
+            elif snapshot:
+                self.logger.info("Stored FAISS index is stale, rebuilding")
+        except Exception as e:
+            self.logger.error(f"Error loading FAISS index: {e}")
+            self.memory.clear()
+            self.faiss_index = None
+            since_rowid, updated_since, embedded_hashes = 0, None, None
+
+        if self.config.db_path == ":memory:":
+            return
+        try:
+            indexed = self._index_stored_topics(since_rowid, updated_since, embedded_hashes)
+            if indexed:
+                self.logger.info(f"Indexed {indexed} topics changed since last save")
+                self.save_index()
+        except Exception as e:
+            self.logger.error(f"FAISS initialization error: {e}")
+
+    def _snapshot_usable(self, snapshot) -> bool:
+        """Whether a snapshot was saved with this model and storage mode, restoring its codec if so."""
+        if snapshot.meta.get("embedding_model") != self.config.embedding_model:
+            return False
+        if snapshot.meta.get("storage_mode", "float32") != self.config.storage_mode:
+            return False
+        if not self.codec.lossy:
+            return True
+        return snapshot.codec_state is not None and self.codec.load_state(snapshot.codec_state)
+
+    def _drop_deleted_topics(self):
+        """Remove topics from memory and the index that no longer exist in the database."""
+        stored = set(self.db.iter_topic_ids())
+        for topic_id in self.memory.get_topic_ids():
+            if topic_id not in stored:
+                self._remove_embedding(topic_id)
+
+    def _index_stored_topics(
+        self,
+        since_rowid: int,
+        updated_since: Optional[float] = None,
+        embedded_hashes: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Embed and index database topics added after since_rowid or updated since a time.
+
+        With embedded_hashes (topic id to the hash of the definition already
+        in the index), updated topics whose definition is unchanged, such as
+        after a metadata-only update, are skipped.
+        """
+        indexed = 0
+        batches = self.db.iter_topic_definitions(
+            since_rowid, self.config.ingest_batch_size, updated_since=updated_since
+        )
+        for batch in batches:
+            if embedded_hashes is not None:
+                batch = [row for row in batch if embedded_hashes.get(row[0]) != row[2]]
+                if not batch:
+                    continue
+            embeddings = self._encode([definition for _, definition, _ in batch], use_cache=False)
+            topic_ids = [topic_id for topic_id, _, _ in batch]
+            if self.codec.lossy:
+                self.db.store_topic_embeddings(list(zip(topic_ids, self._to_blobs(embeddings))))
+            self._index_embeddings(embeddings, topic_ids)
+            indexed += len(batch)
+        return indexed
+
+    def save_index(self) -> bool:
+        """
+        Persist the FAISS index and its topic mapping next to the database.
+        
+        Returns:
+            bool: Success status
+        """
+        if self.index_store is None or self.faiss_index is None:
+            return False
+        try:
+            updated_at = time.time()
+            row_ids = [topic_id or "" for topic_id in self.memory.get_row_ids()]
+            self.index_store.save(
+                self.faiss_index.index,
+                row_ids,
+                self.memory.get_matrix(),
+                {
+                    "embedding_model": self.config.embedding_model,
+                    "index_type": self.config.index_type,
+                    "storage_mode": self.config.storage_mode,
+                    "dimension": self.faiss_index.d,
+                    "max_rowid": self.db.get_max_rowid(),
+                    "updated_at": updated_at
+                },
+                codec_state=self.codec.state() if self.codec.lossy else None,
+                definition_hashes=self._definition_hashes(row_ids)
+            )
+            self._unsaved_changes = 0
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving FAISS index: {e}")
+            return False
+
+    def _definition_hashes(self, row_ids: List[str]) -> List[str]:
+        """Stored definition hash of each indexed row, empty for removed rows."""
+        hashes = {}
+        for batch in self.db.iter_definition_hashes():
+            hashes.update(batch)
+        return [hashes.get(topic_id) or "" for topic_id in row_ids]
+
+    def export_snapshot(self, path: str, chunk_size: int = 10000) -> Dict:
+        """
+        Write every topic with its full-precision embedding to a snapshot directory.
+        
+        Topics are streamed in chunks of chunk_size, each written as JSONL
+        plus an .npy embedding matrix, so memory use does not grow with the
+        knowledge base. Nothing is re-embedded, and each topic's created_at
+        and updated_at times are exported with it.
+        
+        Args:
+            path (str): Directory to write, created if needed
+            chunk_size (int): Topics per chunk
+            
+        Returns:
+            Dict: The snapshot manifest
+        """
+        with self.metrics.span("export_snapshot"):
+            writer = SnapshotWriter(path, self.config.embedding_model, {"storage_mode": self.config.storage_mode})
+            with writer:
+                for topic_ids in self._iter_batches(self.db.iter_topic_ids(chunk_size), chunk_size):
+                    topics = self.db.get_topics_by_ids(topic_ids)
+                    timestamps = {
+                        topic_id: (created_at, updated_at)
+                        for topic_id, _, _, created_at, updated_at in self.db.get_topic_attributes(topic_ids)
+                    }
+                    writer.write(topics, self.get_embeddings([topic.id for topic in topics]), timestamps)
+        self.logger.info(f"Exported {writer.manifest['count']} topics to {path}")
+        return writer.manifest
+
+    def load_snapshot(
+        self,
+        path: str,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> IngestResult:
+        """
+        Add the topics of a snapshot written by export_snapshot, using its embeddings.
+        
+        Chunks are read one at a time and stored as add_embedded_topics
+        does, skipping the encoder, and keep the created_at and updated_at
+        times they were exported with; the index is saved when done. Topics
+        whose id or name already exists are reported as failures.
+        
+        Args:
+            path (str): Snapshot directory
+            batch_size (int): Topics per write batch, defaults to config.ingest_batch_size
+            progress_callback (Callable): Called with (processed, total) after each chunk
+            
+        Returns:
+            IngestResult: Ids of added topics and per-topic failure reasons
+            
+        Raises:
+            SnapshotError: If the snapshot is incomplete or was embedded with
+                a different model or dimension
+        """
+        reader = SnapshotReader(path)
+        reader.check(self.config.embedding_model, self._embedding_dimension())
+        result = IngestResult()
+        with self.metrics.span("load_snapshot"):
+            for topics, embeddings, timestamps in reader:
+                chunk = self.add_embedded_topics(topics, embeddings, batch_size, timestamps)
+                result.added.extend(chunk.added)
+                result.failed.update(chunk.failed)
+                if progress_callback:
+                    progress_callback(result.total, reader.count)
+        if self._unsaved_changes:
+            self.save_index()
+        self.logger.info(f"Loaded {len(result.added)} of {reader.count} topics from {path}")
+        return result
+
+    def _embedding_dimension(self) -> Optional[int]:
+        """Dimension of full-precision embeddings, if known without loading the model."""
+        for topic_id in self.db.iter_topic_ids(batch_size=1):
+            return self.get_embeddings([topic_id]).shape[1]
+        if getattr(self.embedding_model, "is_loaded", True) and hasattr(self.embedding_model, "get_sentence_embedding_dimension"):
+            return self.embedding_model.get_sentence_embedding_dimension()
+        return None
 
     def _initialize_faiss(self):
         """Initialize FAISS for vector similarity search."""
         try:
-            embeddings = self.memory.get_all_embeddings()
-            if embeddings:
-                dimension = embeddings[0].shape[0]
-                self.faiss_index = faiss.IndexFlatL2(dimension)
-                self.faiss_index.add(embeddings)
-                self.logger.info(f"FAISS initialized with {len(embeddings)} entries")
+            if len(self.memory):
+                self.faiss_index = self._new_vector_index(self.memory.dimension)
+                self.faiss_index.rebuild(*self._vector_source())
+                self.logger.info(f"FAISS initialized with {len(self.memory)} entries")
         except Exception as e:
             self.logger.error(f"FAISS initialization error: {e}")
 
+    def _ensure_faiss(self, dimension: int):
+        """Create an empty FAISS index on first insert."""
+        if self.faiss_index is None:
+            self.faiss_index = self._new_vector_index(dimension)
+
+    def _new_vector_index(self, dimension: int, index=None, live: Optional[np.ndarray] = None) -> VectorIndex:
+        options = dict(
+            index_type=self.config.index_type,
+            vector_source=self._vector_source,
+            nlist=self.config.nlist,
+            nprobe=self.config.nprobe,
+            pq_m=self.config.pq_m,
+            hnsw_m=self.config.hnsw_m,
+            ef_search=self.config.ef_search,
+            min_train_size=self.config.min_train_size,
+            retrain_drift_ratio=self.config.retrain_drift_ratio,
+            storage=self.codec.index_storage,
+            logger=self.logger
+        )
+        if index is not None:
+            return VectorIndex.from_faiss(index, live=live, **options)
+        return VectorIndex(dimension, **options)
+
+    def _vector_source(self):
+        """All memory rows (tombstones included) in index space and the mask of live ones."""
+        return self.codec.decode(self.memory.get_matrix()), self.memory.get_live_mask()
+
+    def index_report(self, k: int = 10, num_queries: int = 200, settings: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Compare recall and latency of index settings against exact search.
+        
+        Queries are sampled from the stored topic embeddings.
+        
+        Args:
+            k (int): Neighbours per query
+            num_queries (int): Number of sampled queries
+            settings (List[Dict]): VectorIndex options to evaluate, defaults to
+                the configured backend over a range of nprobe/efSearch values
+            
+        Returns:
+            List[Dict]: Recall@k and latency per setting
+        """
+        vectors = self.codec.decode(self.memory.get_matrix()[self.memory.get_live_rows()])
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)]
+        if settings is None:
+            settings = [{"index_type": "flat"}]
+            base = {
+                "index_type": self.config.index_type,
+                "nlist": self.config.nlist,
+                "pq_m": self.config.pq_m,
+                "hnsw_m": self.config.hnsw_m,
+                "min_train_size": self.config.min_train_size
+            }
+            if self.config.index_type in ("ivf_flat", "ivf_pq"):
+                settings.append({**base, "nprobe": [1, 4, 16, 64]})
+            elif self.config.index_type == "hnsw":
+                settings.append({**base, "ef_search": [16, 32, 64, 128]})
+        return recall_report(vectors, queries, k=k, configs=settings)
+
+    def storage_report(
+        self,
+        k: int = 10,
+        num_queries: int = 200,
+        modes: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Compare memory use and recall of storage modes against full-precision search.
+        
+        Each mode's codec is fitted on the stored full-precision vectors and
+        searched with an exact index over its codes, so differences come
+        from compression alone. Queries are sampled from stored vectors.
+        
+        Args:
+            k (int): Neighbours per query
+            num_queries (int): Number of sampled queries
+            modes (List[str]): Storage modes to evaluate, defaults to all
+            
+        Returns:
+            List[Dict]: Bytes per vector (memory plus index), compression
+                relative to float32, recall@k and, for lossy modes, recall@k
+                after re-ranking k * config.rerank_factor candidates
+        """
+        if self.codec.lossy:
+            chunks = [vectors for _, vectors in self._iter_full_precision()]
+            vectors = np.concatenate(chunks) if chunks else np.empty((0, 0), dtype=np.float32)
+        else:
+            vectors = self.codec.decode(self.memory.get_matrix()[self.memory.get_live_rows()])
+        if not len(vectors):
+            return []
+        dimension = vectors.shape[1]
+        k = min(k, len(vectors))
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)]
+        truth = VectorIndex(dimension)
+        truth.add(vectors)
+        expected, _ = truth.search(queries, k)
+        kth = expected[:, -1]
+        baseline = 2 * 4 * dimension
+
+        report = []
+        for mode in modes or STORAGE_MODES:
+            codec = EmbeddingCodec(mode, self.config.reduced_dimension)
+            step = max(1, len(vectors) // self.config.codec_train_size)
+            codec.train(vectors[::step][:self.config.codec_train_size])
+            index = VectorIndex(codec.code_dimension(dimension), storage=codec.index_storage)
+            index.add(codec.decode(codec.encode(vectors)))
+            index_bytes = codec.code_dimension(dimension) * {"float32": 4, "float16": 2, "int8": 1}[codec.index_storage]
+            row = {
+                "storage_mode": mode,
+                "dimension": codec.code_dimension(dimension),
+                "bytes_per_vector": codec.bytes_per_vector(dimension) + index_bytes,
+                "compression": baseline / (codec.bytes_per_vector(dimension) + index_bytes)
+            }
+            _, found = index.search(codec.project(queries), k)
+            row[f"recall@{k}"] = _recall(found, vectors, queries, kth)
+            if codec.lossy and self.config.rerank_factor > 0:
+                _, candidates = index.search(codec.project(queries), k * self.config.rerank_factor)
+                reranked = np.full((len(queries), k), -1, dtype=np.int64)
+                for i, (query, rows) in enumerate(zip(queries, candidates)):
+                    rows = rows[rows >= 0]
+                    order = np.argsort(np.sum((vectors[rows] - query) ** 2, axis=1), kind="stable")
+                    reranked[i, :min(k, len(rows))] = rows[order][:k]
+                row[f"recall@{k}_reranked"] = _recall(reranked, vectors, queries, kth)
+            report.append(row)
+        return report
+
     def add_topic(self, topic: Topic) -> bool:
         """
         Add a new topic to the knowledge base.
@@ -59,51 +553,587 @@ class GracieKnowledgeSystem:
         Returns:
             bool: Success status
         """
-        try:
-            # Generate embeddings
-            embedding = self.embedding_model.encode(topic.definition)
+        result = self.add_topics([topic], batch_size=1)
+        for error in result.failed.values():
+            self.logger.error(f"Error adding topic: {error}")
+        return result.success
+
+    def add_topics(
+        self,
+        topics: Iterable[Topic],
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> IngestResult:
+        """
+        Add many topics to the knowledge base in batches.
+        
+        Each batch is encoded with a single model call, written to the
+        database in one transaction and appended to FAISS with one ``add``.
+        
+        Args:
+            topics (Iterable[Topic]): Topics to ingest, consumed lazily
+            batch_size (int): Topics per batch, defaults to config.ingest_batch_size
+            progress_callback (Callable): Called with (processed, total) after each
+                batch; total is None when the iterable has no length
             
-            # Store in database and memory
-            self.db.store_topic(topic)
-            self.memory.add_embedding(embedding, topic.id)
+        Returns:
+            IngestResult: Ids of added topics and per-topic failure reasons
+        """
+        batch_size = batch_size or self.config.ingest_batch_size
+        total = len(topics) if hasattr(topics, '__len__') else None
+        result = IngestResult()
+
+        for batch in self._iter_batches(topics, batch_size):
+            self._add_batch(batch, result)
+            if progress_callback:
+                progress_callback(result.total, total)
+            if total is None or total > batch_size:
+                self.logger.info(
+                    f"Ingested {result.total}{f'/{total}' if total else ''} topics "
+                    f"({len(result.failed)} failed)"
+                )
+
+        return result
+
+    @staticmethod
+    def _iter_batches(topics: Iterable[Topic], batch_size: int) -> Iterator[List[Topic]]:
+        iterator = iter(topics)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def _add_batch(self, batch: List[Topic], result: IngestResult):
+        """Encode, store and index one batch, recording failures per topic."""
+        valid = []
+        for topic in batch:
+            if not topic.name or not Validator.validate_embedding_input(topic.definition):
+                result.failed[topic.id] = "Topic requires a name and a non-empty definition"
+                self.metrics.error("validate")
+            else:
+                valid.append(topic)
+        if not valid:
+            return
+
+        try:
+            embeddings = self._encode([topic.definition for topic in valid], use_cache=False)
+        except Exception as e:
+            for topic in valid:
+                result.failed[topic.id] = f"Embedding error: {e}"
+            return
+        self._store_batch(valid, embeddings, result)
+
+    def add_embedded_topics(
+        self,
+        topics: List[Topic],
+        embeddings: np.ndarray,
+        batch_size: Optional[int] = None,
+        timestamps: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> IngestResult:
+        """
+        Add topics whose embeddings were already computed, skipping the encoder.
+        
+        Used to move topics between knowledge systems (such as shards)
+        built on the same embedding model.
+        
+        Args:
+            topics (List[Topic]): Topics to store
+            embeddings (np.ndarray): One row per topic, in the same order
+            batch_size (int): Topics per batch, defaults to config.ingest_batch_size
+            timestamps (Dict): (created_at, updated_at) epoch seconds to keep, by
+                topic id; topics left out are stamped now
             
-            # Update FAISS index
-            if self.config.enable_faiss:
-                self.faiss_index.add(embedding.reshape(1, -1))
+        Returns:
+            IngestResult: Ids of added topics and per-topic failure reasons
+        """
+        batch_size = batch_size or self.config.ingest_batch_size
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        result = IngestResult()
+        for start in range(0, len(topics), batch_size):
+            self._store_batch(
+                topics[start:start + batch_size], embeddings[start:start + batch_size], result, timestamps
+            )
+        return result
+
+    def _store_batch(
+        self,
+        valid: List[Topic],
+        embeddings: np.ndarray,
+        result: IngestResult,
+        timestamps: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        """Write one encoded batch to the database and the index."""
+        with self.metrics.span("db_write"):
+            failures = self.db.store_topics(valid, self._to_blobs(embeddings) if self.codec.lossy else None, timestamps)
+        if failures:
+            self.metrics.error("db_write")
+        result.failed.update(failures)
+        stored = [i for i, topic in enumerate(valid) if topic.id not in failures]
+        if not stored:
+            return
+
+        embeddings = embeddings[stored]
+        topic_ids = [valid[i].id for i in stored]
+        try:
+            with self.metrics.span("index_add"):
+                self._index_embeddings(embeddings, topic_ids)
+            result.added.extend(topic_ids)
+        except Exception as e:
+            for topic_id in topic_ids:
+                result.failed[topic_id] = f"Indexing error: {e}"
+            return
+
+        self._refresh_attributes(topic_ids)
+        self._unsaved_changes += len(topic_ids)
+        if self._codec_needs_retraining():
+            self.retrain_codec()
+        if self._unsaved_changes >= self.config.index_autosave_interval:
+            self.save_index()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with the knowledge system's model and embedding cache.
+        
+        Args:
+            texts (List[str]): Texts to embed
             
+        Returns:
+            np.ndarray: float32 embedding matrix in input order
+        """
+        return self._encode(list(texts))
+
+    def _encode(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """Embed texts; bulk ingestion skips the cache so it cannot flush hot queries."""
+        if use_cache:
+            return self.embedding_cache.encode(texts, self._encode_uncached)
+        return self._encode_uncached(texts)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        with self.metrics.span("encode"):
+            return np.asarray(
+                self.embedding_model.encode(texts, batch_size=len(texts), show_progress_bar=False),
+                dtype=np.float32
+            )
+
+    def _index_embeddings(self, embeddings: np.ndarray, topic_ids: List[str]):
+        """Encode embeddings into codes and write them to memory and the index, updating known topics in place."""
+        if not self.codec.is_trained:
+            self.codec.train(embeddings[:self.config.codec_train_size])
+        codes = self.codec.encode(embeddings)
+        known = any(topic_id in self.memory for topic_id in topic_ids)
+        self.memory.add_embeddings(codes, topic_ids)
+        if self.config.enable_faiss:
+            self._ensure_faiss(codes.shape[1])
+            rows = np.array([self.memory.get_row(topic_id) for topic_id in topic_ids], dtype=np.int64)
+            if known:
+                self.faiss_index.update(self.codec.decode(codes), rows)
+            else:
+                self.faiss_index.add(self.codec.decode(codes), rows)
+
+    @staticmethod
+    def _to_blobs(embeddings: np.ndarray) -> List[bytes]:
+        return [np.asarray(embedding, dtype=np.float32).tobytes() for embedding in embeddings]
+
+    def _codec_needs_retraining(self) -> bool:
+        """Refit while the codec was trained on a small share of what is now stored."""
+        return (
+            self.codec.requires_training
+            and self.codec.trained_on < self.config.codec_train_size
+            and len(self.memory) >= 4 * self.codec.trained_on
+        )
+
+    def retrain_codec(self) -> bool:
+        """
+        Refit the storage codec on stored full-precision vectors and re-encode every topic.
+        
+        Runs automatically as a lossy store grows, until the codec has been
+        fitted on config.codec_train_size vectors; call it directly after
+        bulk changes to the embedding distribution.
+        
+        Returns:
+            bool: Success status
+        """
+        if not self.codec.lossy:
+            return False
+        try:
+            total = self.db.get_topic_count()
+            step = max(1, total // self.config.codec_train_size)
+            sample = [vectors[::step] for _, vectors in self._iter_full_precision()]
+            if not sample:
+                return False
+            self.codec.train(np.concatenate(sample)[:self.config.codec_train_size])
+
+            self.memory.clear()
+            self._attributes = None
+            for topic_ids, vectors in self._iter_full_precision():
+                self.memory.add_embeddings(self.codec.encode(vectors), topic_ids)
+            if self.faiss_index is not None:
+                self.faiss_index.rebuild(*self._vector_source())
+            self._unsaved_changes += len(self.memory)
+            self.logger.info(f"Retrained {self.codec.mode} storage codec on {self.codec.trained_on} vectors")
             return True
         except Exception as e:
-            self.logger.error(f"Error adding topic: {e}")
+            self.logger.error(f"Error retraining storage codec: {e}")
             return False
 
-    def get_relevant_knowledge(self, query: str, top_k: int = 5) -> List[Topic]:
+    def _iter_full_precision(self, batch_size: int = 10000) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """Stored full-precision embeddings in insertion order, re-encoding topics that have none."""
+        for batch in self.db.iter_topic_embeddings(batch_size):
+            missing = [topic_id for topic_id, embedding in batch if embedding is None]
+            encoded = {}
+            if missing:
+                topics = self.db.get_topics_by_ids(missing)
+                vectors = self._encode([topic.definition for topic in topics], use_cache=False)
+                self.db.store_topic_embeddings([(topic.id, blob) for topic, blob in zip(topics, self._to_blobs(vectors))])
+                encoded = {topic.id: vector for topic, vector in zip(topics, vectors)}
+            topic_ids, vectors = [], []
+            for topic_id, embedding in batch:
+                vector = np.frombuffer(embedding, dtype=np.float32) if embedding is not None else encoded.get(topic_id)
+                if vector is not None:
+                    topic_ids.append(topic_id)
+                    vectors.append(vector)
+            if topic_ids:
+                yield topic_ids, np.stack(vectors)
+
+    def _remove_embedding(self, topic_id: str):
+        row = self.memory.remove_embedding(topic_id)
+        if row is not None and self.faiss_index is not None:
+            self.faiss_index.remove(np.array([row], dtype=np.int64))
+        if self.memory.needs_compaction:
+            self._compact()
+
+    def _compact(self):
+        """Reclaim tombstoned rows; row ids change, so the index is rebuilt."""
+        mapping = self.memory.compact()
+        if self._attributes is not None:
+            self._attributes.compact(np.flatnonzero(mapping >= 0))
+        if self.faiss_index is not None:
+            self.faiss_index.rebuild(*self._vector_source())
+
+    def _topic_attributes(self) -> TopicAttributes:
+        """Filterable attributes of every topic in memory, read from the database on first use."""
+        if self._attributes is None:
+            attributes = TopicAttributes()
+            for batch in self.db.iter_topic_attributes():
+                self._set_attributes(attributes, batch)
+            self._attributes = attributes
+        return self._attributes
+
+    def _set_attributes(self, attributes: TopicAttributes, records: List[Tuple]):
+        rows, values = [], []
+        for topic_id, *record in records:
+            row = self.memory.get_row(topic_id)
+            if row is not None:
+                rows.append(row)
+                values.append(record)
+        attributes.set(np.array(rows, dtype=np.int64), values)
+
+    def _refresh_attributes(self, topic_ids: List[str]):
+        """Re-read attributes of written topics once filtering has loaded them."""
+        if self._attributes is not None:
+            self._set_attributes(self._attributes, self.db.get_topic_attributes(topic_ids))
+
+    def _filter_mask(self, spec: Optional[FilterSpec]) -> Optional[np.ndarray]:
+        """Live memory rows matching a filter, or None when there is nothing to filter."""
+        conditions = parse_filter(spec)
+        if not conditions:
+            return None
+        with self.metrics.span("filter"):
+            live = self.memory.get_live_mask()
+            return self._topic_attributes().mask(conditions, len(live)) & live
+
+    def get_relevant_knowledge(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        filter: Optional[FilterSpec] = None
+    ) -> List[Topic]:
         """
         Retrieve relevant knowledge based on query.
         
+        Dense vector matches are fused with BM25 matches over topic names,
+        definitions and facts by reciprocal rank fusion. Topics are kept if
+        their embedding similarity reaches config.confidence_threshold or
+        they contain at least config.lexical_min_overlap of the query's
+        terms, stopwords aside. With config.query_batching
+        enabled, concurrent unfiltered calls are coalesced and encoded and
+        searched together.
+        
+        A filter restricts the search itself to matching topics, so up to
+        top_k of them are returned however few topics match overall.
+        
         Args:
             query (str): Search query
-            top_k (int): Number of results to return
+            top_k (int): Number of results to return, defaults to config.max_contexts
+            filter (FilterSpec): Conditions on namespace, confidence, created_at
+                or updated_at, e.g. "namespace == 'a' and confidence >= 0.5"
+                (see filters.parse_filter)
             
         Returns:
             List[Topic]: List of relevant topics
         """
+        top_k = top_k or self.config.max_contexts
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode(query)
-            
-            # Search with FAISS
-            if self.config.enable_faiss:
-                D, I = self.faiss_index.search(
-                    query_embedding.reshape(1, -1), 
-                    top_k
-                )
-                topic_ids = [self.memory.get_topic_id(idx) for idx in I[0]]
-                return self.db.get_topics_by_ids(topic_ids)
-            
+            with self.metrics.span("retrieve"):
+                if self.query_batcher is not None and not filter:
+                    return self.query_batcher.query(query, top_k)
+                return self._search_batch([query], top_k, filter)[0]
+        except Exception as e:
+            self.logger.error(f"Error retrieving knowledge: {e}")
             return []
+
+    def get_relevant_knowledge_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        filter: Optional[FilterSpec] = None
+    ) -> List[List[Topic]]:
+        """
+        Retrieve relevant knowledge for many queries at once.
+        
+        All queries are encoded in one model call and searched with one
+        multi-row FAISS search.
+        
+        Args:
+            queries (List[str]): Search queries
+            top_k (int): Number of results per query, defaults to config.max_contexts
+            filter (FilterSpec): Conditions applied to every query
+            
+        Returns:
+            List[List[Topic]]: Relevant topics for each query, in query order
+        """
+        try:
+            with self.metrics.span("retrieve_batch"):
+                return self._search_batch(queries, top_k or self.config.max_contexts, filter)
         except Exception as e:
             self.logger.error(f"Error retrieving knowledge: {e}")
+            return [[] for _ in queries]
+
+    def _search_batch(self, queries: List[str], top_k: int, filter: Optional[FilterSpec] = None) -> List[List[Topic]]:
+        if not queries:
             return []
+        candidates = self.search_candidates(queries, self._encode(list(queries)), top_k, filter)
+        ranked = [
+            fuse_rankings(self.config, dense, [(topic_id, overlap) for topic_id, _, overlap in lexical], top_k)
+            for dense, lexical in candidates
+        ]
+        with self.metrics.span("db_fetch"):
+            topics = {
+                topic.id: topic
+                for topic in self.db.get_topics_by_ids([topic_id for row in ranked for topic_id in row])
+            }
+        return [[topics[topic_id] for topic_id in row if topic_id in topics] for row in ranked]
+
+    def search_candidates(
+        self,
+        queries: List[str],
+        query_embeddings: np.ndarray,
+        top_k: int,
+        filter: Optional[FilterSpec] = None
+    ) -> List[Tuple[List[Tuple[str, float]], List[Tuple[str, float, float]]]]:
+        """
+        Unfused dense and lexical candidates for each query.
+
+        With hybrid search, top_k * config.hybrid_candidates candidates are
+        taken from each retriever, ready for fuse_rankings.
+
+        Returns:
+            List of (dense, lexical) pairs in query order: dense holds
+                (topic id, cosine similarity) nearest first, lexical holds
+                (topic id, bm25 score, term overlap) best first
+        """
+        allowed = self._filter_mask(filter)
+        hybrid = self.config.hybrid_search and self.db.fts_enabled
+        pool = top_k * self.config.hybrid_candidates if hybrid else top_k
+        dense = self._dense_search(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)), pool, allowed)
+
+        candidates = []
+        for query, hits in zip(queries, dense):
+            lexical = []
+            if hybrid:
+                with self.metrics.span("lexical_search"):
+                    lexical = self.db.search_topics_lexical(query, pool)
+                if allowed is not None:
+                    lexical = [hit for hit in lexical if self._is_allowed(hit[0], allowed)]
+            candidates.append((hits, lexical))
+        return candidates
+
+    def _is_allowed(self, topic_id: str, allowed: np.ndarray) -> bool:
+        row = self.memory.get_row(topic_id)
+        return row is not None and row < len(allowed) and bool(allowed[row])
+
+    def _dense_search(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """(topic id, cosine similarity) nearest-first for each query row."""
+        return [
+            [(topic_id, cosine) for topic_id, cosine, _ in hits]
+            for hits in self._nearest(query_embeddings, k, allowed)
+        ]
+
+    def _nearest(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[str, float, float]]]:
+        """
+        (topic id, cosine similarity, squared L2 distance) nearest-first for each query row.
+        
+        With a lossy storage mode, k * config.rerank_factor candidates are
+        found on the codes and re-ranked with full-precision vectors read
+        from the database. allowed restricts the search to a mask of
+        memory rows.
+        """
+        if not self.config.enable_faiss or self.faiss_index is None:
+            return [[] for _ in query_embeddings]
+        rerank = self.codec.lossy and self.config.rerank_factor > 0
+        projected = self.codec.project(query_embeddings)
+        search_k = k * self.config.rerank_factor if rerank else k
+        with self.metrics.span("index_search"):
+            if allowed is None:
+                D, I = self.faiss_index.search(projected, search_k)
+            else:
+                D, I = self._filtered_search(projected, search_k, allowed)
+        matrix = self.memory.get_matrix()
+        results = []
+        for query, distances, rows in zip(projected, D, I):
+            hits = []
+            for distance, row in zip(distances, rows):
+                topic_id = self.memory.get_topic_id(row) if row >= 0 else None
+                if topic_id is None:
+                    continue
+                hits.append((
+                    topic_id,
+                    _cosine(query, self.codec.decode(matrix[row])),
+                    float(distance) * self.codec.distance_scale
+                ))
+            results.append(hits)
+        if rerank:
+            results = self._rerank(np.atleast_2d(query_embeddings), results, k)
+        return results
+
+    def _filtered_search(self, projected: np.ndarray, k: int, allowed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search only allowed rows, returning min(k, matching rows) results per query.
+        
+        Small matching sets are scanned exhaustively; larger ones are passed
+        to FAISS as a selector, and queries for which HNSW or IVF probing
+        found too few matching rows are answered exhaustively instead.
+        """
+        rows = np.flatnonzero(allowed)
+        if len(rows) <= self.config.filter_exact_threshold:
+            return self._exact_search(projected, rows, k)
+        D, I = self.faiss_index.search(projected, k, allowed=allowed)
+        short = (I >= 0).sum(axis=1) < min(k, len(rows))
+        if short.any():
+            D[short], I[short] = self._exact_search(projected[short], rows, k)
+        return D, I
+
+    def _exact_search(self, projected: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force k nearest of the given memory rows, shaped like a FAISS result."""
+        D = np.full((len(projected), k), np.inf, dtype=np.float32)
+        I = np.full((len(projected), k), -1, dtype=np.int64)
+        found = min(k, len(rows))
+        if not found:
+            return D, I
+        vectors = self.codec.decode(self.memory.get_matrix()[rows])
+        distances = (
+            np.sum(projected ** 2, axis=1, keepdims=True)
+            - 2 * projected @ vectors.T
+            + np.sum(vectors ** 2, axis=1)
+        )
+        nearest = np.argpartition(distances, found - 1, axis=1)[:, :found]
+        order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        D[:, :found] = np.maximum(np.take_along_axis(distances, nearest, axis=1), 0)
+        I[:, :found] = rows[nearest]
+        return D, I
+
+    def _rerank(
+        self,
+        query_embeddings: np.ndarray,
+        candidates: List[List[Tuple[str, float, float]]],
+        k: int
+    ) -> List[List[Tuple[str, float, float]]]:
+        """Rescore candidates against full-precision vectors and keep the k nearest."""
+        with self.metrics.span("rerank"):
+            stored = self.db.get_topic_embeddings([topic_id for hits in candidates for topic_id, _, _ in hits])
+            results = []
+            for query, hits in zip(query_embeddings.astype(np.float32), candidates):
+                rescored = []
+                for topic_id, cosine, distance in hits:
+                    if topic_id in stored:
+                        vector = np.frombuffer(stored[topic_id], dtype=np.float32)
+                        cosine, distance = _cosine(query, vector), float(np.sum((query - vector) ** 2))
+                    rescored.append((topic_id, cosine, distance))
+                rescored.sort(key=lambda hit: hit[2])
+                results.append(rescored[:k])
+        return results
+
+    def search_vectors(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 5,
+        filter: Optional[FilterSpec] = None
+    ) -> List[List[Tuple[Topic, float]]]:
+        """
+        Search with precomputed query embeddings.
+        
+        Args:
+            query_embeddings (np.ndarray): One query per row
+            top_k (int): Number of results per query
+            filter (FilterSpec): Conditions matching topics must meet
+            
+        Returns:
+            List[List[Tuple[Topic, float]]]: (topic, L2 distance) pairs per
+                query, nearest first
+        """
+        query_embeddings = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        hits = self._nearest(query_embeddings, top_k, self._filter_mask(filter))
+        with self.metrics.span("db_fetch"):
+            topics = {
+                topic.id: topic
+                for topic in self.db.get_topics_by_ids([topic_id for row in hits for topic_id, _, _ in row])
+            }
+        return [[(topics[topic_id], distance) for topic_id, _, distance in row if topic_id in topics] for row in hits]
+
+    def get_embeddings(self, topic_ids: List[str]) -> np.ndarray:
+        """
+        Stored embeddings for topics, encoding any that are not held in memory.
+        
+        Args:
+            topic_ids (List[str]): Ids of stored topics
+            
+        Returns:
+            np.ndarray: One float32 row per id, in the same order
+        """
+        if self.codec.lossy:
+            # Memory holds codes; full-precision vectors are read back from the database
+            encoded = {
+                topic_id: np.frombuffer(embedding, dtype=np.float32)
+                for topic_id, embedding in self.db.get_topic_embeddings(topic_ids).items()
+            }
+            missing = [topic_id for topic_id in topic_ids if topic_id not in encoded]
+        else:
+            encoded = {}
+            missing = [topic_id for topic_id in topic_ids if topic_id not in self.memory]
+        if missing:
+            topics = self.db.get_topics_by_ids(missing)
+            if len(topics) != len(set(missing)):
+                raise KeyError(f"{len(set(missing)) - len(topics)} topics do not exist")
+            vectors = self._encode([topic.definition for topic in topics], use_cache=False)
+            encoded.update((topic.id, vector) for topic, vector in zip(topics, vectors))
+        if not topic_ids:
+            return np.empty((0, self.memory.dimension or 0), dtype=np.float32)
+        return np.stack([
+            encoded[topic_id] if topic_id in encoded else self.memory.get_embedding(topic_id)
+            for topic_id in topic_ids
+        ]).astype(np.float32)
 
     def update_topic(self, topic: Topic) -> bool:
         """
@@ -116,22 +1146,74 @@ class GracieKnowledgeSystem:
             bool: Success status
         """
         try:
-            # Update database
-            success = self.db.update_topic(topic)
-            if success:
-                # Update embeddings
-                embedding = self.embedding_model.encode(topic.definition)
-                self.memory.update_embedding(embedding, topic.id)
-                
-                # Rebuild FAISS index if needed
-                if self.config.enable_faiss:
-                    self._initialize_faiss()
-            
-            return success
+            with self.metrics.span("update"):
+                existing = self.db.get_topic(topic.id)
+                if existing is None:
+                    self.logger.error(f"Error updating topic: {topic.id} does not exist")
+                    self.metrics.error("update")
+                    return False
+
+                # Update database
+                success = self.db.update_topic(topic)
+                if not success:
+                    self.metrics.error("db_write")
+                elif existing.definition != topic.definition or topic.id not in self.memory:
+                    # Re-embed only when the indexed text changed
+                    embeddings = self._encode([topic.definition])
+                    if self.codec.lossy:
+                        self.db.store_topic_embeddings([(topic.id, self._to_blobs(embeddings)[0])])
+                    self._index_embeddings(embeddings, [topic.id])
+                    self._unsaved_changes += 1
+                if success:
+                    self._refresh_attributes([topic.id])
+                return success
         except Exception as e:
             self.logger.error(f"Error updating topic: {e}")
             return False
 
+    def delete_topic(self, topic_id: str) -> bool:
+        """
+        Remove a topic from the knowledge base.
+        
+        Args:
+            topic_id (str): Id of the topic to remove
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            with self.metrics.span("delete"):
+                success = self.db.delete_topic(topic_id)
+                if success:
+                    self._remove_embedding(topic_id)
+                    self._unsaved_changes += 1
+                return success
+        except Exception as e:
+            self.logger.error(f"Error deleting topic: {e}")
+            return False
+
+    def delete_topics(self, topic_ids: List[str]) -> int:
+        """
+        Remove many topics in one database transaction.
+        
+        Args:
+            topic_ids (List[str]): Ids of the topics to remove
+            
+        Returns:
+            int: Number of topics removed
+        """
+        try:
+            existing = {topic.id for topic in self.db.get_topics_by_ids(topic_ids)}
+            removed = self.db.delete_topics(list(existing))
+            if removed:
+                for topic_id in existing:
+                    self._remove_embedding(topic_id)
+                self._unsaved_changes += removed
+            return removed
+        except Exception as e:
+            self.logger.error(f"Error deleting topics: {e}")
+            return 0
+
     def get_stats(self) -> Dict:
         """Get system statistics and metrics."""
         try:
@@ -139,8 +1221,31 @@ class GracieKnowledgeSystem:
                 "total_topics": self.db.get_topic_count(),
                 "total_interactions": self.db.get_interaction_count(),
                 "memory_usage": self.memory.get_usage_stats(),
+                "storage": {
+                    "mode": self.codec.mode,
+                    "dimension": self.memory.dimension,
+                    "bytes_per_vector": self.memory.dimension * self.codec.code_dtype.itemsize if self.memory.dimension else None,
+                    "codec_trained_on": self.codec.trained_on,
+                    "rerank_factor": self.config.rerank_factor if self.codec.lossy else 0
+                },
+                "embedding_cache": self.embedding_cache.get_stats(),
+                "query_batcher": self.query_batcher.get_stats() if self.query_batcher else None,
+                "metrics": self.metrics.snapshot(),
                 "last_updated": self.db.get_last_update_time()
             }
         except Exception as e:
             self.logger.error(f"Error getting stats: {e}")
             return {}
+
+    def export_metrics(self) -> str:
+        """Stage latency histograms and error counters in Prometheus text format."""
+        return self.metrics.to_prometheus()
+
+    def close(self):
+        """Persist pending index changes and release database handles."""
+        if self.query_batcher is not None:
+            self.query_batcher.close()
+        if self._unsaved_changes:
+            self.save_index()
+        self.embedding_cache.close()
+        self.db.close()
@@ -1,24 +1,201 @@
 # gracie/core/memory_manager.py
+import sys
 from typing import List, Optional, Dict
 import numpy as np
-import faiss
 
 class MemoryManager:
-    """Manages memory and embeddings"""
-    def __init__(self, enable_faiss: bool = True):
+    """
+    Manages memory and embeddings.
+
+    Embeddings live in one contiguous matrix that grows geometrically. Each
+    topic owns a row; ``_rows`` maps topic ids to rows and ``_row_ids`` maps
+    rows back to topic ids, so both lookups are O(1). Removed rows are
+    tombstoned and reclaimed by ``compact``.
+    """
+    def __init__(
+        self,
+        enable_faiss: bool = True,
+        dtype: str = "float32",
+        initial_capacity: int = 1024,
+        compaction_threshold: float = 0.25
+    ):
         self.enable_faiss = enable_faiss
-        self.embeddings = {}
-        self.topic_map = {}
-        
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = initial_capacity
+        self.compaction_threshold = compaction_threshold
+        self._matrix: Optional[np.ndarray] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._row_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._tombstones = 0
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, topic_id: str) -> bool:
+        return topic_id in self._rows
+
     def add_embedding(self, embedding: np.ndarray, topic_id: str):
-        self.embeddings[topic_id] = embedding
-        self.topic_map[len(self.embeddings) - 1] = topic_id
-        
+        self.add_embeddings(np.asarray(embedding).reshape(1, -1), [topic_id])
+
+    def add_embeddings(self, embeddings: np.ndarray, topic_ids: List[str]):
+        """Append embeddings as new rows; existing topic ids are updated in place."""
+        embeddings = np.asarray(embeddings)
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+        if any(topic_id in self._rows for topic_id in topic_ids):
+            for embedding, topic_id in zip(embeddings, topic_ids):
+                if topic_id in self._rows:
+                    self.update_embedding(embedding, topic_id)
+                else:
+                    self.add_embedding(embedding, topic_id)
+            return
+
+        count = len(topic_ids)
+        self._reserve(self._size + count, embeddings.shape[1])
+        self._matrix[self._size:self._size + count] = embeddings
+        self._live[self._size:self._size + count] = True
+        for offset, topic_id in enumerate(topic_ids):
+            self._rows[topic_id] = self._size + offset
+        self._row_ids.extend(topic_ids)
+        self._size += count
+
+    def load(self, matrix: np.ndarray, row_ids: List[Optional[str]]):
+        """Adopt a (possibly memory-mapped) matrix without copying it; empty ids are tombstones."""
+        self.clear()
+        self._matrix = matrix if matrix.dtype == self.dtype else matrix.astype(self.dtype)
+        self._size = len(row_ids)
+        self._row_ids = [topic_id or None for topic_id in row_ids]
+        self._rows = {topic_id: row for row, topic_id in enumerate(self._row_ids) if topic_id is not None}
+        self._live = np.array([topic_id is not None for topic_id in self._row_ids], dtype=bool)
+        self._tombstones = self._size - len(self._rows)
+
+    def update_embedding(self, embedding: np.ndarray, topic_id: str) -> Optional[int]:
+        """Overwrite a topic's embedding in place, adding it if unknown."""
+        row = self._rows.get(topic_id)
+        if row is None:
+            self.add_embedding(embedding, topic_id)
+            return self._rows[topic_id]
+        self._ensure_writable()
+        self._matrix[row] = embedding
+        return row
+
+    def remove_embedding(self, topic_id: str) -> Optional[int]:
+        """Tombstone a topic's row and return it, or None if unknown."""
+        row = self._rows.pop(topic_id, None)
+        if row is not None:
+            self._row_ids[row] = None
+            self._live[row] = False
+            self._tombstones += 1
+        return row
+
+    def get_embedding(self, topic_id: str) -> Optional[np.ndarray]:
+        row = self._rows.get(topic_id)
+        return None if row is None else self._matrix[row]
+
+    def get_row(self, topic_id: str) -> Optional[int]:
+        return self._rows.get(topic_id)
+
+    def get_topic_id(self, index: int) -> Optional[str]:
+        index = int(index)
+        if 0 <= index < self._size:
+            return self._row_ids[index]
+        return None
+
+    def get_matrix(self) -> np.ndarray:
+        """All rows in row order, tombstones included."""
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=self.dtype)
+        return self._matrix[:self._size]
+
+    def get_live_mask(self) -> np.ndarray:
+        return self._live[:self._size]
+
+    def get_live_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.get_live_mask())
+
+    def get_row_ids(self) -> List[Optional[str]]:
+        """Topic id of every row, None for tombstones."""
+        return list(self._row_ids)
+
     def get_all_embeddings(self) -> List[np.ndarray]:
-        return list(self.embeddings.values())
-        
+        return list(self.get_matrix()[self.get_live_rows()])
+
+    def get_topic_ids(self) -> List[str]:
+        """Live topic ids in row order."""
+        return [topic_id for topic_id in self._row_ids if topic_id is not None]
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self._size > 0 and self._tombstones / self._size >= self.compaction_threshold
+
+    def compact(self) -> np.ndarray:
+        """
+        Drop tombstoned rows.
+
+        Returns:
+            np.ndarray: New row for every old row, -1 for removed ones
+        """
+        live = self.get_live_rows()
+        mapping = np.full(self._size, -1, dtype=np.int64)
+        mapping[live] = np.arange(len(live))
+        if self._matrix is not None:
+            self._matrix = np.array(self._matrix[live], dtype=self.dtype)
+        self._row_ids = [self._row_ids[row] for row in live]
+        self._live = np.ones(len(live), dtype=bool)
+        self._rows = {topic_id: row for row, topic_id in enumerate(self._row_ids)}
+        self._size = len(live)
+        self._tombstones = 0
+        return mapping
+
+    def clear(self):
+        self._matrix = None
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._row_ids = []
+        self._rows = {}
+        self._tombstones = 0
+
+    def _reserve(self, rows: int, dimension: int):
+        if self._matrix is None:
+            self._matrix = np.empty((max(rows, self.initial_capacity), dimension), dtype=self.dtype)
+            self._live = np.zeros(self._matrix.shape[0], dtype=bool)
+            return
+        if rows <= self._matrix.shape[0] and self._matrix.flags.writeable:
+            return
+        capacity = self._matrix.shape[0]
+        if rows > capacity:
+            capacity = max(rows, capacity * 2)
+        matrix = np.empty((capacity, dimension), dtype=self.dtype)
+        matrix[:self._size] = self._matrix[:self._size]
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._matrix, self._live = matrix, live
+
+    def _ensure_writable(self):
+        """Copy a read-only (memory-mapped) matrix before the first write."""
+        if self._matrix is not None and not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix, dtype=self.dtype)
+
     def get_usage_stats(self) -> Dict:
+        matrix_bytes = (0 if self._matrix is None else self._matrix.nbytes) + self._live.nbytes
+        index_bytes = sys.getsizeof(self._rows) + sys.getsizeof(self._row_ids)
+        if self._row_ids:
+            # Topic id strings are shared between both maps; sample their size
+            sample = [topic_id for topic_id in self._row_ids[:100] if topic_id is not None]
+            if sample:
+                index_bytes += len(self._rows) * sum(map(sys.getsizeof, sample)) // len(sample)
         return {
-            "total_embeddings": len(self.embeddings),
-            "memory_size_mb": sum(e.nbytes for e in self.embeddings.values()) / 1024 / 1024
+            "total_embeddings": len(self._rows),
+            "tombstones": self._tombstones,
+            "capacity": 0 if self._matrix is None else self._matrix.shape[0],
+            "dtype": self.dtype.name,
+            "memory_mapped": isinstance(self._matrix, np.memmap),
+            "matrix_size_mb": matrix_bytes / 1024 / 1024,
+            "memory_size_mb": (matrix_bytes + index_bytes) / 1024 / 1024
         }
@@ -0,0 +1,87 @@
+# gracie/core/model_registry.py
+import threading
+from typing import Any, Callable, Dict, Hashable, List
+from ..utils.lazy import lazy_import
+from ..utils.logger import setup_logger
+
+sentence_transformers = lazy_import("sentence_transformers")
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Models are keyed by kind and name, loaded once on first request and
+    shared by every caller asking for the same key. Concurrent first
+    requests for one key wait for a single load.
+    """
+    def __init__(self):
+        self.logger = setup_logger('GracieModels')
+        self._models: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the model for key, calling loader the first time it is needed"""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                self.logger.info(f"Loading model {key}")
+                model = self._models[key] = loader()
+        return model
+
+    def is_loaded(self, key: Hashable) -> bool:
+        return key in self._models
+
+    def loaded(self) -> List[Hashable]:
+        return list(self._models)
+
+    def release(self, key: Hashable) -> bool:
+        """Drop a model so it can be garbage collected once callers let go of it"""
+        with self._lock:
+            self._key_locks.pop(key, None)
+            return self._models.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+
+registry = ModelRegistry()
+
+class LazySentenceTransformer:
+    """
+    SentenceTransformer handle that loads the shared model on first use.
+
+    Every handle for the same model name and options resolves to one
+    instance in the process-wide registry.
+    """
+    def __init__(self, model_name: str, **kwargs):
+        self.model_name = model_name
+        self.kwargs = kwargs
+        self.key = ("sentence_transformer", model_name, tuple(sorted(kwargs.items())))
+
+    @property
+    def model(self):
+        return registry.get(
+            self.key,
+            lambda: sentence_transformers.SentenceTransformer(self.model_name, **self.kwargs)
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        return registry.is_loaded(self.key)
+
+    def encode(self, *args, **kwargs):
+        return self.model.encode(*args, **kwargs)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def warmup(self):
+        """Load the model now instead of on the first encode"""
+        self.model.encode(["warmup"], show_progress_bar=False)
@@ -0,0 +1,136 @@
+# gracie/core/quantization.py
+from typing import Dict, Optional
+import numpy as np
+
+STORAGE_MODES = ("float32", "float16", "int8", "pca", "matryoshka")
+
+# Share of absolute component values that int8 codes represent without clipping
+INT8_RANGE_QUANTILE = 0.9999
+
+class EmbeddingCodec:
+    """
+    Maps full-precision embeddings to the compact codes held in memory and the index.
+
+    Codes live in an "index space" that FAISS searches directly:
+
+    - ``float16``: half-precision components, 2 bytes each.
+    - ``int8``: components divided by one shared scale and rounded to
+      [-127, 127], 1 byte each. Because the scale is uniform, cosine
+      similarity in index space equals the original cosine and squared L2
+      distances differ only by ``distance_scale``.
+    - ``pca``: projection onto the top ``reduced_dimension`` eigenvectors of
+      the (uncentered) second-moment matrix, so dot products in the
+      dominant subspace are preserved.
+    - ``matryoshka``: the leading ``reduced_dimension`` components, for
+      models trained so that prefixes of the embedding remain useful.
+
+    ``int8`` and ``pca`` are fitted with ``train``; the others need no
+    training.
+    """
+    def __init__(self, mode: str = "float32", reduced_dimension: int = 128, base_dtype: str = "float32"):
+        if mode not in STORAGE_MODES:
+            raise ValueError(f"Unsupported storage mode: {mode}")
+        self.mode = mode
+        self.reduced_dimension = reduced_dimension
+        self.base_dtype = np.dtype(base_dtype)
+        self.scale: Optional[float] = None
+        self.components: Optional[np.ndarray] = None
+        self.trained_on = 0
+
+    @property
+    def lossy(self) -> bool:
+        """Whether codes lose information, so full-precision vectors are worth keeping on disk."""
+        return self.mode != "float32"
+
+    @property
+    def requires_training(self) -> bool:
+        return self.mode in ("int8", "pca")
+
+    @property
+    def is_trained(self) -> bool:
+        return not self.requires_training or self.trained_on > 0
+
+    @property
+    def code_dtype(self) -> np.dtype:
+        if self.mode == "float32":
+            return self.base_dtype
+        return np.dtype({"float16": "float16", "int8": "int8"}.get(self.mode, "float32"))
+
+    @property
+    def index_storage(self) -> str:
+        """VectorIndex storage type matching the codes."""
+        return self.mode if self.mode in ("float16", "int8") else "float32"
+
+    @property
+    def distance_scale(self) -> float:
+        """Factor converting squared L2 distances in index space back to the original space."""
+        return self.scale ** 2 if self.mode == "int8" else 1.0
+
+    def code_dimension(self, dimension: int) -> int:
+        if self.mode in ("pca", "matryoshka"):
+            return min(self.reduced_dimension, dimension)
+        return dimension
+
+    def bytes_per_vector(self, dimension: int) -> int:
+        return self.code_dimension(dimension) * self.code_dtype.itemsize
+
+    def train(self, vectors: np.ndarray):
+        """Fit the int8 scale or the PCA projection; a no-op for other modes."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.mode == "int8":
+            bound = float(np.quantile(np.abs(vectors), INT8_RANGE_QUANTILE)) if vectors.size else 0.0
+            self.scale = max(bound, 1e-12) / 127
+        elif self.mode == "pca":
+            # eigh of the d x d moment matrix stays cheap however many vectors are sampled,
+            # and still yields a full basis when there are fewer vectors than dimensions
+            moment = vectors.T.astype(np.float64) @ vectors.astype(np.float64)
+            _, eigenvectors = np.linalg.eigh(moment)
+            top = eigenvectors[:, ::-1][:, :self.code_dimension(vectors.shape[1])]
+            self.components = np.ascontiguousarray(top.T, dtype=np.float32)
+        self.trained_on = len(vectors)
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Full-precision vectors (such as queries) in index space, without rounding."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if self.mode == "int8":
+            # FAISS converts int8 queries without saturating, so components past the fitted scale would wrap around
+            return np.clip(vectors / np.float32(self.scale), -128, 127)
+        if self.mode == "pca":
+            return vectors @ self.components.T
+        if self.mode == "matryoshka":
+            return np.ascontiguousarray(vectors[:, :self.code_dimension(vectors.shape[1])])
+        return vectors
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Codes to store in memory."""
+        projected = self.project(vectors)
+        if self.mode == "int8":
+            return np.clip(np.rint(projected), -127, 127).astype(np.int8)
+        return projected.astype(self.code_dtype)
+
+    @staticmethod
+    def decode(codes: np.ndarray) -> np.ndarray:
+        """Codes as float32 vectors in index space."""
+        return np.asarray(codes, dtype=np.float32)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Arrays needed to restore a trained codec."""
+        state = {
+            "mode": np.array(self.mode),
+            "reduced_dimension": np.array(self.reduced_dimension),
+            "trained_on": np.array(self.trained_on)
+        }
+        if self.scale is not None:
+            state["scale"] = np.array(self.scale)
+        if self.components is not None:
+            state["components"] = self.components
+        return state
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> bool:
+        """Adopt a saved state; returns False if it was made for a different mode."""
+        if str(state["mode"]) != self.mode or int(state["reduced_dimension"]) != self.reduced_dimension:
+            return False
+        self.scale = float(state["scale"]) if "scale" in state else None
+        self.components = np.asarray(state["components"], dtype=np.float32) if "components" in state else None
+        self.trained_on = int(state["trained_on"])
+        return True
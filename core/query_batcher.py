@@ -0,0 +1,132 @@
+# gracie/core/query_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from ..utils.logger import setup_logger
+from ..utils.metrics import Histogram, SIZE_BUCKETS
+
+@dataclass
+class _PendingQuery:
+    query: str
+    top_k: int
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+class QueryBatcher:
+    """
+    Coalesces concurrent retrieval requests into batches.
+
+    Callers submit single queries; a worker thread collects them until
+    max_batch_size are waiting or max_wait_ms has passed since the first
+    one arrived, then hands the whole batch to ``handler`` so encoding and
+    search each run once per batch instead of once per query. Results are
+    fanned back out to the callers' futures.
+    """
+    def __init__(
+        self,
+        handler: Callable[[List[str], int], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "QueryBatcher"
+    ):
+        """
+        Args:
+            handler (Callable): Called with (queries, top_k) and returning one
+                result list per query, each of at least top_k items when available
+            max_batch_size (int): Most queries handled in one call
+            max_wait_ms (float): Longest a query waits for others to join its batch
+            name (str): Worker thread and logger name
+        """
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.logger = setup_logger(name)
+        self.queue_wait = Histogram(f"{name}.queue_wait_seconds")
+        self.batch_size = Histogram(f"{name}.batch_size", SIZE_BUCKETS)
+        self._queue: "queue.Queue[Optional[_PendingQuery]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, query: str, top_k: int = 5) -> Future:
+        """Queue a query and return a future for its results."""
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed")
+        self._ensure_worker()
+        pending = _PendingQuery(query, top_k)
+        self._queue.put(pending)
+        return pending.future
+
+    def query(self, query: str, top_k: int = 5, timeout: Optional[float] = None) -> Any:
+        """Submit a query and block until its batch has been processed."""
+        return self.submit(query, top_k).result(timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first.enqueued_at + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[_PendingQuery]):
+        started = time.perf_counter()
+        for pending in batch:
+            self.queue_wait.observe(started - pending.enqueued_at)
+        self.batch_size.observe(len(batch))
+
+        # Search once with the largest k and trim for smaller requests
+        top_k = max(pending.top_k for pending in batch)
+        try:
+            results = self.handler([pending.query for pending in batch], top_k)
+        except Exception as e:
+            self.logger.error(f"Error processing query batch: {e}")
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+        for pending, result in zip(batch, results):
+            pending.future.set_result(result[:pending.top_k])
+
+    def close(self):
+        """Process queries already queued, then stop the worker."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join()
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "batch_size": self.batch_size.snapshot()
+        }
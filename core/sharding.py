@@ -0,0 +1,467 @@
+# gracie/core/sharding.py
+import hashlib
+import heapq
+import multiprocessing
+import threading
+from contextlib import ExitStack
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from .filters import FilterSpec
+from .knowledge_system import GracieKnowledgeSystem, KnowledgeConfig, IngestResult, fuse_rankings
+from .model_registry import LazySentenceTransformer
+from ..models.topic import Topic
+from ..utils.locks import ReadWriteLock
+from ..utils.logger import setup_logger
+
+class ShardError(RuntimeError):
+    """Raised when a shard worker fails or has exited"""
+
+def shard_for(topic_id: str, shard_ids: List[int]) -> int:
+    """
+    Pick the shard that owns a topic by rendezvous (highest random weight) hashing.
+
+    Adding or removing a shard only moves the topics whose winning shard
+    changes, roughly 1/N of them, instead of reshuffling everything.
+    """
+    return max(
+        shard_ids,
+        key=lambda shard_id: hashlib.blake2b(f"{shard_id}:{topic_id}".encode("utf-8"), digest_size=8).digest()
+    )
+
+class _ShardServer:
+    """Runs inside a worker process and exposes its knowledge system to the coordinator"""
+    METHODS = frozenset({
+        "add_topics", "add_embedded_topics", "search_vectors", "search_candidate_topics", "update_topic",
+        "delete_topics", "topic_ids", "existing_names", "export_topics", "get_stats", "save_index", "warmup"
+    })
+
+    def __init__(self, system: GracieKnowledgeSystem):
+        self.system = system
+
+    def __getattr__(self, name: str):
+        return getattr(self.system, name)
+
+    def topic_ids(self) -> List[str]:
+        return list(self.system.db.iter_topic_ids())
+
+    def existing_names(self, names: List[str]) -> Set[str]:
+        return self.system.db.get_existing_names(names)
+
+    def search_candidate_topics(self, queries: List[str], query_embeddings: np.ndarray, top_k: int, filter):
+        candidates = self.system.search_candidates(queries, query_embeddings, top_k, filter)
+        topic_ids = [hit[0] for dense, lexical in candidates for hit in dense + lexical]
+        return candidates, {topic.id: topic for topic in self.system.db.get_topics_by_ids(topic_ids)}
+
+    def export_topics(self, topic_ids: List[str]) -> Tuple[List[Topic], np.ndarray]:
+        topics = self.system.db.get_topics_by_ids(topic_ids)
+        return topics, self.system.get_embeddings([topic.id for topic in topics])
+
+def _shard_worker(conn, config: KnowledgeConfig, encoder_factory: Optional[Callable]):
+    system = GracieKnowledgeSystem(config, embedding_model=encoder_factory() if encoder_factory else None)
+    server = _ShardServer(system)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            method, args, kwargs = message
+            try:
+                if method not in server.METHODS:
+                    raise AttributeError(f"Shard method {method} is not exposed")
+                conn.send((True, getattr(server, method)(*args, **kwargs)))
+            except Exception as e:
+                conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        system.close()
+        conn.close()
+
+class _ShardHandle:
+    """Coordinator-side connection to one shard worker"""
+    def __init__(self, shard_id: int, config: KnowledgeConfig, encoder_factory: Optional[Callable], context):
+        self.shard_id = shard_id
+        self.lock = threading.Lock()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_shard_worker,
+            args=(child_conn, config, encoder_factory),
+            name=f"GracieShard-{shard_id}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def send(self, method: str, *args, **kwargs):
+        self.conn.send((method, args, kwargs))
+
+    def receive(self):
+        try:
+            ok, result = self.conn.recv()
+        except EOFError:
+            raise ShardError(f"Shard {self.shard_id} exited")
+        if not ok:
+            raise ShardError(f"Shard {self.shard_id}: {result}")
+        return result
+
+    def call(self, method: str, *args, **kwargs):
+        with self.lock:
+            self.send(method, *args, **kwargs)
+            return self.receive()
+
+    def close(self, timeout: float = 30.0):
+        with self.lock:
+            try:
+                self.conn.send(None)
+            except (OSError, EOFError):
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.conn.close()
+
+class ShardedKnowledgeSystem:
+    """
+    Knowledge store partitioned across worker processes.
+
+    Topics are assigned to shards by rendezvous hashing of their id. Each
+    shard is a separate process owning its own database and FAISS index
+    (``<db_path>.shard-<n>``), so capacity and search throughput scale with
+    the number of processes. Topic names stay unique across all shards:
+    writes check every shard for the name before reaching the owner. Queries are encoded once in the coordinator
+    and scattered to every shard with their embeddings. The dense and lexical
+    candidates the shards return are merged and fused like those of a single
+    GracieKnowledgeSystem. Queries share the topology lock; adding, removing
+    and rebalancing shards and topic writes take it alone.
+    """
+    def __init__(
+        self,
+        config: Optional[KnowledgeConfig] = None,
+        num_shards: int = 4,
+        embedding_model=None,
+        encoder_factory: Optional[Callable] = None,
+        start_method: Optional[str] = None
+    ):
+        """
+        Args:
+            config (KnowledgeConfig): Configuration shared by all shards
+            num_shards (int): Number of shard processes to start
+            embedding_model: Query encoder for the coordinator; the shared
+                config.embedding_model instance is used when omitted
+            encoder_factory (Callable): Picklable callable building each
+                worker's encoder; workers load config.embedding_model when omitted
+            start_method (str): multiprocessing start method, platform default when None
+        """
+        self.config = config or KnowledgeConfig()
+        self.logger = setup_logger('GracieShards')
+        self.embedding_model = embedding_model or LazySentenceTransformer(self.config.embedding_model)
+        self.encoder_factory = encoder_factory
+        self._context = multiprocessing.get_context(start_method)
+        self._shards: Dict[int, _ShardHandle] = {}
+        self._topology_lock = ReadWriteLock()
+        for shard_id in range(num_shards):
+            self._start_shard(shard_id)
+
+    @property
+    def shard_ids(self) -> List[int]:
+        return sorted(self._shards)
+
+    def _shard_config(self, shard_id: int) -> KnowledgeConfig:
+        if self.config.db_path == ":memory:":
+            return replace(self.config, query_batching=False)
+        return replace(
+            self.config,
+            db_path=f"{self.config.db_path}.shard-{shard_id}",
+            index_path=f"{self.config.index_path}.shard-{shard_id}" if self.config.index_path else None,
+            query_batching=False
+        )
+
+    def _start_shard(self, shard_id: int) -> _ShardHandle:
+        handle = _ShardHandle(shard_id, self._shard_config(shard_id), self.encoder_factory, self._context)
+        self._shards[shard_id] = handle
+        return handle
+
+    def _scatter(self, calls: Dict[int, Tuple]) -> Dict[int, object]:
+        """Send one call to each listed shard, then collect every reply."""
+        with ExitStack() as stack:
+            handles = [self._shards[shard_id] for shard_id in sorted(calls)]
+            for handle in handles:
+                stack.enter_context(handle.lock)
+            for handle in handles:
+                method, args = calls[handle.shard_id][0], calls[handle.shard_id][1:]
+                handle.send(method, *args)
+            results, error = {}, None
+            # Drain every reply even after a failure so the pipes stay in sync
+            for handle in handles:
+                try:
+                    results[handle.shard_id] = handle.receive()
+                except ShardError as e:
+                    error = error or e
+            if error:
+                raise error
+            return results
+
+    def _route(self, topic_ids: List[str]) -> Dict[int, List[int]]:
+        """Positions of topic_ids grouped by owning shard."""
+        shard_ids = self.shard_ids
+        routed: Dict[int, List[int]] = {}
+        for position, topic_id in enumerate(topic_ids):
+            routed.setdefault(shard_for(topic_id, shard_ids), []).append(position)
+        return routed
+
+    def _existing_names(self, names: List[str], shard_ids: Optional[List[int]] = None) -> Set[str]:
+        """Names among names already stored on any of the shards (all by default)."""
+        if not names:
+            return set()
+        shard_ids = self.shard_ids if shard_ids is None else shard_ids
+        replies = self._scatter({shard_id: ("existing_names", names) for shard_id in shard_ids})
+        return set().union(*replies.values())
+
+    def warmup(self):
+        """Load the query encoder here and the embedding model in every shard."""
+        self.embedding_model.encode(["warmup"], show_progress_bar=False)
+        with self._topology_lock.read():
+            self._scatter({shard_id: ("warmup",) for shard_id in self._shards})
+
+    def add_topic(self, topic: Topic) -> bool:
+        result = self.add_topics([topic])
+        for error in result.failed.values():
+            self.logger.error(f"Error adding topic: {error}")
+        return result.success
+
+    def add_topics(self, topics: List[Topic], batch_size: Optional[int] = None) -> IngestResult:
+        """
+        Add topics, each shard encoding and storing its share in parallel.
+
+        Args:
+            topics (List[Topic]): Topics to ingest
+            batch_size (int): Topics per batch within each shard
+
+        Returns:
+            IngestResult: Ids of added topics and per-topic failure reasons
+        """
+        topics = list(topics)
+        result = IngestResult()
+        try:
+            with self._topology_lock.write():
+                # Each shard only enforces unique names among its own topics
+                taken = self._existing_names([topic.name for topic in topics])
+                accepted = []
+                for topic in topics:
+                    if topic.name in taken:
+                        result.failed[topic.id] = "Database error: UNIQUE constraint failed: topics.name"
+                    else:
+                        taken.add(topic.name)
+                        accepted.append(topic)
+                routed = self._route([topic.id for topic in accepted])
+                replies = self._scatter({
+                    shard_id: ("add_topics", [accepted[i] for i in positions], batch_size)
+                    for shard_id, positions in routed.items()
+                })
+        except Exception as e:
+            self.logger.error(f"Error adding topics: {e}")
+            return IngestResult(failed={topic.id: f"Shard error: {e}" for topic in topics})
+        for reply in replies.values():
+            result.added.extend(reply.added)
+            result.failed.update(reply.failed)
+        return result
+
+    def get_relevant_knowledge(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        filter: Optional[FilterSpec] = None
+    ) -> List[Topic]:
+        """
+        Retrieve relevant knowledge across all shards.
+
+        Args:
+            query (str): Search query
+            top_k (int): Number of results to return, defaults to config.max_contexts
+            filter (FilterSpec): Conditions matching topics must meet, applied on each shard
+
+        Returns:
+            List[Topic]: List of relevant topics
+        """
+        return self.get_relevant_knowledge_batch([query], top_k, filter)[0]
+
+    def get_relevant_knowledge_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        filter: Optional[FilterSpec] = None
+    ) -> List[List[Topic]]:
+        """
+        Scatter a batch of queries to every shard and fuse each query's candidates.
+
+        Each shard returns its dense and lexical candidates. They are merged
+        into one ranking per retriever (by cosine similarity, and by BM25
+        score, which each shard computes over its own topics), then fused
+        with the same confidence threshold and term-overlap rule as
+        GracieKnowledgeSystem.get_relevant_knowledge.
+        """
+        try:
+            if not queries:
+                return []
+            top_k = top_k or self.config.max_contexts
+            pool = top_k * self.config.hybrid_candidates if self.config.hybrid_search else top_k
+            embeddings = np.asarray(
+                self.embedding_model.encode(list(queries), batch_size=len(queries), show_progress_bar=False),
+                dtype=np.float32
+            )
+            with self._topology_lock.read():
+                replies = self._scatter({
+                    shard_id: ("search_candidate_topics", list(queries), embeddings, top_k, filter)
+                    for shard_id in self._shards
+                })
+            topics = {}
+            for _, found in replies.values():
+                topics.update(found)
+            merged = []
+            for position in range(len(queries)):
+                candidates = [reply[0][position] for reply in replies.values()]
+                dense = heapq.nlargest(pool, (hit for hits, _ in candidates for hit in hits), key=lambda hit: hit[1])
+                lexical = heapq.nsmallest(pool, (hit for _, hits in candidates for hit in hits), key=lambda hit: hit[1])
+                ranked = fuse_rankings(
+                    self.config, dense, [(topic_id, overlap) for topic_id, _, overlap in lexical], top_k
+                )
+                merged.append([topics[topic_id] for topic_id in ranked if topic_id in topics])
+            return merged
+        except Exception as e:
+            self.logger.error(f"Error retrieving knowledge: {e}")
+            return [[] for _ in queries]
+
+    def update_topic(self, topic: Topic) -> bool:
+        try:
+            with self._topology_lock.write():
+                owner = shard_for(topic.id, self.shard_ids)
+                others = [shard_id for shard_id in self.shard_ids if shard_id != owner]
+                if self._existing_names([topic.name], others):
+                    self.logger.error(f"Error updating topic: name {topic.name!r} is used by another topic")
+                    return False
+                return self._shards[owner].call("update_topic", topic)
+        except Exception as e:
+            self.logger.error(f"Error updating topic: {e}")
+            return False
+
+    def delete_topic(self, topic_id: str) -> bool:
+        return self.delete_topics([topic_id]) == 1
+
+    def delete_topics(self, topic_ids: List[str]) -> int:
+        try:
+            with self._topology_lock.write():
+                routed = self._route(topic_ids)
+                replies = self._scatter({
+                    shard_id: ("delete_topics", [topic_ids[i] for i in positions])
+                    for shard_id, positions in routed.items()
+                })
+            return sum(replies.values())
+        except Exception as e:
+            self.logger.error(f"Error deleting topics: {e}")
+            return 0
+
+    def add_shard(self) -> int:
+        """
+        Start a new shard and move to it the topics it now owns.
+
+        Returns:
+            int: Id of the new shard
+        """
+        with self._topology_lock.write():
+            shard_id = max(self._shards, default=-1) + 1
+            self._start_shard(shard_id)
+            moved = self.rebalance()
+            self.logger.info(f"Added shard {shard_id}, moved {moved} topics")
+            return shard_id
+
+    def remove_shard(self, shard_id: int) -> int:
+        """
+        Move a shard's topics to the remaining shards and stop its worker.
+
+        The shard's database files are left on disk.
+
+        Returns:
+            int: Number of topics moved
+        """
+        with self._topology_lock.write():
+            if shard_id not in self._shards:
+                raise KeyError(f"Unknown shard {shard_id}")
+            if len(self._shards) == 1:
+                raise ValueError("Cannot remove the last shard")
+            source = self._shards[shard_id]
+            remaining = [other for other in self.shard_ids if other != shard_id]
+            moved = self._move(source, source.call("topic_ids"), remaining)
+            left = source.call("topic_ids")
+            if left:
+                raise ShardError(f"Shard {shard_id} still holds {len(left)} topics that could not be moved")
+            del self._shards[shard_id]
+            source.close()
+            self.logger.info(f"Removed shard {shard_id}, moved {moved} topics")
+            return moved
+
+    def rebalance(self, batch_size: int = 1000) -> int:
+        """
+        Move every topic stored on a shard other than its owner.
+
+        Returns:
+            int: Number of topics moved
+        """
+        with self._topology_lock.write():
+            shard_ids = self.shard_ids
+            moved = 0
+            for shard_id in shard_ids:
+                source = self._shards[shard_id]
+                misplaced = [
+                    topic_id for topic_id in source.call("topic_ids")
+                    if shard_for(topic_id, shard_ids) != shard_id
+                ]
+                moved += self._move(source, misplaced, shard_ids, batch_size)
+            return moved
+
+    def _move(self, source: _ShardHandle, topic_ids: List[str], shard_ids: List[int], batch_size: int = 1000) -> int:
+        """Copy topics with their embeddings to their owners, then delete them from source."""
+        moved = 0
+        for start in range(0, len(topic_ids), batch_size):
+            topics, embeddings = source.call("export_topics", topic_ids[start:start + batch_size])
+            routed: Dict[int, List[int]] = {}
+            for position, topic in enumerate(topics):
+                routed.setdefault(shard_for(topic.id, shard_ids), []).append(position)
+            added = []
+            for shard_id, positions in routed.items():
+                result = self._shards[shard_id].call(
+                    "add_embedded_topics", [topics[i] for i in positions], embeddings[positions]
+                )
+                added.extend(result.added)
+                for topic_id, error in result.failed.items():
+                    self.logger.warning(f"Could not move topic {topic_id} to shard {shard_id}: {error}")
+            if added:
+                moved += source.call("delete_topics", added)
+        return moved
+
+    def save_index(self) -> bool:
+        with self._topology_lock.read():
+            replies = self._scatter({shard_id: ("save_index",) for shard_id in self._shards})
+        return all(replies.values())
+
+    def get_stats(self) -> Dict:
+        """Per-shard statistics plus totals."""
+        try:
+            with self._topology_lock.read():
+                replies = self._scatter({shard_id: ("get_stats",) for shard_id in self._shards})
+            return {
+                "num_shards": len(replies),
+                "total_topics": sum(stats.get("total_topics", 0) for stats in replies.values()),
+                "shards": replies
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting stats: {e}")
+            return {}
+
+    def close(self):
+        """Stop every shard worker; each persists its index on the way out."""
+        with self._topology_lock.write():
+            for handle in self._shards.values():
+                handle.close()
+            self._shards.clear()
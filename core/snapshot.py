@@ -0,0 +1,184 @@
+# gracie/core/snapshot.py
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from ..models.topic import DEFAULT_NAMESPACE, Topic
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is missing, incomplete or made with another embedding model"""
+
+class SnapshotWriter:
+    """
+    Writes a knowledge base snapshot as a directory of chunks.
+
+    Each chunk pairs a JSONL file of topics with an ``.npy`` matrix of
+    their float32 embeddings, row for row, so chunks are written and read
+    one at a time with memory bounded by the chunk size. The manifest,
+    written by ``close``, records the embedding model, dimension and
+    chunk list; a directory without one is an interrupted export and is
+    never loaded.
+    """
+    def __init__(self, path: str, embedding_model: str, metadata: Optional[Dict] = None):
+        self.path = path
+        self.embedding_model = embedding_model
+        self.metadata = metadata or {}
+        self.dimension: Optional[int] = None
+        self.chunks: List[Dict] = []
+        self.manifest: Optional[Dict] = None
+        os.makedirs(path, exist_ok=True)
+        # Drop an older manifest first so a crash mid-export leaves no valid snapshot
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write(
+        self,
+        topics: List[Topic],
+        embeddings: np.ndarray,
+        timestamps: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        """Append one chunk of topics and their embeddings, with (created_at, updated_at) by topic id when known."""
+        if not topics:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(embeddings) != len(topics):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(topics)} topics")
+        if self.dimension is None:
+            self.dimension = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension changed from {self.dimension} to {embeddings.shape[1]}")
+
+        timestamps = timestamps or {}
+        name = f"chunk-{len(self.chunks):05d}"
+        with open(os.path.join(self.path, f"{name}.jsonl"), "w", encoding="utf-8") as f:
+            for topic in topics:
+                created_at, updated_at = timestamps.get(topic.id, (None, None))
+                f.write(json.dumps({
+                    "id": topic.id,
+                    "name": topic.name,
+                    "definition": topic.definition,
+                    "facts": topic.facts,
+                    "confidence": topic.confidence,
+                    "namespace": topic.namespace,
+                    "created_at": created_at,
+                    "updated_at": updated_at
+                }, ensure_ascii=False))
+                f.write("\n")
+        np.save(os.path.join(self.path, f"{name}.npy"), embeddings)
+        self.chunks.append({"topics": f"{name}.jsonl", "embeddings": f"{name}.npy", "count": len(topics)})
+
+    def close(self) -> Dict:
+        """Write the manifest, completing the snapshot."""
+        if self.manifest is None:
+            manifest = dict(self.metadata)
+            manifest.update({
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "embedding_model": self.embedding_model,
+                "dimension": self.dimension,
+                "dtype": "float32",
+                "count": sum(chunk["count"] for chunk in self.chunks),
+                "chunks": self.chunks,
+                "created_at": time.time()
+            })
+            manifest_path = os.path.join(self.path, MANIFEST_NAME)
+            with open(manifest_path + ".tmp", "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(manifest_path + ".tmp", manifest_path)
+            self.manifest = manifest
+        return self.manifest
+
+class SnapshotReader:
+    """
+    Streams the chunks of a snapshot written by SnapshotWriter.
+
+    Every chunk's row count and embedding shape is checked on opening, so
+    a damaged snapshot is rejected before any of it is imported.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            raise SnapshotError(f"No complete snapshot at {path}")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot format: {self.manifest.get('format_version')}")
+        for chunk in self.manifest["chunks"]:
+            for name in (chunk["topics"], chunk["embeddings"]):
+                if not os.path.exists(os.path.join(path, name)):
+                    raise SnapshotError(f"Snapshot chunk {name} is missing")
+            self._check_chunk(chunk)
+
+    def _check_chunk(self, chunk: Dict):
+        """Raise unless the chunk holds count topic lines and a (count, dimension) matrix."""
+        try:
+            shape = np.load(os.path.join(self.path, chunk["embeddings"]), mmap_mode="r").shape
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Snapshot chunk {chunk['embeddings']} is unreadable: {e}")
+        if shape != (chunk["count"], self.manifest["dimension"]):
+            raise SnapshotError(f"Snapshot chunk {chunk['embeddings']} has shape {shape}")
+        with open(os.path.join(self.path, chunk["topics"]), encoding="utf-8") as f:
+            lines = sum(1 for line in f if line.strip())
+        if lines != chunk["count"]:
+            raise SnapshotError(f"Snapshot chunk {chunk['topics']} is truncated")
+
+    @property
+    def embedding_model(self) -> str:
+        return self.manifest["embedding_model"]
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.manifest["dimension"]
+
+    @property
+    def count(self) -> int:
+        return self.manifest["count"]
+
+    def check(self, embedding_model: str, dimension: Optional[int] = None):
+        """Reject a snapshot whose embeddings another model (or dimension) produced."""
+        if self.embedding_model != embedding_model:
+            raise SnapshotError(
+                f"Snapshot was embedded with {self.embedding_model}, not {embedding_model}"
+            )
+        if dimension is not None and self.dimension is not None and self.dimension != dimension:
+            raise SnapshotError(f"Snapshot dimension {self.dimension} does not match {dimension}")
+
+    def __iter__(self) -> Iterator[Tuple[List[Topic], np.ndarray, Dict[str, Tuple[float, float]]]]:
+        """
+        Yield (topics, embeddings, timestamps) per chunk; embeddings are memory-mapped.
+
+        timestamps holds (created_at, updated_at) epoch seconds by topic id
+        for the topics exported with them.
+        """
+        for chunk in self.manifest["chunks"]:
+            embeddings = np.load(os.path.join(self.path, chunk["embeddings"]), mmap_mode="r")
+            with open(os.path.join(self.path, chunk["topics"]), encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            timestamps = {
+                record["id"]: (record["created_at"], record.get("updated_at"))
+                for record in records if record.get("created_at") is not None
+            }
+            yield [self._to_topic(record) for record in records], embeddings, timestamps
+
+    @staticmethod
+    def _to_topic(record: Dict) -> Topic:
+        return Topic(
+            id=record["id"],
+            name=record["name"],
+            definition=record["definition"],
+            facts=record.get("facts") or [],
+            confidence=record.get("confidence") or 0.0,
+            namespace=record.get("namespace") or DEFAULT_NAMESPACE
+        )
@@ -0,0 +1,514 @@
+# gracie/core/vector_index.py
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from ..utils.lazy import lazy_import
+from ..utils.locks import ReadWriteLock
+
+faiss = lazy_import("faiss")
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# How flat, HNSW and IVF-flat backends store vectors, by FAISS scalar quantizer type;
+# int8 vectors must already be rounded into [-128, 127] (see quantization.EmbeddingCodec)
+STORAGE_TYPES = {"float32": None, "float16": "QT_fp16", "int8": "QT_8bit_direct_signed"}
+
+# FAISS needs about 39 training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+
+class VectorIndex:
+    """
+    FAISS index wrapper with pluggable backends.
+
+    Exposes the subset of the FAISS index API used by the knowledge system
+    (``add``, ``search``, ``ntotal``, ``d``) plus in-place ``update`` and
+    ``remove``. Vector ids are the caller's row numbers. Flat and HNSW
+    indexes store row ``i`` at position ``i``, so updates overwrite the
+    stored vector and removals are masked with an ``IDSelectorBitmap``; IVF
+    indexes use ``remove_ids``/``add_with_ids`` through a hashtable direct
+    map. IVF backends are served from an exact flat index until enough
+    vectors exist to train them, and are retrained in a background thread
+    when new data drifts away from the trained centroids. With a float16
+    or int8 ``storage``, flat, HNSW and IVF-flat backends keep vectors in
+    a scalar quantizer instead of as float32 (IVF-PQ is compressed already).
+    Searches can be restricted to a row mask, which is combined with the
+    live bitmap into the selector FAISS checks while it scans. Searches
+    run concurrently under the read side of a read/write lock; writes take
+    the write side, and a retrain builds its index without the lock and
+    only swaps it in under it.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        index_type: str = "flat",
+        vector_source: Optional[Callable[[], Tuple[np.ndarray, Optional[np.ndarray]]]] = None,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        pq_m: int = 16,
+        pq_nbits: int = 8,
+        hnsw_m: int = 32,
+        ef_search: int = 64,
+        ef_construction: int = 40,
+        min_train_size: Optional[int] = None,
+        retrain_drift_ratio: float = 1.5,
+        retrain_growth_factor: float = 4.0,
+        stale_rebuild_ratio: float = 0.1,
+        background_retrain: bool = True,
+        storage: str = "float32",
+        logger=None
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type: {index_type}")
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unsupported storage type: {storage}")
+        self.d = dimension
+        self.index_type = index_type
+        self.vector_source = vector_source
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.ef_construction = ef_construction
+        centroids = max(nlist, 2 ** pq_nbits) if index_type == "ivf_pq" else nlist
+        # FAISS cannot train with fewer points than centroids, and a failed retrain would repeat on every add
+        self.min_train_size = max(min_train_size or centroids * MIN_POINTS_PER_CENTROID, centroids)
+        self.retrain_drift_ratio = retrain_drift_ratio
+        self.retrain_growth_factor = retrain_growth_factor
+        self.stale_rebuild_ratio = stale_rebuild_ratio
+        self.background_retrain = background_retrain
+        self.storage = storage
+        self.logger = logger
+
+        self._lock = ReadWriteLock()
+        self._retrain_thread: Optional[threading.Thread] = None
+        self._pending_ops: Optional[List[Tuple]] = None
+        self._generation = 0
+        self._trained_size = 0
+        self._baseline_distance = 0.0
+        self._recent_distance = 0.0
+        self._stale_updates = 0
+
+        # Bit i is set while row i is live in the index
+        self._bitmap = np.zeros(0, dtype=np.uint8)
+        self._live_count = 0
+        self._selector = None
+        self.index = self._create_empty()
+
+    @classmethod
+    def from_faiss(
+        cls,
+        index: "faiss.Index",
+        index_type: str,
+        live: Optional[np.ndarray] = None,
+        **kwargs
+    ) -> "VectorIndex":
+        """Wrap an index loaded from disk; live masks rows removed before saving."""
+        vector_index = cls(index.d, index_type=index_type, **kwargs)
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+            vector_index._trained_size = index.ntotal
+        vector_index.index = index
+        if live is None:
+            live = np.ones(index.ntotal, dtype=bool)
+        vector_index._reset_bitmap(live)
+        return vector_index
+
+    @property
+    def ntotal(self) -> int:
+        """Number of live vectors."""
+        if self._is_positional(self.index):
+            return self._live_count
+        return self.index.ntotal
+
+    @property
+    def requires_training(self) -> bool:
+        return self.index_type in ("ivf_flat", "ivf_pq")
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the configured backend (not the flat fallback) is serving."""
+        if not self.requires_training:
+            return True
+        return not self._is_positional(self.index)
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None):
+        """Add vectors under the given row ids; vector_source must already include them."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock.write():
+            if ids is None:
+                ids = np.arange(self.index.ntotal, self.index.ntotal + len(vectors))
+            ids = np.asarray(ids, dtype=np.int64)
+            self._record("add", vectors, ids)
+            self._upsert(self.index, vectors, ids)
+            self._set_live(ids, True)
+            if not self.requires_training:
+                return
+            if self.is_trained:
+                self._track_drift(vectors)
+            elif self.ntotal >= self.min_train_size:
+                self.schedule_retrain()
+
+    def update(self, vectors: np.ndarray, ids: np.ndarray):
+        """Replace the vectors stored under existing row ids."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        with self._lock.write():
+            self._record("add", vectors, ids)
+            self._upsert(self.index, vectors, ids)
+            self._set_live(ids, True)
+            if isinstance(self.index, faiss.IndexHNSW):
+                # The graph keeps edges computed for the old vectors
+                self._stale_updates += len(ids)
+                if self._stale_updates > self.stale_rebuild_ratio * max(self.ntotal, 1):
+                    self.schedule_retrain()
+            elif self.requires_training and self.is_trained:
+                self._track_drift(vectors)
+
+    def remove(self, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        with self._lock.write():
+            self._record("remove", None, ids)
+            self._remove_from(self.index, ids)
+            self._set_live(ids, False)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest row ids and squared L2 distances, padded with -1 ids.
+
+        allowed is a boolean mask over row ids; rows outside it (or past
+        its end) are skipped inside the FAISS search rather than filtered
+        afterwards. HNSW and IVF may then return fewer than k rows.
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        # Searches share the lock; writes, which FAISS cannot run alongside a search, take it alone
+        with self._lock.read():
+            # Referenced until the search returns, since the selector only holds a pointer
+            bitmap = None if allowed is None else self._filter_bitmap(allowed)
+            params = self._search_params(self.index, nprobe, ef_search, bitmap)
+            return self.index.search(queries, k, params=params)
+
+    def rebuild(self, vectors: np.ndarray, live: Optional[np.ndarray] = None):
+        """Replace the index with one (re)trained on rows of the given matrix."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if live is None:
+            live = np.ones(len(vectors), dtype=bool)
+        index = self._build(vectors, live)
+        with self._lock.write():
+            self._generation += 1
+            self.index = index
+            self._reset_bitmap(live)
+            self._stale_updates = 0
+
+    def reset(self):
+        with self._lock.write():
+            self._generation += 1
+            self.index = self._create_empty()
+            self._reset_bitmap(np.zeros(0, dtype=bool))
+            self._trained_size = 0
+
+    def _create_empty(self) -> "faiss.Index":
+        if self.requires_training:
+            return self._flat_index()
+        return self._create_index()
+
+    @property
+    def _quantizer_type(self) -> Optional[int]:
+        name = STORAGE_TYPES[self.storage]
+        return None if name is None else getattr(faiss.ScalarQuantizer, name)
+
+    def _flat_index(self) -> "faiss.Index":
+        if self._quantizer_type is None:
+            return faiss.IndexFlatL2(self.d)
+        return faiss.IndexScalarQuantizer(self.d, self._quantizer_type, faiss.METRIC_L2)
+
+    @staticmethod
+    def _is_positional(index: "faiss.Index") -> bool:
+        return faiss.try_extract_index_ivf(index) is None
+
+    def _build(self, vectors: np.ndarray, live: np.ndarray) -> "faiss.Index":
+        live_count = int(live.sum())
+        if not self.requires_training or live_count < self.min_train_size:
+            index = self._create_empty() if self.requires_training else self._create_index()
+            index.add(vectors)
+            return index
+
+        live_vectors = vectors[live]
+        index = self._create_index(live_count)
+        index.train(live_vectors)
+        self._set_baseline(index, live_vectors)
+        index.add_with_ids(live_vectors, np.flatnonzero(live).astype(np.int64))
+        return index
+
+    def _create_index(self, train_size: int = 0) -> "faiss.Index":
+        if self.index_type == "hnsw":
+            if self._quantizer_type is None:
+                index = faiss.IndexHNSWFlat(self.d, self.hnsw_m)
+            else:
+                index = faiss.IndexHNSWSQ(self.d, self._quantizer_type, self.hnsw_m)
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            return index
+        if self.index_type == "flat":
+            return self._flat_index()
+
+        nlist = max(1, min(self.nlist, train_size // MIN_POINTS_PER_CENTROID))
+        quantizer = faiss.IndexFlatL2(self.d)
+        if self.index_type == "ivf_pq":
+            index = faiss.IndexIVFPQ(quantizer, self.d, nlist, self._pq_subquantizers(), self.pq_nbits)
+        elif self._quantizer_type is not None:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, self.d, nlist, self._quantizer_type, faiss.METRIC_L2, True)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, self.d, nlist)
+        index.nprobe = min(self.nprobe, nlist)
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        self._trained_size = train_size
+        return index
+
+    def _pq_subquantizers(self) -> int:
+        """Largest sub-quantizer count not above pq_m that divides the dimension."""
+        m = min(self.pq_m, self.d)
+        while self.d % m:
+            m -= 1
+        return m
+
+    def _upsert(self, index: "faiss.Index", vectors: np.ndarray, ids: np.ndarray):
+        """Write vectors under row ids, overwriting rows the index already holds."""
+        if not self._is_positional(index):
+            index.remove_ids(ids)
+            index.add_with_ids(vectors, ids)
+            return
+
+        existing = ids < index.ntotal
+        if existing.any():
+            self._overwrite(index, ids[existing], vectors[existing])
+        if existing.all():
+            return
+
+        new_ids, new_vectors = ids[~existing], vectors[~existing]
+        if new_ids[0] == index.ntotal and np.all(np.diff(new_ids) == 1):
+            index.add(new_vectors)
+            return
+        # Rows must stay aligned with positions, so pad gaps with masked zeros
+        block = np.zeros((int(new_ids.max()) + 1 - index.ntotal, self.d), dtype=np.float32)
+        block[new_ids - index.ntotal] = new_vectors
+        index.add(block)
+
+    def _remove_from(self, index: "faiss.Index", ids: np.ndarray):
+        if not self._is_positional(index):
+            index.remove_ids(ids)
+
+    @staticmethod
+    def _overwrite(index: "faiss.Index", ids: np.ndarray, vectors: np.ndarray):
+        """Replace stored vectors of a flat or HNSW index in place through a view of its storage."""
+        flat = faiss.downcast_index(index.storage) if isinstance(index, faiss.IndexHNSW) else index
+        if isinstance(flat, faiss.IndexScalarQuantizer):
+            codes = faiss.rev_swig_ptr(flat.codes.data(), flat.ntotal * flat.code_size)
+            codes.reshape(flat.ntotal, flat.code_size)[ids] = flat.sa_encode(vectors)
+        else:
+            storage = faiss.rev_swig_ptr(flat.get_xb(), flat.ntotal * flat.d).reshape(flat.ntotal, flat.d)
+            storage[ids] = vectors
+
+    def _set_live(self, ids: np.ndarray, live: bool):
+        ids = np.unique(ids)
+        if len(ids) == 0:
+            return
+        needed = (int(ids[-1]) >> 3) + 1
+        if needed > len(self._bitmap):
+            bitmap = np.zeros(max(needed, 2 * len(self._bitmap)), dtype=np.uint8)
+            bitmap[:len(self._bitmap)] = self._bitmap
+            self._bitmap = bitmap
+            self._selector = None
+
+        byte, masks = ids >> 3, np.left_shift(1, ids & 7).astype(np.uint8)
+        current = (self._bitmap[byte] & masks) != 0
+        if live:
+            np.bitwise_or.at(self._bitmap, byte, masks)
+            self._live_count += int((~current).sum())
+        else:
+            np.bitwise_and.at(self._bitmap, byte, ~masks)
+            self._live_count -= int(current.sum())
+
+    def _reset_bitmap(self, live: np.ndarray):
+        self._bitmap = np.packbits(np.asarray(live, dtype=bool), bitorder="little")
+        self._live_count = int(np.count_nonzero(live))
+        self._selector = None
+
+    def _filter_bitmap(self, allowed: np.ndarray) -> np.ndarray:
+        """Live-row bitmap restricted to the allowed rows."""
+        allowed = np.asarray(allowed, dtype=bool)[:len(self._bitmap) * 8]
+        bitmap = np.packbits(allowed, bitorder="little")
+        bitmap &= self._bitmap[:len(bitmap)]
+        return bitmap
+
+    def _search_params(
+        self,
+        index: "faiss.Index",
+        nprobe: Optional[int],
+        ef_search: Optional[int],
+        bitmap: Optional[np.ndarray] = None
+    ):
+        selector = None
+        if bitmap is not None:
+            selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        elif self._is_positional(index) and self._live_count < index.ntotal:
+            if self._selector is None:
+                self._selector = faiss.IDSelectorBitmap(len(self._bitmap), faiss.swig_ptr(self._bitmap))
+            selector = self._selector
+
+        if isinstance(index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(efSearch=ef_search or self.ef_search, sel=selector)
+        if not self._is_positional(index):
+            return faiss.SearchParametersIVF(nprobe=nprobe or self.nprobe, sel=selector)
+        if selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
+
+    def _nearest_centroid_distance(self, index: "faiss.Index", vectors: np.ndarray) -> float:
+        ivf = faiss.extract_index_ivf(index)
+        distances, _ = ivf.quantizer.search(vectors, 1)
+        return float(distances.mean())
+
+    def _set_baseline(self, index: "faiss.Index", vectors: np.ndarray):
+        sample = vectors[:min(len(vectors), 10000)]
+        self._baseline_distance = self._nearest_centroid_distance(index, sample)
+        self._recent_distance = self._baseline_distance
+
+    def _track_drift(self, vectors: np.ndarray):
+        """Schedule a retrain when new vectors sit far from the trained centroids."""
+        if self._baseline_distance:
+            distance = self._nearest_centroid_distance(self.index, vectors)
+            self._recent_distance = 0.9 * self._recent_distance + 0.1 * distance
+        else:
+            self._set_baseline(self.index, vectors)
+
+        drifted = self._recent_distance > self._baseline_distance * self.retrain_drift_ratio
+        grown = self.index.ntotal > self._trained_size * self.retrain_growth_factor
+        if drifted or grown:
+            self.schedule_retrain()
+
+    def schedule_retrain(self) -> bool:
+        """Retrain from the vector source, in the background if enabled."""
+        if self.vector_source is None:
+            return False
+        if self._retrain_thread is not None and self._retrain_thread.is_alive():
+            return False
+        if not self.background_retrain:
+            self.rebuild(*self.vector_source())
+            return True
+        self._retrain_thread = threading.Thread(target=self._retrain, daemon=True)
+        self._retrain_thread.start()
+        return True
+
+    def _record(self, op: str, vectors: Optional[np.ndarray], ids: np.ndarray):
+        """Log writes made while a background retrain is building its index."""
+        if self._pending_ops is not None:
+            self._pending_ops.append((op, vectors, ids))
+
+    def _retrain(self):
+        try:
+            with self._lock.write():
+                vectors, live = self.vector_source()
+                live = np.array(live if live is not None else np.ones(len(vectors), dtype=bool))
+                generation = self._generation
+                self._pending_ops = []
+            index = self._build(np.ascontiguousarray(vectors, dtype=np.float32), live)
+            with self._lock.write():
+                if generation == self._generation:
+                    # Replay writes made while training ran
+                    for op, op_vectors, ids in self._pending_ops:
+                        if op == "add":
+                            self._upsert(index, op_vectors, ids)
+                        else:
+                            self._remove_from(index, ids)
+                    self.index = index
+                    self._stale_updates = 0
+                self._pending_ops = None
+            if self.logger:
+                self.logger.info(f"Retrained {self.index_type} index on {int(live.sum())} vectors")
+        except Exception as e:
+            self._pending_ops = None
+            if self.logger:
+                self.logger.error(f"Index retrain error: {e}")
+
+    def wait_for_retrain(self, timeout: Optional[float] = None):
+        if self._retrain_thread is not None:
+            self._retrain_thread.join(timeout)
+
+def recall_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    configs: Optional[List[Dict]] = None
+) -> List[Dict]:
+    """
+    Measure recall@k and per-query latency of index settings against an exact flat search.
+
+    Args:
+        vectors (np.ndarray): Corpus vectors
+        queries (np.ndarray): Query vectors
+        k (int): Neighbours per query
+        configs (List[Dict]): VectorIndex keyword arguments to evaluate; a
+            ``nprobe``/``ef_search`` list is expanded into one row per value
+
+    Returns:
+        List[Dict]: One row per setting with recall, mean and p95 latency in ms
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    k = min(k, len(vectors))
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    configs = configs or [{"index_type": "flat"}]
+    report = []
+    for config in configs:
+        config = dict(config)
+        nprobes = config.pop("nprobe", None)
+        ef_searches = config.pop("ef_search", None)
+        index = VectorIndex(vectors.shape[1], vector_source=lambda: (vectors, None), background_retrain=False, **config)
+        start = time.perf_counter()
+        index.rebuild(vectors)
+        build_seconds = time.perf_counter() - start
+
+        for nprobe in _as_list(nprobes):
+            for ef_search in _as_list(ef_searches):
+                latencies = []
+                found = np.empty_like(truth)
+                for i, query in enumerate(queries):
+                    start = time.perf_counter()
+                    _, ids = index.search(query.reshape(1, -1), k, nprobe=nprobe, ef_search=ef_search)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    found[i] = ids[0]
+                recall = np.mean([
+                    len(set(found[i]) & set(truth[i])) / k for i in range(len(queries))
+                ])
+                report.append({
+                    **config,
+                    "nprobe": nprobe,
+                    "ef_search": ef_search,
+                    "trained": index.is_trained,
+                    "build_seconds": build_seconds,
+                    f"recall@{k}": float(recall),
+                    "mean_latency_ms": float(np.mean(latencies)),
+                    "p95_latency_ms": float(np.percentile(latencies, 95))
+                })
+    return report
+
+def _as_list(value) -> List:
+    if value is None:
+        return [None]
+    return list(value) if isinstance(value, (list, tuple)) else [value]
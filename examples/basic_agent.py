@@ -74,14 +74,9 @@ def create_crypto_agent():
 
 # examples/custom_knowledge.py
 from gracie import Agent, Topic, KnowledgeConfig
-import json
 
 def create_custom_agent(knowledge_file: str):
     """Create an agent with custom knowledge"""
-    # Load custom knowledge
-    with open(knowledge_file, 'r') as f:
-        custom_knowledge = json.load(f)
-    
     # Initialize agent
     agent = Agent(
         name="CustomAgent",
@@ -91,17 +86,22 @@ def create_custom_agent(knowledge_file: str):
         )
     )
     
-    # Convert and add knowledge
-    topics = [
-        Topic(
-            name=k["name"],
-            definition=k["definition"],
-            facts=k["facts"]
+    # Stream, validate and deduplicate the file; invalid records go to a .rejects.jsonl file
+    agent.add_knowledge_file(knowledge_file)
+    return agent
+
+def create_replica_agent(snapshot_dir: str):
+    """Create an agent seeded from a snapshot exported by another node"""
+    agent = Agent(
+        name="ReplicaAgent",
+        knowledge_config=KnowledgeConfig(
+            enable_faiss=True,
+            max_contexts=15
         )
-        for k in custom_knowledge
-    ]
+    )
     
-    agent.add_knowledge(topics)
+    # Embeddings come from the snapshot, so nothing is re-encoded
+    agent.knowledge.load_snapshot(snapshot_dir)
     return agent
 
 if __name__ == "__main__":
@@ -116,3 +116,8 @@ if __name__ == "__main__":
     # Custom agent example
     custom_agent = create_custom_agent("custom_knowledge.json")
     print(custom_agent.process_input("Tell me what you know"))
+    
+    # Seed a replica without re-embedding
+    custom_agent.knowledge.export_snapshot("custom_knowledge_snapshot")
+    replica_agent = create_replica_agent("custom_knowledge_snapshot")
+    print(replica_agent.process_input("Tell me what you know"))
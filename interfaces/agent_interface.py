@@ -1,8 +1,20 @@
 # gracie/interfaces/agent_interface.py
-from typing import List, Optional, Dict
-from ..core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
-from ..models.topic import Topic
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from ..core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig, IngestResult
+from ..core.interaction_store import InteractionStore
+from ..models.interaction import Interaction
+from ..models.topic import DEFAULT_NAMESPACE, Topic
+from ..utils.ingest import IngestPipeline, IngestReport
 from ..utils.logger import setup_logger
+from ..utils.metrics import StageMetrics, prometheus_text
+from ..utils.profiler import profiler
+
+class AgentOverloadedError(Exception):
+    """Raised when more requests are waiting than the agent accepts"""
 
 class Agent:
     """Base agent interface"""
@@ -11,34 +23,303 @@ class Agent:
         name: str,
         knowledge_config: Optional[KnowledgeConfig] = None,
         personality_traits: List[Dict] = None,
-        memory_retention: float = 0.8
+        memory_retention: float = 0.8,
+        llm_manager=None,
+        llm_provider: Optional[str] = None,
+        max_concurrency: int = 64,
+        max_pending: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        request_timeout: Optional[float] = 30.0,
+        max_interactions: int = 10000,
+        recall_turns: int = 3,
+        namespace: Optional[str] = None
     ):
+        """
+        Args:
+            name (str): Agent name
+            knowledge_config (KnowledgeConfig): Knowledge system configuration
+            personality_traits (List[Dict]): Traits with "name" and "strength"
+            memory_retention (float): Weight a past interaction keeps per day of age when recalled
+            llm_manager (LLMManager): Generates responses when provided
+            llm_provider (str): Provider name registered with llm_manager
+            max_concurrency (int): Requests processed at once by the async API
+            max_pending (int): Requests allowed to wait for a slot before
+                AgentOverloadedError is raised; unbounded when None
+            max_workers (int): Threads for encoding, search and database reads
+            request_timeout (float): Per-request timeout in seconds for the async API
+            max_interactions (int): Past interactions kept before the oldest are dropped
+            recall_turns (int): Past interactions added to each prompt; 0 disables recall
+            namespace (str): Knowledge namespace the agent retrieves from; topics
+                it adds in the default namespace are stored there. Agents sharing
+                a knowledge base see all of it when None
+        """
         self.name = name
         self.logger = setup_logger(f"Agent_{name}")
         self.knowledge = GracieKnowledgeSystem(knowledge_config)
         self.personality_traits = personality_traits or []
         self.memory_retention = memory_retention
+        self.llm_manager = llm_manager
+        self.llm_provider = llm_provider
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"Agent_{name}")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._pending = 0
+        self.metrics = StageMetrics("gracie_agent")
+        self.recall_turns = recall_turns
+        self.namespace = namespace
+        self._knowledge_filter = [("namespace", "==", namespace)] if namespace else None
+        self.interactions = InteractionStore(
+            self.knowledge.db,
+            name,
+            self.knowledge.encode,
+            memory_retention=memory_retention,
+            max_interactions=max_interactions
+        )
         
     def process_input(self, user_input: str) -> str:
         """Process user input and generate response"""
         try:
-            # Get relevant knowledge
-            knowledge = self.knowledge.get_relevant_knowledge(user_input)
-            
-            # Apply personality traits
-            # This is where you'd integrate with your LLM
-            response = f"Agent {self.name} processed: {user_input}"
-            
-            return response
+            with self.metrics.span("respond"):
+                # Get relevant knowledge
+                knowledge = self.knowledge.get_relevant_knowledge(user_input, filter=self._knowledge_filter)
+                
+                # Apply personality traits
+                # This is where you'd integrate with your LLM
+                response = f"Agent {self.name} processed: {user_input}"
+                self._remember(user_input, response)
+                
+                return response
         except Exception as e:
             self.logger.error(f"Error processing input: {e}")
             return f"Error processing input: {str(e)}"
-            
-    def add_knowledge(self, topics: List[Topic]):
+
+    async def aprocess_input(self, user_input: str, timeout: Optional[float] = None) -> str:
+        """
+        Process user input without blocking the event loop.
+
+        Retrieval runs in the agent's thread pool and generation is awaited
+        on the configured LLM provider. At most max_concurrency requests run
+        at once; further requests wait, and are rejected with
+        AgentOverloadedError once max_pending are already waiting.
+        """
+        async with self._slot():
+            try:
+                return await asyncio.wait_for(
+                    self._respond(user_input),
+                    timeout if timeout is not None else self.request_timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.error(f"Timed out processing input after {timeout or self.request_timeout}s")
+                self.metrics.error("timeout")
+                return "Error processing input: request timed out"
+            except Exception as e:
+                self.logger.error(f"Error processing input: {e}")
+                return f"Error processing input: {str(e)}"
+
+    async def astream_input(
+        self,
+        user_input: str,
+        timeout: Optional[float] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process user input, yielding the response in chunks as it is generated.
+
+        Concurrency limits match aprocess_input. The timeout bounds the wait
+        for each chunk rather than the whole response, so long answers are
+        not cut off while tokens keep arriving. Errors are yielded as a
+        final chunk.
+        """
+        timeout = timeout if timeout is not None else self.request_timeout
+        async with self._slot():
+            chunks = None
+            try:
+                loop = asyncio.get_running_loop()
+                knowledge, history = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, self._gather_context, user_input),
+                    timeout
+                )
+                if self.llm_manager is None or self.llm_provider is None:
+                    response = f"Agent {self.name} processed: {user_input}"
+                    await loop.run_in_executor(self._executor, self._remember, user_input, response)
+                    yield response
+                    return
+                chunks = self.llm_manager.generate_stream(
+                    self.llm_provider,
+                    self._build_prompt(user_input, knowledge, history),
+                    self._build_context(),
+                    max_new_tokens
+                )
+                received = []
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                    except StopAsyncIteration:
+                        break
+                    received.append(chunk)
+                    yield chunk
+                await loop.run_in_executor(self._executor, self._remember, user_input, "".join(received))
+            except asyncio.TimeoutError:
+                self.logger.error(f"Timed out streaming response after {timeout}s")
+                self.metrics.error("timeout")
+                yield "Error processing input: request timed out"
+            except Exception as e:
+                self.logger.error(f"Error processing input: {e}")
+                self.metrics.error("stream")
+                yield f"Error processing input: {str(e)}"
+            finally:
+                if chunks is not None:
+                    await chunks.aclose()
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Hold one of max_concurrency processing slots, applying backpressure."""
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.max_pending is not None and self._pending >= self.max_pending:
+            self.metrics.error("overloaded")
+            raise AgentOverloadedError(f"Agent {self.name} has {self._pending} requests waiting")
+
+        self._pending += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._pending -= 1
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    async def aprocess_batch(self, inputs: List[str], timeout: Optional[float] = None) -> List[str]:
+        """Process many inputs concurrently, returning responses in input order"""
+        results = await asyncio.gather(
+            *(self.aprocess_input(user_input, timeout) for user_input in inputs),
+            return_exceptions=True
+        )
+        return [
+            f"Error processing input: {result}" if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    async def _respond(self, user_input: str) -> str:
+        loop = asyncio.get_running_loop()
+        async with self.metrics.span("respond"):
+            knowledge, history = await loop.run_in_executor(self._executor, self._gather_context, user_input)
+            if self.llm_manager is None or self.llm_provider is None:
+                response = f"Agent {self.name} processed: {user_input}"
+            else:
+                response = await self.llm_manager.generate(
+                    self.llm_provider,
+                    self._build_prompt(user_input, knowledge, history),
+                    self._build_context()
+                )
+            await loop.run_in_executor(self._executor, self._remember, user_input, response)
+            return response
+
+    def _gather_context(self, user_input: str):
+        """Relevant topics and past interactions for an input."""
+        knowledge = self.knowledge.get_relevant_knowledge(user_input, filter=self._knowledge_filter)
+        history = []
+        if self.recall_turns > 0:
+            with self.metrics.span("recall"):
+                history = [interaction for interaction, _ in self.interactions.recall(user_input, self.recall_turns)]
+        return knowledge, history
+
+    def _remember(self, user_input: str, response: str):
+        self.interactions.record(Interaction(user_input=user_input, agent_response=response, confidence=1.0))
+
+    def _build_prompt(self, user_input: str, knowledge: List[Topic], history: Optional[List[Interaction]] = None) -> str:
+        sections = []
+        if knowledge:
+            context = "\n".join(
+                f"- {topic.name}: {topic.definition}" + "".join(f"\n  * {fact}" for fact in topic.facts)
+                for topic in knowledge
+            )
+            sections.append(f"Relevant knowledge:\n{context}")
+        if history:
+            turns = "\n".join(
+                f"- User: {interaction.user_input}\n  {self.name}: {interaction.agent_response}"
+                for interaction in history
+            )
+            sections.append(f"Relevant past conversation:\n{turns}")
+        if not sections:
+            return user_input
+        return "\n\n".join(sections) + f"\n\nUser: {user_input}"
+
+    def _build_context(self) -> Dict:
+        traits = ", ".join(
+            f"{trait['name']} ({trait.get('strength', 1.0):.1f})" if isinstance(trait, dict) else str(trait)
+            for trait in self.personality_traits
+        )
+        system_prompt = f"You are {self.name}."
+        if traits:
+            system_prompt += f" Personality traits: {traits}."
+        return {"system_prompt": system_prompt}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Semaphores are bound to a loop, so one is created per running loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def warmup(self):
+        """Load the embedding model and, when configured, the LLM before serving"""
+        self.knowledge.warmup()
+        if self.llm_manager is not None and self.llm_provider is not None:
+            self.llm_manager.warmup(self.llm_provider)
+
+    def add_knowledge(self, topics: Iterable[Topic], batch_size: Optional[int] = None) -> IngestResult:
         """Add new knowledge to the agent"""
-        for topic in topics:
-            self.knowledge.add_topic(topic)
-            
+        if self.namespace:
+            topics = map(self._claim, topics)
+        result = self.knowledge.add_topics(topics, batch_size=batch_size)
+        if result.failed:
+            self.logger.warning(f"{len(result.failed)} of {result.total} topics were not added")
+        return result
+
+    def add_knowledge_file(
+        self,
+        path: str,
+        reject_path: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> IngestReport:
+        """Stream, validate and deduplicate topics from a JSON or JSONL file into the agent's knowledge"""
+        report = IngestPipeline(
+            self.knowledge, batch_size=batch_size, reject_path=reject_path, namespace=self.namespace
+        ).run(path)
+        if report.reject_path:
+            self.logger.warning(
+                f"{report.rejected + report.duplicates} of {report.read} records were not added, see {report.reject_path}"
+            )
+        return report
+
+    def _claim(self, topic: Topic) -> Topic:
+        """Copy of topic moved into the agent's namespace if it is in the default one"""
+        if topic.namespace == DEFAULT_NAMESPACE:
+            return replace(topic, namespace=self.namespace)
+        return topic
+
     def get_stats(self) -> Dict:
         """Get agent statistics"""
-        return self.knowledge.get_stats()
+        self.interactions.flush()
+        stats = self.knowledge.get_stats()
+        stats["interactions"] = self.interactions.get_stats()
+        if self.llm_manager is not None and self.llm_provider is not None:
+            stats["llm"] = self.llm_manager.get_stats(self.llm_provider)
+        stats["agent_metrics"] = self.metrics.snapshot()
+        stats["profiler"] = profiler.get_stats() if profiler.running else None
+        return stats
+
+    def export_metrics(self) -> str:
+        """Agent, knowledge and LLM stage metrics in Prometheus text format"""
+        return prometheus_text(self.metrics, self.knowledge.metrics, getattr(self.llm_manager, "metrics", None))
+
+    def close(self):
+        """Release worker threads and persist the knowledge index"""
+        self._executor.shutdown(wait=True)
+        self.interactions.close()
+        self.knowledge.close()
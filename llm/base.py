@@ -1,6 +1,7 @@
 # gracie/llm/llm_base.py
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass
 
 @dataclass
@@ -9,14 +10,22 @@ class LLMConfig:
     provider: str
     model_name: str
     api_key: Optional[str] = None
-    max_tokens: int = 2000
+    max_tokens: int = 2000  # Tokens generated per response, not counting the prompt
     temperature: float = 0.7
     top_p: float = 1.0
     presence_penalty: float = 0.0
     frequency_penalty: float = 0.0
+    max_batch_size: int = 16  # Prompts or texts per forward pass
+    batch_wait_ms: float = 5.0  # How long LLMManager waits to coalesce concurrent calls; 0 disables
+    prefix_cache_mb: float = 256.0  # Attention state kept for repeated system prompts; 0 disables
+    response_cache: Optional[bool] = None  # LLMManager response caching; None caches only when temperature is 0
 
 class BaseLLMProvider(ABC):
     """Base class for LLM providers"""
+    # Whether generate_batch/embed_batch run one forward pass per batch,
+    # making it worthwhile for LLMManager to coalesce concurrent calls
+    supports_batching = False
+
     def __init__(self, config: LLMConfig):
         self.config = config
 
@@ -25,7 +34,45 @@ class BaseLLMProvider(ABC):
         """Generate text based on prompt and context"""
         pass
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the response in chunks as it is generated.
+
+        Providers without native streaming yield the full response once.
+        max_new_tokens overrides config.max_tokens for this call.
+        """
+        yield await self.generate(prompt, context)
+
     @abstractmethod
     async def embed(self, text: str) -> List[float]:
         """Generate embeddings for text"""
         pass
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        contexts: Optional[List[Optional[Dict]]] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> List[str]:
+        """Generate one response per prompt; runs the prompts concurrently by default"""
+        contexts = contexts or [None] * len(prompts)
+        return list(await asyncio.gather(*(
+            self.generate(prompt, context) for prompt, context in zip(prompts, contexts)
+        )))
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts; runs the texts concurrently by default"""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def warmup(self):
+        """Load models or open connections ahead of the first request"""
+        pass
+
+    def get_stats(self) -> Dict:
+        """Provider-specific cache and usage statistics"""
+        return {}
@@ -1,54 +1,324 @@
 # gracie/integrations/huggingface_provider.py
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
-from typing import Dict, List, Optional
+import asyncio
+import copy
+import threading
+from typing import AsyncIterator, Dict, List, Optional
 from .llm_base import BaseLLMProvider, LLMConfig
+from .prefix_cache import PrefixCache
+from ..core.model_registry import registry
+from ..utils.lazy import lazy_import
+
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+
+class _StopWhenSet:
+    """Stopping criterion that ends generation once an event is set"""
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+def _expand_state(state, batch_size: int):
+    """Copy of a batch-of-one past_key_values object repeated batch_size times."""
+    state = copy.deepcopy(state)
+    if batch_size == 1:
+        return state
+    if hasattr(state, "batch_repeat_interleave"):
+        state.batch_repeat_interleave(batch_size)
+        return state
+    return tuple(tuple(tensor.repeat_interleave(batch_size, dim=0) for tensor in layer) for layer in state)
+
+def _state_nbytes(state) -> int:
+    """Total tensor size of a past_key_values object."""
+    if hasattr(state, "to_legacy_cache"):
+        state = state.to_legacy_cache()
+    total, stack = 0, [state]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (tuple, list)):
+            stack.extend(item)
+        elif hasattr(item, "element_size"):
+            total += item.numel() * item.element_size()
+    return total
 
 class HuggingFaceProvider(BaseLLMProvider):
-    """HuggingFace integration"""
+    """
+    HuggingFace integration
+
+    Weights are loaded on the first request (or by ``warmup``) and shared
+    by every provider in the process configured with the same model name.
+    Attention state for system prompts is kept in a PrefixCache. Prompts
+    sharing a system prompt, alone or in a coalesced batch, are generated
+    together from its cached state, so the model only runs over the new tokens.
+    """
+    supports_batching = True
+
     def __init__(self, config: LLMConfig):
         super().__init__(config)
-        self.tokenizer = AutoTokenizer.from_pretrained(config.model_name)
-        self.model = AutoModelForCausalLM.from_pretrained(config.model_name)
+        self.model_key = ("huggingface", config.model_name)
+        self.prefix_cache = PrefixCache(int(config.prefix_cache_mb * 1024 * 1024)) if config.prefix_cache_mb > 0 else None
+
+    def _load(self):
+        tokenizer = transformers.AutoTokenizer.from_pretrained(self.config.model_name)
+        # Decoder-only models continue from the last position, so batches pad on the left
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        model = transformers.AutoModelForCausalLM.from_pretrained(self.config.model_name)
         if torch.cuda.is_available():
-            self.model = self.model.to('cuda')
+            model = model.to('cuda')
+        return tokenizer, model
 
-    async def generate(self, prompt: str, context: Optional[Dict] = None) -> str:
-        try:
-            # Prepare input text
-            input_text = prompt
-            if context and context.get('system_prompt'):
-                input_text = f"{context['system_prompt']}\n\n{prompt}"
-
-            inputs = self.tokenizer(input_text, return_tensors="pt")
-            if torch.cuda.is_available():
-                inputs = inputs.to('cuda')
-
-            # Generate response
-            outputs = self.model.generate(
-                inputs["input_ids"],
-                max_length=self.config.max_tokens,
-                temperature=self.config.temperature,
-                top_p=self.config.top_p,
-                num_return_sequences=1
+    @property
+    def tokenizer(self):
+        return registry.get(self.model_key, self._load)[0]
+
+    @property
+    def model(self):
+        return registry.get(self.model_key, self._load)[1]
+
+    @property
+    def is_loaded(self) -> bool:
+        return registry.is_loaded(self.model_key)
+
+    def warmup(self):
+        registry.get(self.model_key, self._load)
+
+    @staticmethod
+    def _input_text(prompt: str, context: Optional[Dict] = None) -> str:
+        if context and context.get('system_prompt'):
+            return f"{context['system_prompt']}\n\n{prompt}"
+        return prompt
+
+    def _prepare_inputs(self, prompts: List[str], contexts: Optional[List[Optional[Dict]]] = None):
+        contexts = contexts or [None] * len(prompts)
+        inputs = self.tokenizer(
+            [self._input_text(prompt, context) for prompt, context in zip(prompts, contexts)],
+            return_tensors="pt",
+            padding=True
+        )
+        if torch.cuda.is_available():
+            inputs = inputs.to('cuda')
+        return inputs
+
+    def _prefix_inputs(self, prefix: str, prompts: List[str]) -> Dict:
+        """
+        Tokenize prefix and prompts separately and attach cached state for the prefix.
+
+        The prefix is encoded on its own so its token ids (and cache key) do
+        not depend on the text that follows it. On a miss its state is
+        computed with one forward pass and cached. Shorter prompts are padded
+        between the prefix and the prompt, masked out of attention, so the
+        prefix keeps the positions its cached state was computed at.
+        """
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"]
+        prompt_ids = [self.tokenizer(prompt, add_special_tokens=False)["input_ids"] for prompt in prompts]
+        if torch.cuda.is_available():
+            prefix_ids = prefix_ids.to('cuda')
+
+        key = PrefixCache.key(self.config.model_name, prefix_ids[0].tolist())
+        state = self.prefix_cache.get(key)
+        if state is None:
+            with torch.inference_mode():
+                state = self.model(prefix_ids, use_cache=True).past_key_values
+            self.prefix_cache.put(key, state, prefix_ids.shape[1], _state_nbytes(state))
+
+        width = max(len(ids) for ids in prompt_ids)
+        pad_id = self.tokenizer.pad_token_id
+        suffix_ids = torch.tensor(
+            [[pad_id] * (width - len(ids)) + ids for ids in prompt_ids], dtype=prefix_ids.dtype, device=prefix_ids.device
+        )
+        suffix_mask = torch.tensor(
+            [[0] * (width - len(ids)) + [1] * len(ids) for ids in prompt_ids], dtype=torch.long, device=prefix_ids.device
+        )
+        batch_prefix = prefix_ids.expand(len(prompts), -1)
+        # generate() derives position ids from the mask, so the padding takes no positions
+        # generate() extends the cache in place, so each call works on a copy
+        return {
+            "input_ids": torch.cat([batch_prefix, suffix_ids], dim=1),
+            "attention_mask": torch.cat([torch.ones_like(batch_prefix), suffix_mask], dim=1),
+            "past_key_values": _expand_state(state, len(prompts))
+        }
+
+    @staticmethod
+    def _system_prompt(context: Optional[Dict]) -> Optional[str]:
+        return (context.get('system_prompt') or None) if context else None
+
+    def _prefix_groups(self, contexts: List[Optional[Dict]]) -> List[List[int]]:
+        """Positions of contexts grouped by system prompt, or one group without a prefix cache."""
+        if self.prefix_cache is None:
+            return [list(range(len(contexts)))]
+        groups: Dict[Optional[str], List[int]] = {}
+        for position, context in enumerate(contexts):
+            groups.setdefault(self._system_prompt(context), []).append(position)
+        return list(groups.values())
+
+    def _generation_inputs(
+        self,
+        prompts: List[str],
+        contexts: List[Optional[Dict]],
+        max_new_tokens: Optional[int] = None
+    ) -> Dict:
+        system_prompts = {self._system_prompt(context) for context in contexts}
+        system_prompt = system_prompts.pop() if len(system_prompts) == 1 else None
+        if system_prompt and self.prefix_cache is not None:
+            inputs = self._prefix_inputs(f"{system_prompt}\n\n", prompts)
+        else:
+            inputs = self._prepare_inputs(prompts, contexts)
+        return self._generation_kwargs(inputs, max_new_tokens)
+
+    def _generation_kwargs(self, inputs, max_new_tokens: Optional[int] = None) -> Dict:
+        # max_new_tokens excludes the prompt, so long prompts do not eat the output budget
+        kwargs = dict(
+            **inputs,
+            max_new_tokens=max_new_tokens or self.config.max_tokens,
+            num_return_sequences=1,
+            do_sample=self.config.temperature > 0
+        )
+        if kwargs["do_sample"]:
+            kwargs.update(temperature=self.config.temperature, top_p=self.config.top_p)
+        return kwargs
+
+    def _run_generate(self, **kwargs):
+        # inference_mode is thread-local, so it is entered on the worker thread
+        with torch.inference_mode():
+            return self.model.generate(**kwargs)
+
+    def _generate_chunk(
+        self,
+        prompts: List[str],
+        contexts: List[Optional[Dict]],
+        max_new_tokens: Optional[int] = None
+    ) -> List[str]:
+        # Each system prompt's group is generated from its cached prefix state
+        responses = [None] * len(prompts)
+        for positions in self._prefix_groups(contexts):
+            kwargs = self._generation_inputs(
+                [prompts[i] for i in positions], [contexts[i] for i in positions], max_new_tokens
             )
+            prompt_length = kwargs["input_ids"].shape[1]
+            outputs = self._run_generate(**kwargs)
+            texts = self.tokenizer.batch_decode(outputs[:, prompt_length:], skip_special_tokens=True)
+            for position, text in zip(positions, texts):
+                responses[position] = text
+        return responses
+
+    async def generate(self, prompt: str, context: Optional[Dict] = None) -> str:
+        return (await self.generate_batch([prompt], [context]))[0]
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        contexts: Optional[List[Optional[Dict]]] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> List[str]:
+        """
+        Generate responses for many prompts, config.max_batch_size per forward pass.
 
-            return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        Prompts are left-padded to a common length; the attention mask keeps
+        padding out of attention and each output is decoded after the
+        padded prompt. With a prefix cache, each system prompt's prompts run
+        as one batch from its cached state, padded after the system prompt.
+        """
+        try:
+            contexts = contexts or [None] * len(prompts)
+            loop = asyncio.get_running_loop()
+            responses = []
+            for start in range(0, len(prompts), self.config.max_batch_size):
+                # Generation releases the GIL in native code; keep it off the event loop
+                responses.extend(await loop.run_in_executor(
+                    None,
+                    self._generate_chunk,
+                    prompts[start:start + self.config.max_batch_size],
+                    contexts[start:start + self.config.max_batch_size],
+                    max_new_tokens
+                ))
+            return responses
 
         except Exception as e:
             raise Exception(f"HuggingFace generation error: {str(e)}")
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield decoded text as tokens are produced.
+
+        ``model.generate`` runs in a background thread feeding a
+        TextIteratorStreamer. Closing the iterator early stops generation
+        at the next token.
+        """
+        streamer = transformers.TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        stop = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                kwargs = self._generation_inputs([prompt], [context], max_new_tokens)
+                kwargs.update(
+                    streamer=streamer,
+                    stopping_criteria=transformers.StoppingCriteriaList([_StopWhenSet(stop)])
+                )
+                self._run_generate(**kwargs)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        thread = threading.Thread(target=run, name="HuggingFaceStream", daemon=True)
+        thread.start()
+        loop = asyncio.get_running_loop()
+        done = object()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, next, streamer, done)
+                if chunk is done:
+                    break
+                if chunk:
+                    yield chunk
+        finally:
+            stop.set()
+            await loop.run_in_executor(None, thread.join)
+        if errors:
+            raise Exception(f"HuggingFace generation error: {str(errors[0])}")
+
+    def get_stats(self) -> Dict:
+        return {"prefix_cache": self.prefix_cache.get_stats() if self.prefix_cache else None}
+
     async def embed(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts, config.max_batch_size per forward pass.
+
+        Uses the final hidden layer mean-pooled over real tokens only; the
+        attention mask excludes padding from the average.
+        """
         try:
-            inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-            if torch.cuda.is_available():
-                inputs = inputs.to('cuda')
-            
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            # Use the last hidden state as embedding
-            embeddings = outputs.last_hidden_state.mean(dim=1)
-            return embeddings[0].cpu().numpy().tolist()
+            loop = asyncio.get_running_loop()
+            embeddings = []
+            for start in range(0, len(texts), self.config.max_batch_size):
+                inputs = self.tokenizer(
+                    list(texts[start:start + self.config.max_batch_size]),
+                    return_tensors="pt", padding=True, truncation=True
+                )
+                if torch.cuda.is_available():
+                    inputs = inputs.to('cuda')
+                pooled = await loop.run_in_executor(None, self._mean_pool, inputs)
+                embeddings.extend(pooled.tolist())
+            return embeddings
         except Exception as e:
             raise Exception(f"HuggingFace embedding error: {str(e)}")
+
+    def _mean_pool(self, inputs):
+        with torch.inference_mode():
+            # Causal-LM heads return logits; hidden states must be requested explicitly
+            outputs = self.model(**inputs, output_hidden_states=True)
+            hidden = outputs.hidden_states[-1]
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return pooled.float().cpu().numpy()
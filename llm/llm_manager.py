@@ -1,31 +1,175 @@
 # gracie/integrations/llm_manager.py
-from typing import Dict, Optional
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from .llm_base import LLMConfig, BaseLLMProvider
-from .openai_provider import OpenAIProvider
-from .huggingface_provider import HuggingFaceProvider
+from .request_coalescer import RequestCoalescer
+from .response_cache import ResponseCache
+from ..utils.metrics import StageMetrics
 
 class LLMManager:
-    """Manages LLM integrations"""
-    def __init__(self):
+    """
+    Manages LLM integrations
+
+    For providers that support batching, concurrent generate and embed
+    calls are coalesced into generate_batch/embed_batch calls over a
+    window of config.batch_wait_ms. With a ResponseCache, repeated (or,
+    with its semantic tier, near-duplicate) prompts to cacheable providers
+    are answered without calling the provider. Generation and embedding
+    latency and failures are recorded per provider in ``metrics``.
+    """
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
         self.providers: Dict[str, BaseLLMProvider] = {}
+        self.response_cache = response_cache
+        self._coalescers: Dict[Tuple[str, str], RequestCoalescer] = {}
+        self.metrics = StageMetrics("gracie_llm")
 
     def add_provider(self, config: LLMConfig) -> None:
         """Add a new LLM provider"""
+        # Provider SDKs are imported only when a provider of that kind is added
         if config.provider.lower() == "openai":
-            self.providers[config.provider] = OpenAIProvider(config)
+            from .openai_provider import OpenAIProvider
+            self.register_provider(OpenAIProvider(config))
         elif config.provider.lower() == "huggingface":
-            self.providers[config.provider] = HuggingFaceProvider(config)
+            from .huggingface_provider import HuggingFaceProvider
+            self.register_provider(HuggingFaceProvider(config))
         else:
             raise ValueError(f"Unsupported provider: {config.provider}")
 
+    def register_provider(self, provider: BaseLLMProvider) -> None:
+        """Add an already constructed provider under its config.provider name"""
+        config = provider.config
+        self.providers[config.provider] = provider
+        for kind in ("generate", "embed"):
+            self._coalescers.pop((config.provider, kind), None)
+        if provider.supports_batching and config.batch_wait_ms > 0:
+            self._coalescers[(config.provider, "generate")] = RequestCoalescer(
+                lambda requests: provider.generate_batch(
+                    [prompt for prompt, _ in requests], [context for _, context in requests]
+                ),
+                max_batch_size=config.max_batch_size,
+                max_wait_ms=config.batch_wait_ms,
+                name=f"{config.provider}.generate"
+            )
+            self._coalescers[(config.provider, "embed")] = RequestCoalescer(
+                provider.embed_batch,
+                max_batch_size=config.max_batch_size,
+                max_wait_ms=config.batch_wait_ms,
+                name=f"{config.provider}.embed"
+            )
+
+    def warmup(self, provider: Optional[str] = None) -> None:
+        """Load one provider's model, or every provider's when none is named"""
+        names = [provider] if provider is not None else list(self.providers)
+        for name in names:
+            if name not in self.providers:
+                raise ValueError(f"Provider {name} not configured")
+            self.providers[name].warmup()
+
     async def generate(self, provider: str, prompt: str, context: Optional[Dict] = None) -> str:
         """Generate text using specified provider"""
         if provider not in self.providers:
             raise ValueError(f"Provider {provider} not configured")
-        return await self.providers[provider].generate(prompt, context)
+        cache = self._response_cache_for(provider)
+        if cache is not None:
+            cached = await self._run_cache(cache.get, self.providers[provider].config, prompt, context)
+            if cached is not None:
+                return cached
+
+        coalescer = self._coalescers.get((provider, "generate"))
+        async with self.metrics.span("generate", provider=provider):
+            if coalescer is not None:
+                response = await coalescer.submit((prompt, context))
+            else:
+                response = await self.providers[provider].generate(prompt, context)
+
+        if cache is not None:
+            await self._run_cache(cache.put, self.providers[provider].config, prompt, response, context)
+        return response
+
+    def _response_cache_for(self, provider: str) -> Optional[ResponseCache]:
+        if self.response_cache is not None and ResponseCache.cacheable(self.providers[provider].config):
+            return self.response_cache
+        return None
+
+    async def _run_cache(self, method, *args):
+        # Semantic lookups embed the prompt, which would stall the event loop
+        if self.response_cache.semantic:
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+        return method(*args)
+
+    async def generate_batch(
+        self,
+        provider: str,
+        prompts: List[str],
+        contexts: Optional[List[Optional[Dict]]] = None
+    ) -> List[str]:
+        """Generate responses for many prompts in as few forward passes as the provider allows"""
+        if provider not in self.providers:
+            raise ValueError(f"Provider {provider} not configured")
+        async with self.metrics.span("generate_batch", provider=provider):
+            return await self.providers[provider].generate_batch(prompts, contexts)
+
+    async def generate_stream(
+        self,
+        provider: str,
+        prompt: str,
+        context: Optional[Dict] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream generated text from the specified provider as it is produced"""
+        if provider not in self.providers:
+            raise ValueError(f"Provider {provider} not configured")
+        # A shorter token budget could truncate the answer, so only full-length streams use the cache
+        cache = self._response_cache_for(provider) if max_new_tokens is None else None
+        if cache is not None:
+            cached = await self._run_cache(cache.get, self.providers[provider].config, prompt, context)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        start = time.perf_counter()
+        async with self.metrics.span("generate_stream", provider=provider):
+            async for chunk in self.providers[provider].generate_stream(prompt, context, max_new_tokens):
+                if not chunks:
+                    self.metrics.observe("first_token", time.perf_counter() - start, provider=provider)
+                chunks.append(chunk)
+                yield chunk
+        if cache is not None:
+            await self._run_cache(cache.put, self.providers[provider].config, prompt, "".join(chunks), context)
 
     async def embed(self, provider: str, text: str) -> List[float]:
         """Generate embeddings using specified provider"""
         if provider not in self.providers:
             raise ValueError(f"Provider {provider} not configured")
-        return await self.providers[provider].embed(text)
+        coalescer = self._coalescers.get((provider, "embed"))
+        async with self.metrics.span("embed", provider=provider):
+            if coalescer is not None:
+                return await coalescer.submit(text)
+            return await self.providers[provider].embed(text)
+
+    async def embed_batch(self, provider: str, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts using specified provider"""
+        if provider not in self.providers:
+            raise ValueError(f"Provider {provider} not configured")
+        async with self.metrics.span("embed_batch", provider=provider):
+            return await self.providers[provider].embed_batch(texts)
+
+    def get_stats(self, provider: Optional[str] = None) -> Dict:
+        """Cache and batching statistics for one provider, or for every provider by name"""
+        names = [provider] if provider is not None else list(self.providers)
+        stats = {}
+        for name in names:
+            if name not in self.providers:
+                raise ValueError(f"Provider {name} not configured")
+            provider_stats = dict(self.providers[name].get_stats())
+            for kind in ("generate", "embed"):
+                coalescer = self._coalescers.get((name, kind))
+                if coalescer is not None:
+                    provider_stats[f"{kind}_batching"] = coalescer.get_stats()
+            if self._response_cache_for(name) is not None:
+                provider_stats["response_cache"] = self.response_cache.get_stats()
+            provider_stats["metrics"] = self.metrics.snapshot(provider=name)
+            stats[name] = provider_stats
+        return stats[provider] if provider is not None else stats
@@ -0,0 +1,83 @@
+# gracie/llm/prefix_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+@dataclass
+class _PrefixEntry:
+    state: Any
+    num_tokens: int
+    nbytes: int
+
+class PrefixCache:
+    """
+    LRU cache of attention key/value state for shared prompt prefixes.
+
+    Entries are keyed by a hash of the model name and the prefix token ids,
+    so a system prompt is matched exactly as the tokenizer split it. The
+    cache is bounded by the total size of the stored tensors rather than by
+    entry count, since state size grows with prefix length.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, _PrefixEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_tokens = 0
+
+    @staticmethod
+    def key(model_name: str, token_ids: Sequence[int]) -> bytes:
+        digest = hashlib.blake2b(model_name.encode("utf-8"), digest_size=16)
+        digest.update(",".join(map(str, token_ids)).encode("ascii"))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached state for key; a hit counts its prefix tokens as saved."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_tokens += entry.num_tokens
+            return entry.state
+
+    def put(self, key: bytes, state: Any, num_tokens: int, nbytes: int) -> bool:
+        """Store state, evicting least recently used prefixes to stay within max_bytes."""
+        if nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self._entries[key] = _PrefixEntry(state, num_tokens, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_mb": self.bytes / 1024 / 1024,
+            "max_size_mb": self.max_bytes / 1024 / 1024,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_tokens": self.saved_tokens
+        }
@@ -0,0 +1,71 @@
+# gracie/llm/request_coalescer.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from ..utils.metrics import Histogram, SIZE_BUCKETS
+
+class RequestCoalescer:
+    """
+    Merges concurrent awaits into batched calls.
+
+    The first request starts a max_wait_ms timer; every request arriving
+    before it fires (or until max_batch_size are waiting) joins the same
+    call to ``handler``, whose results are handed back in order. This is
+    the asyncio counterpart of core.query_batcher.QueryBatcher.
+    """
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "RequestCoalescer"
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.batch_size = Histogram(f"{name}.batch_size", SIZE_BUCKETS)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batch_size.observe(len(batch))
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": len(self._pending),
+            "batch_size": self.batch_size.snapshot()
+        }
@@ -0,0 +1,187 @@
+# gracie/llm/response_cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .llm_base import LLMConfig
+from ..core.memory_manager import MemoryManager
+from ..core.vector_index import VectorIndex
+
+@dataclass
+class _CachedResponse:
+    response: str
+    scope: bytes
+    expires_at: float
+
+class ResponseCache:
+    """
+    Cache of generated responses with an optional semantic tier.
+
+    The exact tier is keyed by a hash of the provider, model, sampling
+    parameters, prompt and context. When an encoder is given (for example
+    ``GracieKnowledgeSystem.encode``), prompts are also embedded into a
+    MemoryManager/VectorIndex pair like the knowledge system's own, and a
+    miss falls back to the nearest cached prompt with the same provider,
+    parameters and context whose cosine similarity reaches
+    semantic_threshold. Entries expire after ttl_seconds and the least
+    recently used are evicted beyond max_entries.
+    """
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = 3600.0,
+        encoder: Optional[Callable[[List[str]], np.ndarray]] = None,
+        semantic_threshold: float = 0.95,
+        semantic_candidates: int = 8
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.encoder = encoder
+        self.semantic_threshold = semantic_threshold
+        self.semantic_candidates = semantic_candidates
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._memory = MemoryManager()
+        self._index: Optional[VectorIndex] = None
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def semantic(self) -> bool:
+        return self.encoder is not None
+
+    @staticmethod
+    def cacheable(config: LLMConfig) -> bool:
+        """Providers opt in or out with config.response_cache; by default only greedy decoding is cached."""
+        if config.response_cache is not None:
+            return config.response_cache
+        return config.temperature == 0
+
+    @staticmethod
+    def scope(config: LLMConfig, context: Optional[Dict]) -> bytes:
+        """Hash of everything except the prompt that determines a response."""
+        payload = json.dumps([
+            config.provider, config.model_name, config.temperature, config.top_p, config.max_tokens,
+            config.presence_penalty, config.frequency_penalty, context
+        ], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def key(scope: bytes, prompt: str) -> str:
+        return hashlib.blake2b(scope + prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, config: LLMConfig, prompt: str, context: Optional[Dict] = None) -> Optional[str]:
+        """Return a cached response for the prompt, or a near-duplicate's when semantic lookup is on."""
+        scope = self.scope(config, context)
+        key = self.key(scope, prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self.hits += 1
+                return entry.response
+        if self.semantic:
+            response = self._semantic_get(scope, prompt, now)
+            if response is not None:
+                return response
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, config: LLMConfig, prompt: str, response: str, context: Optional[Dict] = None):
+        scope = self.scope(config, context)
+        key = self.key(scope, prompt)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        embedding = self._embed(prompt) if self.semantic else None
+        with self._lock:
+            self._entries[key] = _CachedResponse(response, scope, expires_at)
+            self._entries.move_to_end(key)
+            if embedding is not None:
+                self._index_prompt(key, embedding)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget(evicted)
+                self.evictions += 1
+
+    def _live_entry(self, key: str, now: float) -> Optional[_CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            self._forget(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        embedding = np.asarray(self.encoder([prompt]), dtype=np.float32).reshape(-1)
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+    def _semantic_get(self, scope: bytes, prompt: str, now: float) -> Optional[str]:
+        embedding = self._embed(prompt)
+        with self._lock:
+            if self._index is None or not self._index.ntotal:
+                return None
+            distances, rows = self._index.search(embedding.reshape(1, -1), self.semantic_candidates)
+            for distance, row in zip(distances[0], rows[0]):
+                # Unit vectors: squared L2 distance = 2 - 2 * cosine
+                if row < 0 or 1 - distance / 2 < self.semantic_threshold:
+                    break
+                key = self._memory.get_topic_id(row)
+                entry = self._entries.get(key) if key is not None else None
+                # Expired entries are left for the exact tier to purge so rows stay stable mid-scan
+                if entry is not None and entry.scope == scope and entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.semantic_hits += 1
+                    return entry.response
+        return None
+
+    def _index_prompt(self, key: str, embedding: np.ndarray):
+        if self._index is None:
+            self._index = VectorIndex(
+                len(embedding), vector_source=lambda: (self._memory.get_matrix(), self._memory.get_live_mask())
+            )
+        known = key in self._memory
+        self._memory.add_embedding(embedding, key)
+        rows = np.array([self._memory.get_row(key)], dtype=np.int64)
+        if known:
+            self._index.update(embedding.reshape(1, -1), rows)
+        else:
+            self._index.add(embedding.reshape(1, -1), rows)
+
+    def _forget(self, key: str):
+        row = self._memory.remove_embedding(key)
+        if row is None or self._index is None:
+            return
+        self._index.remove(np.array([row], dtype=np.int64))
+        if self._memory.needs_compaction:
+            self._memory.compact()
+            self._index.rebuild(self._memory.get_matrix(), self._memory.get_live_mask())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory.clear()
+            self._index = None
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0
+        }
@@ -3,6 +3,9 @@ from dataclasses import dataclass
 from typing import List, Optional
 import uuid
 
+# Namespace of topics stored without one
+DEFAULT_NAMESPACE = "default"
+
 @dataclass
 class Topic:
     """Represents a knowledge topic"""
@@ -11,6 +14,7 @@ class Topic:
     facts: List[str]
     confidence: float = 0.0
     id: str = None
+    namespace: str = DEFAULT_NAMESPACE
 
     def __post_init__(self):
         if self.id is None:
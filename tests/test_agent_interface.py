@@ -0,0 +1,141 @@
+# tests/test_agent_interface.py
+import asyncio
+import unittest
+from gracie.core.knowledge_system import KnowledgeConfig
+from gracie.interfaces.agent_interface import Agent, AgentOverloadedError
+from gracie.models.topic import Topic
+
+class FakeLLMManager:
+    """Echoes the prompt back, streaming it one word at a time"""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def generate(self, provider, prompt, context=None):
+        await asyncio.sleep(self.delay)
+        return prompt
+
+    async def generate_stream(self, provider, prompt, context=None, max_new_tokens=None):
+        for word in prompt.split()[:max_new_tokens]:
+            await asyncio.sleep(self.delay)
+            yield word
+
+    def get_stats(self, provider=None):
+        return {"prefix_cache": {"hits": 0}}
+
+class ScriptedLLMManager:
+    """Waits a per-prompt delay, failing on prompts containing "boom", and tracks requests in flight"""
+    def __init__(self, delays):
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = []
+
+    async def generate(self, provider, prompt, context=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(prompt, 0.0))
+            if "boom" in prompt:
+                raise RuntimeError("boom")
+            self.completed.append(prompt)
+            return prompt.upper()
+        finally:
+            self.in_flight -= 1
+
+class TestAgentBatch(unittest.TestCase):
+    def _agent(self, delays, **kwargs) -> Agent:
+        self.llm = ScriptedLLMManager(delays)
+        agent = Agent(
+            "BatchAgent",
+            KnowledgeConfig(db_path=":memory:"),
+            llm_manager=self.llm,
+            llm_provider="scripted",
+            recall_turns=0,
+            **kwargs
+        )
+        self.addCleanup(agent.close)
+        return agent
+
+    def test_batch_order_independent_of_completion(self):
+        agent = self._agent({"slow": 0.06, "medium": 0.03})
+        responses = asyncio.run(agent.aprocess_batch(["slow", "fast", "medium"]))
+        self.assertEqual(self.llm.completed, ["fast", "medium", "slow"])
+        self.assertEqual(responses, ["SLOW", "FAST", "MEDIUM"])
+
+    def test_timeout_only_fails_slow_request(self):
+        agent = self._agent({"slow": 1.0}, request_timeout=0.05)
+        responses = asyncio.run(agent.aprocess_batch(["slow", "fast"]))
+        self.assertEqual(responses, ["Error processing input: request timed out", "FAST"])
+        self.assertEqual(agent.metrics.snapshot()["errors"]["timeout"], 1)
+
+        # An explicit timeout overrides request_timeout
+        self.assertEqual(asyncio.run(agent.aprocess_input("slow", timeout=2.0)), "SLOW")
+
+    def test_errors_returned_in_place(self):
+        agent = self._agent({})
+        responses = asyncio.run(agent.aprocess_batch(["one", "boom", "two"]))
+        self.assertEqual(responses, ["ONE", "Error processing input: boom", "TWO"])
+
+    def test_concurrency_bounded(self):
+        agent = self._agent({f"q{i}": 0.01 for i in range(6)}, max_concurrency=2)
+        responses = asyncio.run(agent.aprocess_batch([f"q{i}" for i in range(6)]))
+        self.assertEqual(responses, [f"Q{i}" for i in range(6)])
+        self.assertEqual(self.llm.max_in_flight, 2)
+
+class TestAgentAsync(unittest.TestCase):
+    def setUp(self):
+        self.agent = Agent(
+            "TestAgent",
+            KnowledgeConfig(db_path=":memory:"),
+            llm_manager=FakeLLMManager(delay=0.01),
+            llm_provider="fake",
+            max_concurrency=2,
+            max_pending=2
+        )
+        self.agent.add_knowledge([Topic(name="ai", definition="Neural networks learn", facts=["AI needs data"])])
+
+    def tearDown(self):
+        self.agent.close()
+
+    def test_batch_keeps_input_order(self):
+        responses = asyncio.run(self.agent.aprocess_batch(["first question on ai", "second question on ai"]))
+        self.assertTrue(responses[0].endswith("User: first question on ai"))
+        self.assertTrue(responses[1].endswith("User: second question on ai"))
+        self.assertIn("AI needs data", responses[0])
+
+    def test_timeout_returns_error(self):
+        response = asyncio.run(self.agent.aprocess_input("slow question", timeout=0.001))
+        self.assertEqual(response, "Error processing input: request timed out")
+
+    def test_rejects_when_queue_is_full(self):
+        async def flood():
+            return await asyncio.gather(*(self.agent.aprocess_input("question") for _ in range(8)))
+        with self.assertRaises(AgentOverloadedError):
+            asyncio.run(flood())
+
+    def test_stream_yields_chunks(self):
+        async def collect():
+            return [chunk async for chunk in self.agent.astream_input("neural networks", max_new_tokens=3)]
+        self.assertEqual(asyncio.run(collect()), ["Relevant", "knowledge:", "-"])
+
+    def test_recalls_past_turns(self):
+        asyncio.run(self.agent.aprocess_input("what is bitcoin"))
+        response = asyncio.run(self.agent.aprocess_input("what is bitcoin"))
+        self.assertIn("Relevant past conversation:\n- User: what is bitcoin", response)
+        self.assertEqual(self.agent.get_stats()["total_interactions"], 2)
+
+    def test_add_knowledge_leaves_caller_topics_unchanged(self):
+        agent = Agent("Scoped", KnowledgeConfig(db_path=":memory:"), namespace="scoped")
+        try:
+            topic = Topic(name="scoped topic", definition="Stored in the agent namespace", facts=[])
+            self.assertTrue(agent.add_knowledge([topic]).success)
+            self.assertEqual(topic.namespace, "default")
+            self.assertEqual(agent.knowledge.db.get_topics_by_ids([topic.id])[0].namespace, "scoped")
+        finally:
+            agent.close()
+
+    def test_stats_include_llm(self):
+        self.assertEqual(self.agent.get_stats()["llm"]["prefix_cache"], {"hits": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+# tests/test_database.py
+import os
+import sqlite3
+import tempfile
+import unittest
+from gracie.core.database import DatabaseManager
+
+class TestDatabaseMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "legacy.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_legacy_facts_migrated_without_failing_on_malformed_rows(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE topics (id TEXT PRIMARY KEY, name TEXT UNIQUE, definition TEXT, facts TEXT, confidence REAL)")
+        conn.executemany("INSERT INTO topics VALUES (?, ?, ?, ?, 0.5)", [
+            ("a", "list", "Stored as a list literal", "['one', 'two']"),
+            ("b", "broken", "Truncated literal", "['one', 'tw"),
+            ("c", "plain", "Plain text facts", "just a sentence"),
+            ("d", "json", "Already JSON", '["kept"]')
+        ])
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(self.db_path)
+        facts = {topic.id: topic.facts for topic in db.get_topics_by_ids(["a", "b", "c", "d"])}
+        self.assertEqual(facts, {
+            "a": ["one", "two"],
+            "b": ["['one', 'tw"],
+            "c": ["just a sentence"],
+            "d": ["kept"]
+        })
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_embedding_cache.py
+import os
+import tempfile
+import unittest
+import numpy as np
+from gracie.core.embedding_cache import EmbeddingCache
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+class TestEmbeddingCache(unittest.TestCase):
+    def test_repeated_and_normalized_texts_hit(self):
+        cache = EmbeddingCache("model", max_entries=10)
+        encoder = CountingEncoder()
+        cache.encode(["hello world", "hello  world ", "other"], encoder)
+        cache.encode(["hello world"], encoder)
+        self.assertEqual(encoder.calls, [["hello world", "other"]])
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_lru_eviction(self):
+        cache = EmbeddingCache("model", max_entries=2)
+        encoder = CountingEncoder()
+        cache.encode(["a", "b", "c"], encoder)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        cache.encode(["a"], encoder)
+        self.assertEqual(encoder.calls[-1], ["a"])
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache.db")
+            cache = EmbeddingCache("model", disk_path=path)
+            cache.encode(["persisted"], CountingEncoder())
+            cache.close()
+
+            restarted = EmbeddingCache("model", disk_path=path)
+            encoder = CountingEncoder()
+            embedding = restarted.encode(["persisted"], encoder)
+            self.assertEqual(encoder.calls, [])
+            self.assertEqual(embedding.tolist(), [[9.0, 1.0]])
+            self.assertEqual(restarted.get_stats()["disk_hits"], 1)
+            restarted.close()
+
+    def test_model_name_is_part_of_key(self):
+        self.assertNotEqual(EmbeddingCache("a").key("text"), EmbeddingCache("b").key("text"))
+
+    def test_empty_input(self):
+        cache = EmbeddingCache("model")
+        encoder = CountingEncoder()
+        self.assertEqual(cache.encode([], encoder).shape, (0, 0))
+        cache.encode(["text"], encoder)
+        self.assertEqual(cache.encode([], encoder).shape, (0, 2))
+        self.assertEqual(len(encoder.calls), 1)
+
+    def test_custom_encoder_not_served_from_disk(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = KnowledgeConfig(db_path=":memory:", embedding_cache_path=os.path.join(tmp_dir, "cache.db"))
+            default = GracieKnowledgeSystem(config)
+            custom = GracieKnowledgeSystem(config, embedding_model=CountingEncoder())
+            self.assertIsNotNone(default.embedding_cache.disk_path)
+            self.assertIsNone(custom.embedding_cache.disk_path)
+            self.assertNotEqual(default.embedding_cache.key("text"), custom.embedding_cache.key("text"))
+            default.close()
+            custom.close()
+
+if __name__ == '__main__':
+    unittest.main()
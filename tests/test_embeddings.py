@@ -0,0 +1,58 @@
+# tests/test_embeddings.py
+import unittest
+import numpy as np
+from gracie.core.embeddings import EmbeddingProcessor
+
+class TestEmbeddingProcessor(unittest.TestCase):
+    def setUp(self):
+        self.processor = EmbeddingProcessor()
+        self.texts = [f"document {i} about topic{i % 3} and word{i}" for i in range(10)]
+
+    def test_single_string_gives_one_vector(self):
+        vector = self.processor.encode("hello world")
+        self.assertEqual(vector.ndim, 1)
+        matrix = self.processor.encode(["hello world", "other"])
+        self.assertEqual(matrix.shape, (2, len(vector)))
+        self.assertEqual(matrix[0].tolist(), vector.tolist())
+
+    def test_similarity_matrix_across_chunks(self):
+        queries = ["topic1 word4", "document about topic2"]
+        expected = self.processor.similarity_matrix(queries, self.texts)
+        self.assertEqual(expected.shape, (2, 10))
+        np.testing.assert_allclose(self.processor.similarity_matrix(queries, self.texts, chunk_size=1), expected, rtol=1e-6)
+
+        # Rows of a cross chunk boundaries; precomputed embeddings give the same scores
+        chunked = self.processor.similarity_matrix(self.texts, queries, chunk_size=3)
+        np.testing.assert_allclose(chunked, expected.T, rtol=1e-6)
+        embeddings = self.processor.encode(self.texts) * 2.5
+        np.testing.assert_allclose(self.processor.similarity_matrix(embeddings, queries, chunk_size=3), expected.T, rtol=1e-5)
+        self.assertAlmostEqual(float(chunked[4, 0]), self.processor.get_similarity(self.texts[4], queries[0]), places=5)
+
+    def test_top_k_similar_across_chunks(self):
+        scores = self.processor.similarity_matrix(["topic1 word7"], self.texts)[0]
+        expected = np.sort(scores)[::-1][:4]
+        results = self.processor.top_k_similar("topic1 word7", self.texts, k=4, chunk_size=3)
+        self.assertEqual(results[0][0], 7)
+        np.testing.assert_allclose([score for _, score in results], expected, rtol=1e-5)
+        for index, score in results:
+            self.assertAlmostEqual(score, float(scores[index]), places=5)
+
+        query = self.processor.encode("topic1 word7")
+        precomputed = self.processor.top_k_similar(query, self.processor.encode(self.texts), k=4, chunk_size=3)
+        self.assertEqual(precomputed[0][0], 7)
+        np.testing.assert_allclose([score for _, score in precomputed], expected, rtol=1e-5)
+
+    def test_k_larger_than_candidates(self):
+        results = self.processor.top_k_similar("topic2", self.texts[:3], k=10)
+        self.assertEqual(sorted(index for index, _ in results), [0, 1, 2])
+        self.assertEqual([score for _, score in results], sorted((score for _, score in results), reverse=True))
+
+    def test_empty_inputs(self):
+        self.assertEqual(self.processor.top_k_similar("topic2", [], k=3), [])
+        self.assertEqual(self.processor.top_k_similar("topic2", np.empty((0, 8), dtype=np.float32), k=3), [])
+        self.assertEqual(self.processor.encode([]).shape, (0, len(self.processor.encode("text"))))
+        self.assertEqual(self.processor.similarity_matrix([], self.texts).shape, (0, 10))
+        self.assertEqual(self.processor.similarity_matrix(self.texts, []).shape, (10, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_ingest.py
+import json
+import os
+import tempfile
+import unittest
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.utils.ingest import IngestPipeline, iter_records
+from gracie.utils.validators import Validator
+
+class TestIngestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.records = [
+            {"name": f"topic {i}", "definition": f"Definition  of topic {i}\x00", "facts": [f" fact {i} ", ""]}
+            for i in range(30)
+        ] + [
+            {"name": " TOPIC  3 ", "definition": "Another definition"},
+            {"name": "copy", "definition": "definition  of TOPIC 4"},
+            {"name": "no definition"},
+            ["not", "an", "object"]
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_array_parsed_across_read_chunks(self):
+        path = self._write("topics.json", json.dumps(self.records, indent=2))
+        records = list(iter_records(path, chunk_size=5))
+        self.assertEqual([record for _, record, _ in records], self.records)
+
+        path = self._write("broken.json", '[{"name": "a", "definition": "b"}, {"name": oops}, {"name": "c"}]')
+        positions = [(position, error is None) for position, _, error in iter_records(path, chunk_size=5)]
+        self.assertEqual(positions, [("item 0", True), ("item 1", False)])
+
+    def test_pipeline_validates_deduplicates_and_reports_rejects(self):
+        lines = [json.dumps(record) for record in self.records] + ["{truncated"]
+        path = self._write("topics.jsonl", "\n".join(lines))
+        knowledge_system = GracieKnowledgeSystem(KnowledgeConfig(db_path=":memory:"))
+        dedup_path = os.path.join(self.tmp_dir.name, "seen.db")
+        pipeline = IngestPipeline(knowledge_system, batch_size=8, dedup_path=dedup_path)
+
+        report = pipeline.run(path)
+        self.assertEqual((report.read, report.added, report.duplicates, report.rejected), (35, 30, 2, 3))
+        with open(report.reject_path) as f:
+            reasons = sorted(json.loads(line)["reason"] for line in f)
+        self.assertEqual(reasons[:2], ["Duplicate definition", "Duplicate name"])
+        self.assertTrue(any(reason.startswith("Invalid JSON") for reason in reasons))
+
+        topic = knowledge_system.get_relevant_knowledge("Definition of topic 7", top_k=1)[0]
+        self.assertEqual((topic.definition, topic.facts), ("Definition of topic 7", ["fact 7"]))
+
+        # A second run skips stored names and, through the dedup file, near-duplicates
+        report = pipeline.run(path)
+        self.assertEqual((report.added, report.duplicates), (0, 32))
+        with open(report.reject_path) as f:
+            reasons = [json.loads(line)["reason"] for line in f]
+        self.assertEqual(reasons.count("Topic name already stored"), 30)
+
+    def test_punctuation_distinguishes_names(self):
+        records = [{"name": name, "definition": f"The {name} topic"} for name in ("C", "C++", "AT&T", "ATT", "c++")]
+        path = self._write("names.jsonl", "\n".join(json.dumps(record) for record in records))
+        knowledge_system = GracieKnowledgeSystem(KnowledgeConfig(db_path=":memory:"))
+        report = IngestPipeline(knowledge_system).run(path)
+        self.assertEqual((report.added, report.duplicates), (4, 1))
+
+    def test_topic_error(self):
+        self.assertIsNone(Validator.topic_error({"name": "a", "definition": "b", "confidence": None}))
+        self.assertEqual(Validator.topic_error({"name": "a"}), "Missing name or definition")
+        self.assertEqual(Validator.topic_error({"name": "a", "definition": " "}), "Field 'definition' must be a non-empty string")
+        self.assertEqual(Validator.normalize_key("  Hello,   World! "), "hello, world!")
+        self.assertNotEqual(Validator.normalize_key("C++"), Validator.normalize_key("C"))
+        self.assertNotEqual(Validator.normalize_key("AT&T"), Validator.normalize_key("ATT"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_interaction_store.py
+import time
+import unittest
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.core.interaction_store import InteractionStore
+from gracie.models.interaction import Interaction
+
+class TestInteractionStore(unittest.TestCase):
+    def setUp(self):
+        self.knowledge_system = GracieKnowledgeSystem(KnowledgeConfig(db_path=":memory:"))
+        self.store = InteractionStore(
+            self.knowledge_system.db, "tester", self.knowledge_system.encode,
+            memory_retention=0.5, retention_period=100.0, max_interactions=5, flush_size=3
+        )
+
+    def test_batched_writes(self):
+        self.store.record(Interaction("first", "one", 1.0))
+        self.store.record(Interaction("second", "two", 1.0))
+        self.assertEqual(self.knowledge_system.db.get_interaction_count("tester"), 0)
+        self.store.record(Interaction("third", "three", 1.0))
+        self.assertEqual(self.knowledge_system.db.get_interaction_count("tester"), 3)
+
+    def test_recall_prefers_recent_matches(self):
+        now = time.time()
+        self.store.record(Interaction("bitcoin price today", "old answer", 1.0, timestamp=now - 1000))
+        self.store.record(Interaction("bitcoin price today", "new answer", 1.0, timestamp=now))
+        self.store.record(Interaction("weather forecast", "sunny", 1.0, timestamp=now))
+        recalled = self.store.recall("bitcoin price today", top_k=2, now=now)
+        self.assertEqual([interaction.agent_response for interaction, _ in recalled], ["new answer", "old answer"])
+        self.assertAlmostEqual(recalled[1][1] / recalled[0][1], 0.5 ** 10, places=5)
+
+    def test_recall_searches_unflushed_interactions(self):
+        texts = []
+        def encoder(batch):
+            texts.extend(batch)
+            return self.knowledge_system.encode(batch)
+        store = InteractionStore(self.knowledge_system.db, "buffered", encoder, flush_size=10)
+        store.record(Interaction("bitcoin price today", "stored answer", 1.0))
+        store.flush()
+        store.record(Interaction("weather forecast", "sunny", 1.0))
+        store.record(Interaction("bitcoin price today", "buffered answer", 1.0))
+
+        recalled = store.recall("weather forecast", top_k=3)
+        self.assertEqual(recalled[0][0].agent_response, "sunny")
+        self.assertEqual(len(recalled), 3)
+        self.assertEqual(self.knowledge_system.db.get_interaction_count("buffered"), 1)
+
+        # Inputs embedded for recall are reused by the next flush
+        del texts[:]
+        self.assertEqual(store.flush(), 2)
+        self.assertEqual(texts, [])
+        self.assertEqual(store.recall("weather forecast", top_k=1)[0][0].agent_response, "sunny")
+
+    def test_bounded_and_reloaded(self):
+        for i in range(12):
+            self.store.record(Interaction(f"question {i}", f"answer {i}", 1.0, timestamp=i))
+        self.store.flush()
+        self.assertEqual(self.knowledge_system.db.get_interaction_count("tester"), 5)
+        self.assertEqual(self.store.get_stats()["evictions"], 7)
+
+        reloaded = InteractionStore(self.knowledge_system.db, "tester", self.knowledge_system.encode, max_interactions=5)
+        recalled = reloaded.recall("question 11", top_k=1, now=12)
+        self.assertEqual(recalled[0][0].agent_response, "answer 11")
+        self.assertEqual(reloaded.get_stats()["stored"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
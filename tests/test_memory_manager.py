@@ -0,0 +1,40 @@
+# tests/test_memory_manager.py
+import unittest
+import numpy as np
+from gracie.core.memory_manager import MemoryManager
+
+class TestMemoryManager(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryManager(initial_capacity=2)
+        self.vectors = np.arange(12, dtype=np.float32).reshape(4, 3)
+        self.memory.add_embeddings(self.vectors, ["a", "b", "c", "d"])
+
+    def test_lookup_both_directions(self):
+        self.assertEqual(self.memory.get_row("c"), 2)
+        self.assertEqual(self.memory.get_topic_id(2), "c")
+        np.testing.assert_array_equal(self.memory.get_embedding("d"), self.vectors[3])
+
+    def test_update_keeps_row(self):
+        self.memory.update_embedding(np.ones(3, dtype=np.float32), "b")
+        self.assertEqual(self.memory.get_row("b"), 1)
+        np.testing.assert_array_equal(self.memory.get_embedding("b"), np.ones(3))
+        self.assertEqual(len(self.memory), 4)
+
+    def test_remove_and_compact(self):
+        self.memory.remove_embedding("b")
+        self.assertIsNone(self.memory.get_topic_id(1))
+        self.assertTrue(self.memory.needs_compaction)
+
+        mapping = self.memory.compact()
+        self.assertEqual(mapping.tolist(), [0, -1, 1, 2])
+        self.assertEqual(self.memory.get_topic_ids(), ["a", "c", "d"])
+        np.testing.assert_array_equal(self.memory.get_embedding("c"), self.vectors[2])
+
+    def test_float16_storage(self):
+        memory = MemoryManager(dtype="float16")
+        memory.add_embeddings(self.vectors, ["a", "b", "c", "d"])
+        self.assertEqual(memory.get_matrix().dtype, np.float16)
+        self.assertEqual(memory.get_usage_stats()["dtype"], "float16")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/test_metrics.py
+import asyncio
+import time
+import unittest
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.models.topic import Topic
+from gracie.utils.metrics import Histogram, SIZE_BUCKETS, StageMetrics
+from gracie.utils.profiler import SamplingProfiler
+
+class TestHistogram(unittest.TestCase):
+    def test_counts_and_percentiles(self):
+        histogram = Histogram("batch_size", SIZE_BUCKETS)
+        for value in range(1, 101):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["buckets"][8], 8)
+        self.assertEqual(snapshot["buckets"][128], 100)
+        self.assertAlmostEqual(snapshot["mean"], 50.5)
+        self.assertTrue(32 <= snapshot["p50"] <= 64)
+        self.assertLessEqual(snapshot["p99"], 100)
+
+    def test_empty(self):
+        histogram = Histogram("latency")
+        self.assertEqual(histogram.percentile(95), 0.0)
+        self.assertEqual(histogram.snapshot()["count"], 0)
+
+class TestStageMetrics(unittest.TestCase):
+    def test_span_records_latency_and_errors(self):
+        metrics = StageMetrics("test")
+        with metrics.span("encode"):
+            pass
+        with self.assertRaises(ValueError):
+            with metrics.span("encode"):
+                raise ValueError("boom")
+        metrics.error("db_fetch")
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["latency"]["encode"]["count"], 2)
+        self.assertEqual(snapshot["errors"], {"encode": 1, "db_fetch": 1})
+
+    def test_async_span_filtered_by_label(self):
+        metrics = StageMetrics("test")
+
+        async def generate():
+            async with metrics.span("generate", provider="a"):
+                await asyncio.sleep(0)
+            async with metrics.span("generate", provider="b"):
+                pass
+        asyncio.run(generate())
+        self.assertEqual(list(metrics.snapshot(provider="a")["latency"]), ["generate"])
+        self.assertEqual(len(metrics.snapshot()["latency"]), 2)
+
+    def test_prometheus_export(self):
+        metrics = StageMetrics("gracie_test")
+        with metrics.span("index_search"):
+            pass
+        metrics.error("index_search")
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE gracie_test_stage_seconds histogram", text)
+        self.assertIn('gracie_test_stage_seconds_bucket{stage="index_search",le="+Inf"} 1', text)
+        self.assertIn('gracie_test_stage_seconds_count{stage="index_search"} 1', text)
+        self.assertIn('gracie_test_errors_total{stage="index_search"} 1', text)
+
+    def test_knowledge_system_stages(self):
+        knowledge = GracieKnowledgeSystem(KnowledgeConfig(db_path=":memory:"))
+        knowledge.add_topic(Topic(name="ai", definition="Neural networks learn", facts=[]))
+        knowledge.add_topic(Topic(name="", definition="", facts=[]))
+        knowledge.get_relevant_knowledge("neural networks")
+        stats = knowledge.get_stats()["metrics"]
+        for stage in ("encode", "index_search", "lexical_search", "db_fetch", "retrieve"):
+            self.assertGreater(stats["latency"][stage]["count"], 0, stage)
+        self.assertEqual(stats["errors"]["validate"], 1)
+        self.assertIn('stage="retrieve"', knowledge.export_metrics())
+        knowledge.close()
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_start_and_stop_at_runtime(self):
+        profiler = SamplingProfiler(interval_ms=1)
+        self.assertTrue(profiler.start())
+        self.assertFalse(profiler.start())
+        deadline = time.time() + 0.1
+        while time.time() < deadline:
+            sum(range(1000))
+        self.assertTrue(profiler.stop())
+        self.assertFalse(profiler.running)
+        self.assertGreater(profiler.get_stats()["samples"], 0)
+        self.assertIn("test_start_and_stop_at_runtime", profiler.collapsed())
+
+if __name__ == '__main__':
+    unittest.main()
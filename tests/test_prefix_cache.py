@@ -0,0 +1,42 @@
+# tests/test_prefix_cache.py
+import unittest
+from gracie.llm.base import LLMConfig
+from gracie.llm.huggingface_provider import HuggingFaceProvider
+from gracie.llm.prefix_cache import PrefixCache
+
+class TestPrefixCache(unittest.TestCase):
+    def test_hits_count_saved_tokens(self):
+        cache = PrefixCache(max_bytes=1000)
+        key = PrefixCache.key("model", [1, 2, 3])
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "state", num_tokens=3, nbytes=100)
+        self.assertEqual(cache.get(key), "state")
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["saved_tokens"]), (1, 1, 3))
+
+    def test_key_depends_on_model_and_tokens(self):
+        self.assertNotEqual(PrefixCache.key("a", [1, 2]), PrefixCache.key("b", [1, 2]))
+        self.assertNotEqual(PrefixCache.key("a", [1, 2]), PrefixCache.key("a", [12]))
+
+    def test_evicts_least_recent_within_budget(self):
+        cache = PrefixCache(max_bytes=250)
+        keys = [PrefixCache.key("model", [i]) for i in range(3)]
+        cache.put(keys[0], "first", 1, 100)
+        cache.put(keys[1], "second", 1, 100)
+        cache.get(keys[0])
+        cache.put(keys[2], "third", 1, 100)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0]), "first")
+        self.assertLessEqual(cache.bytes, 250)
+        self.assertFalse(cache.put(PrefixCache.key("model", [9]), "huge", 1, 1000))
+
+class TestPrefixGroups(unittest.TestCase):
+    def test_coalesced_prompts_grouped_by_system_prompt(self):
+        contexts = [{"system_prompt": "a"}, None, {"system_prompt": "b"}, {"system_prompt": "a"}, {"system_prompt": ""}]
+        provider = HuggingFaceProvider(LLMConfig(provider="huggingface", model_name="test-model"))
+        self.assertEqual(provider._prefix_groups(contexts), [[0, 3], [1, 4], [2]])
+        provider.prefix_cache = None
+        self.assertEqual(provider._prefix_groups(contexts), [[0, 1, 2, 3, 4]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+# tests/test_request_coalescer.py
+import asyncio
+import unittest
+from gracie.llm.request_coalescer import RequestCoalescer
+
+class TestRequestCoalescer(unittest.TestCase):
+    def test_concurrent_calls_share_batches(self):
+        batches = []
+
+        async def handler(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        async def run():
+            coalescer = RequestCoalescer(handler, max_batch_size=4, max_wait_ms=10)
+            return await asyncio.gather(*(coalescer.submit(i) for i in range(10)))
+
+        self.assertEqual(asyncio.run(run()), [i * 2 for i in range(10)])
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+
+    def test_handler_error_reaches_every_caller(self):
+        async def handler(items):
+            raise RuntimeError("model unavailable")
+
+        async def run():
+            coalescer = RequestCoalescer(handler, max_wait_ms=1)
+            return await asyncio.gather(coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# tests/test_response_cache.py
+import time
+import unittest
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.llm.base import LLMConfig
+from gracie.llm.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.config = LLMConfig(provider="huggingface", model_name="test-model", temperature=0)
+
+    def test_exact_match_respects_context_and_config(self):
+        cache = ResponseCache()
+        cache.put(self.config, "What is AI?", "An answer", {"system_prompt": "Be brief"})
+        self.assertEqual(cache.get(self.config, "What is AI?", {"system_prompt": "Be brief"}), "An answer")
+        self.assertIsNone(cache.get(self.config, "What is AI?", {"system_prompt": "Be verbose"}))
+        other = LLMConfig(provider="huggingface", model_name="other-model", temperature=0)
+        self.assertIsNone(cache.get(other, "What is AI?", {"system_prompt": "Be brief"}))
+
+    def test_ttl_and_size_bound(self):
+        cache = ResponseCache(max_entries=2, ttl_seconds=0.05)
+        for prompt in ("one", "two", "three"):
+            cache.put(self.config, prompt, prompt.upper())
+        self.assertIsNone(cache.get(self.config, "one"))
+        self.assertEqual(cache.get(self.config, "three"), "THREE")
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(self.config, "three"))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+
+    def test_semantic_tier_reuses_near_duplicates(self):
+        knowledge_system = GracieKnowledgeSystem(KnowledgeConfig(db_path=":memory:"))
+        cache = ResponseCache(encoder=knowledge_system.encode, semantic_threshold=0.8)
+        cache.put(self.config, "how do neural networks learn from data", "Gradient descent")
+        self.assertEqual(cache.get(self.config, "how do neural networks learn from data ?"), "Gradient descent")
+        self.assertIsNone(cache.get(self.config, "bake bread with flour"))
+        self.assertEqual(cache.get_stats()["semantic_hits"], 1)
+
+    def test_sampling_providers_are_not_cached_by_default(self):
+        self.assertTrue(ResponseCache.cacheable(self.config))
+        self.assertFalse(ResponseCache.cacheable(LLMConfig(provider="openai", model_name="m", temperature=0.7)))
+        self.assertTrue(ResponseCache.cacheable(
+            LLMConfig(provider="openai", model_name="m", temperature=0.7, response_cache=True)
+        ))
+
+if __name__ == '__main__':
+    unittest.main()
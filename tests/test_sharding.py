@@ -0,0 +1,85 @@
+# tests/test_sharding.py
+import unittest
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.core.sharding import ShardedKnowledgeSystem, shard_for
+from gracie.models.topic import Topic
+
+class TestShardRouting(unittest.TestCase):
+    def test_adding_a_shard_moves_only_its_topics(self):
+        topic_ids = [f"topic-{i}" for i in range(1000)]
+        before = {topic_id: shard_for(topic_id, [0, 1, 2]) for topic_id in topic_ids}
+        after = {topic_id: shard_for(topic_id, [0, 1, 2, 3]) for topic_id in topic_ids}
+        moved = [topic_id for topic_id in topic_ids if before[topic_id] != after[topic_id]]
+        self.assertTrue(all(after[topic_id] == 3 for topic_id in moved))
+        self.assertLess(len(moved), 400)
+
+class TestShardedKnowledgeSystem(unittest.TestCase):
+    def setUp(self):
+        self.sharded = ShardedKnowledgeSystem(KnowledgeConfig(db_path=":memory:"), num_shards=2)
+        self.topics = [
+            Topic(name=f"topic_{i}", definition=f"subject{i} details{i}", facts=[]) for i in range(40)
+        ]
+        self.sharded.add_topics(self.topics)
+
+    def tearDown(self):
+        self.sharded.close()
+
+    def test_scatter_gather_retrieval(self):
+        stats = self.sharded.get_stats()
+        self.assertEqual(stats["total_topics"], 40)
+        self.assertTrue(all(shard["total_topics"] > 0 for shard in stats["shards"].values()))
+        results = self.sharded.get_relevant_knowledge("subject7 details7", top_k=3)
+        self.assertEqual(results[0].name, "topic_7")
+        self.assertEqual(len(results), 3)
+
+    def test_add_and_remove_shard_rebalances(self):
+        shard_id = self.sharded.add_shard()
+        stats = self.sharded.get_stats()
+        self.assertEqual(stats["total_topics"], 40)
+        self.assertGreater(stats["shards"][shard_id]["total_topics"], 0)
+
+        self.sharded.remove_shard(0)
+        stats = self.sharded.get_stats()
+        self.assertEqual(sorted(stats["shards"]), [1, shard_id])
+        self.assertEqual(stats["total_topics"], 40)
+        self.assertEqual(self.sharded.get_relevant_knowledge("subject12 details12", top_k=1)[0].name, "topic_12")
+
+    def test_names_unique_across_shards(self):
+        # Same name under fresh ids, which route to either shard
+        duplicates = [Topic(name="topic_3", definition=f"Another definition {i}", facts=[]) for i in range(6)]
+        result = self.sharded.add_topics(duplicates + [Topic(name="fresh", definition="New topic", facts=[])])
+        self.assertEqual(len(result.added), 1)
+        self.assertEqual(set(result.failed), {topic.id for topic in duplicates})
+        self.assertEqual(self.sharded.get_stats()["total_topics"], 41)
+
+        renamed = Topic(id=self.topics[8].id, name="topic_9", definition="subject8 details8", facts=[])
+        self.assertFalse(self.sharded.update_topic(renamed))
+        renamed.name = "topic_8_renamed"
+        self.assertTrue(self.sharded.update_topic(renamed))
+
+    def test_retrieval_matches_single_system(self):
+        config = KnowledgeConfig(db_path=":memory:", enable_faiss=False, max_contexts=3)
+        single = GracieKnowledgeSystem(config)
+        single.add_topics(self.topics)
+        sharded = ShardedKnowledgeSystem(config, num_shards=2)
+        try:
+            sharded.add_topics(self.topics)
+            queries = ["subject7 details7", "details12 subject12 subject3", "unrelated zebra"]
+            results = sharded.get_relevant_knowledge_batch(queries)
+            self.assertEqual(
+                [[topic.name for topic in row] for row in results],
+                [[topic.name for topic in row] for row in single.get_relevant_knowledge_batch(queries)]
+            )
+            self.assertEqual(results[0][0].name, "topic_7")
+            self.assertLessEqual(len(results[1]), 3)
+            self.assertEqual(results[2], [])
+        finally:
+            sharded.close()
+            single.close()
+
+    def test_delete_routes_to_owner(self):
+        self.assertTrue(self.sharded.delete_topic(self.topics[5].id))
+        self.assertEqual(self.sharded.get_stats()["total_topics"], 39)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# tests/test_vector_index.py
+import threading
+import unittest
+import faiss
+import numpy as np
+from gracie.core.knowledge_system import GracieKnowledgeSystem, KnowledgeConfig
+from gracie.core.vector_index import VectorIndex
+from gracie.models.topic import Topic
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((600, 16)).astype(np.float32)
+
+    def _index(self, index_type: str, **kwargs) -> VectorIndex:
+        added = []
+        source = lambda: (np.concatenate(added), None)
+        index = VectorIndex(16, index_type=index_type, vector_source=source, background_retrain=False, nlist=8, **kwargs)
+        index.added = added
+        return index
+
+    def _add(self, index: VectorIndex, vectors: np.ndarray):
+        start = sum(len(chunk) for chunk in index.added)
+        index.added.append(vectors)
+        index.add(vectors, np.arange(start, start + len(vectors)))
+
+    def test_index_type_selects_backend(self):
+        expected = {
+            "flat": faiss.IndexFlatL2,
+            "ivf_flat": faiss.IndexIVFFlat,
+            "ivf_pq": faiss.IndexIVFPQ,
+            "hnsw": faiss.IndexHNSWFlat
+        }
+        for index_type, backend in expected.items():
+            index = VectorIndex(16, index_type=index_type, nlist=8, pq_m=4, min_train_size=300)
+            index.rebuild(self.vectors)
+            self.assertIsInstance(index.index, backend)
+            _, ids = index.search(self.vectors[:1], 1)
+            self.assertEqual(ids[0][0], 0)
+        with self.assertRaises(ValueError):
+            VectorIndex(16, index_type="annoy")
+
+    def test_ivf_served_flat_until_trained(self):
+        index = self._index("ivf_flat", min_train_size=400)
+        self._add(index, self.vectors[:300])
+        self.assertFalse(index.is_trained)
+        self.assertEqual(index.search(self.vectors[5:6], 1)[1][0][0], 5)
+
+        self._add(index, self.vectors[300:])
+        self.assertTrue(index.is_trained)
+        self.assertEqual(index.ntotal, 600)
+        self.assertEqual(index.search(self.vectors[450:451], 1)[1][0][0], 450)
+
+    def test_min_train_size_covers_centroids(self):
+        # IVF-PQ trains 2 ** pq_nbits codewords, so fewer points cannot train it
+        index = self._index("ivf_pq", pq_m=4, min_train_size=200)
+        self.assertEqual(index.min_train_size, 256)
+        self._add(index, self.vectors[:208])
+        self.assertFalse(index.is_trained)
+        self._add(index, self.vectors[208:])
+        self.assertTrue(index.is_trained)
+
+    def test_searches_run_alongside_each_other_but_not_writes(self):
+        index = VectorIndex(16)
+        index.add(self.vectors[:100])
+        reading, release = threading.Event(), threading.Event()
+
+        def hold_read():
+            with index._lock.read():
+                reading.set()
+                release.wait(5)
+        reader = threading.Thread(target=hold_read)
+        reader.start()
+        reading.wait(5)
+
+        # A search is not blocked by another reader
+        self.assertEqual(index.search(self.vectors[3:4], 1)[1][0][0], 3)
+        writer = threading.Thread(target=index.add, args=(self.vectors[100:110],))
+        writer.start()
+        writer.join(0.2)
+        self.assertTrue(writer.is_alive())
+        release.set()
+        writer.join(5)
+        reader.join(5)
+        self.assertEqual(index.ntotal, 110)
+
+    def test_index_report(self):
+        config = KnowledgeConfig(db_path=":memory:", index_type="ivf_flat", nlist=4, min_train_size=100)
+        knowledge_system = GracieKnowledgeSystem(config)
+        knowledge_system.add_topics([
+            Topic(name=f"topic_{i}", definition=f"Definition {i} word{i % 17} term{i % 23}", facts=[])
+            for i in range(200)
+        ])
+        report = knowledge_system.index_report(k=5, num_queries=20)
+        self.assertEqual(report[0]["index_type"], "flat")
+        self.assertEqual(report[0]["recall@5"], 1.0)
+        self.assertEqual([row["nprobe"] for row in report[1:]], [1, 4, 16, 64])
+        self.assertTrue(all(row["trained"] for row in report[1:]))
+        self.assertGreaterEqual(report[-1]["recall@5"], report[1]["recall@5"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,279 @@
+# gracie/utils/ingest.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import IO, Any, Iterator, List, Optional, Set, Tuple
+from .logger import setup_logger
+from .validators import Validator
+from ..models.topic import DEFAULT_NAMESPACE, Topic
+
+READ_CHUNK_SIZE = 1 << 16
+
+# A JSON array element this large without parsing is treated as malformed instead of buffering further
+MAX_RECORD_SIZE = 1 << 24
+
+# Keys per IN query, below SQLite's bound parameter limit
+MAX_PARAMS = 900
+
+NON_WHITESPACE = re.compile(r'\S')
+
+@dataclass
+class IngestReport:
+    """Counts from one streaming ingestion run"""
+    read: int = 0
+    added: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    reject_path: Optional[str] = None
+    elapsed: float = 0.0
+
+def iter_records(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[str, Any, Optional[str]]]:
+    """
+    Yield (position, record, error) for each record of a JSON array or JSONL file.
+
+    The file is read incrementally, so memory is bounded by the largest
+    record. A file whose first character is ``[`` is parsed as one JSON
+    array, anything else as one JSON value per line. Malformed records
+    come back with an error and the raw text as the record; a malformed
+    array element ends the array, since the rest cannot be re-aligned.
+    """
+    with open(path, encoding="utf-8") as f:
+        head = f.read(chunk_size)
+        match = NON_WHITESPACE.search(head)
+        if match and head[match.start()] == "[":
+            yield from _iter_json_array(f, head, match.start() + 1, chunk_size)
+            return
+        f.seek(0)
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield f"line {number}", json.loads(line), None
+            except json.JSONDecodeError as e:
+                yield f"line {number}", line.strip(), f"Invalid JSON: {e.msg} at column {e.colno}"
+
+def _iter_json_array(f: IO[str], buffer: str, position: int, chunk_size: int) -> Iterator[Tuple[str, Any, Optional[str]]]:
+    decoder = json.JSONDecoder()
+    index, expect_value, eof = 0, True, False
+    while True:
+        match = NON_WHITESPACE.search(buffer, position)
+        if match is None:
+            data = "" if eof else f.read(chunk_size)
+            if not data:
+                yield f"item {index}", buffer[position:position + 200], "Unterminated JSON array"
+                return
+            buffer, position = buffer[position:] + data, 0
+            continue
+        position = match.start()
+        char = buffer[position]
+        if char == "]" and (index == 0 or not expect_value):
+            return
+        if not expect_value:
+            if char != ",":
+                yield f"item {index}", buffer[position:position + 200], f"Expected ',' or ']', got {char!r}"
+                return
+            position += 1
+            expect_value = True
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+            # A number or literal that ends the buffer may continue in the next chunk
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError as e:
+            if eof or len(buffer) - position > MAX_RECORD_SIZE:
+                yield f"item {index}", buffer[position:position + 200], f"Invalid JSON: {e.msg}"
+                return
+            complete = False
+        if not complete:
+            data = f.read(chunk_size)
+            eof = not data
+            buffer, position = buffer[position:] + data, 0
+            continue
+        yield f"item {index}", record, None
+        index += 1
+        position = end
+        expect_value = False
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+class _SeenKeys:
+    """Dedup keys of accepted records, kept in SQLite so memory does not grow with the input"""
+    def __init__(self, path: Optional[str] = None):
+        self.temporary = path is None
+        if self.temporary:
+            fd, path = tempfile.mkstemp(suffix=".dedup.db")
+            os.close(fd)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def existing(self, keys: List[bytes]) -> Set[bytes]:
+        found = set()
+        for start in range(0, len(keys), MAX_PARAMS):
+            chunk = keys[start:start + MAX_PARAMS]
+            rows = self.conn.execute(f"SELECT key FROM seen WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(key for key, in rows)
+        return found
+
+    def add(self, keys: List[bytes]):
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen (key) VALUES (?)", [(key,) for key in keys])
+
+    def close(self):
+        self.conn.close()
+        if self.temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+def _key(kind: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{kind}\0{Validator.normalize_key(text)}".encode("utf-8"), digest_size=16).digest()
+
+class IngestPipeline:
+    """
+    Streams topic records from JSON or JSONL files into a knowledge system.
+
+    Records are parsed incrementally, validated and cleaned with
+    ``Validator``, and deduplicated by normalized name and by a hash of
+    the normalized definition before anything is encoded. Keys of
+    accepted records are kept in a SQLite table rather than in memory,
+    and topics reach the knowledge system one batch at a time, so memory
+    use does not depend on the size of the file. Rejected and duplicate
+    records are written with their reason to a JSONL side file.
+    """
+    def __init__(
+        self,
+        knowledge,
+        batch_size: Optional[int] = None,
+        reject_path: Optional[str] = None,
+        dedup_path: Optional[str] = None,
+        namespace: Optional[str] = None,
+        log_interval: int = 10000
+    ):
+        """
+        Args:
+            knowledge: GracieKnowledgeSystem (or anything with ``add_topics``) to ingest into
+            batch_size (int): Topics per add_topics call, defaults to the knowledge
+                system's ingest_batch_size
+            reject_path (str): JSONL file for rejected records, defaults to
+                "<input>.rejects.jsonl"
+            dedup_path (str): SQLite file of dedup keys; pass the same file to
+                later runs to skip records ingested before. A temporary file is
+                used when None
+            namespace (str): Namespace for records that do not name one
+            log_interval (int): Records between progress log lines
+        """
+        self.knowledge = knowledge
+        config = getattr(knowledge, "config", None)
+        self.batch_size = batch_size or getattr(config, "ingest_batch_size", 256)
+        self.reject_path = reject_path
+        self.dedup_path = dedup_path
+        self.namespace = namespace or DEFAULT_NAMESPACE
+        self.log_interval = log_interval
+        self.logger = setup_logger("IngestPipeline")
+
+    def run(self, path: str) -> IngestReport:
+        """
+        Ingest every record of a JSON or JSONL file.
+
+        Args:
+            path (str): Input file
+
+        Returns:
+            IngestReport: Counts of records read, added, duplicated and rejected
+        """
+        started = time.perf_counter()
+        report = IngestReport(reject_path=self.reject_path or f"{path}.rejects.jsonl")
+        seen = _SeenKeys(self.dedup_path)
+        try:
+            with open(report.reject_path, "w", encoding="utf-8") as rejects:
+                pending: List[Tuple[str, Any, Topic]] = []
+                for position, record, error in iter_records(path):
+                    report.read += 1
+                    error = error or Validator.topic_error(record)
+                    if error:
+                        self._reject(rejects, report, position, record, error)
+                    else:
+                        pending.append((position, record, self._to_topic(record)))
+                    if len(pending) >= self.batch_size:
+                        self._flush(pending, seen, rejects, report)
+                        pending = []
+                    if report.read % self.log_interval == 0:
+                        self.logger.info(
+                            f"Read {report.read} records: {report.added} added, "
+                            f"{report.duplicates} duplicates, {report.rejected} rejected"
+                        )
+                self._flush(pending, seen, rejects, report)
+        finally:
+            seen.close()
+
+        if not report.rejected and not report.duplicates:
+            os.remove(report.reject_path)
+            report.reject_path = None
+        report.elapsed = time.perf_counter() - started
+        self.logger.info(
+            f"Ingested {path}: {report.added} of {report.read} records added, "
+            f"{report.duplicates} duplicates, {report.rejected} rejected in {report.elapsed:.1f}s"
+        )
+        return report
+
+    def _to_topic(self, record: dict) -> Topic:
+        return Topic(
+            id=record["id"] if isinstance(record.get("id"), str) else None,
+            name=Validator.clean_text(record["name"]),
+            definition=Validator.clean_text(record["definition"]),
+            facts=Validator.clean_facts(record.get("facts") or []),
+            confidence=float(record.get("confidence") or 0.0),
+            namespace=record.get("namespace") or self.namespace
+        )
+
+    def _flush(self, pending: List[Tuple[str, Any, Topic]], seen: _SeenKeys, rejects: IO[str], report: IngestReport):
+        """Drop duplicates from a batch, then hand the rest to the knowledge system."""
+        if not pending:
+            return
+        keys = [(_key("name", topic.name), _key("definition", topic.definition)) for _, _, topic in pending]
+        known = seen.existing([key for pair in keys for key in pair])
+        db = getattr(self.knowledge, "db", None)
+        stored_names = db.get_existing_names([topic.name for _, _, topic in pending]) if db is not None else set()
+
+        accepted, batch_keys = [], set()
+        for (position, record, topic), (name_key, definition_key) in zip(pending, keys):
+            if topic.name in stored_names:
+                reason = "Topic name already stored"
+            elif name_key in known or name_key in batch_keys:
+                reason = "Duplicate name"
+            elif definition_key in known or definition_key in batch_keys:
+                reason = "Duplicate definition"
+            else:
+                batch_keys.update((name_key, definition_key))
+                accepted.append((position, record, topic, name_key, definition_key))
+                continue
+            report.duplicates += 1
+            self._write_reject(rejects, position, record, reason)
+        if not accepted:
+            return
+
+        result = self.knowledge.add_topics([topic for _, _, topic, _, _ in accepted], batch_size=len(accepted))
+        added_keys = []
+        for position, record, topic, name_key, definition_key in accepted:
+            if topic.id in result.failed:
+                self._reject(rejects, report, position, record, result.failed[topic.id])
+            else:
+                added_keys.extend((name_key, definition_key))
+        report.added += len(result.added)
+        seen.add(added_keys)
+
+    def _reject(self, rejects: IO[str], report: IngestReport, position: str, record: Any, reason: str):
+        report.rejected += 1
+        self._write_reject(rejects, position, record, reason)
+
+    @staticmethod
+    def _write_reject(rejects: IO[str], position: str, record: Any, reason: str):
+        rejects.write(json.dumps({"position": position, "reason": reason, "record": record}, ensure_ascii=False, default=str))
+        rejects.write("\n")
@@ -0,0 +1,40 @@
+# gracie/utils/lazy.py
+import importlib
+import sys
+import threading
+from typing import Any
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Lets heavy dependencies (faiss, torch, transformers) be referenced at
+    module level without paying their import cost in processes that never
+    use them.
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy that imports the named module when first used"""
+    return LazyModule(name)
+
+def is_imported(name: str) -> bool:
+    """Whether a module has actually been imported in this process"""
+    return name in sys.modules
@@ -0,0 +1,61 @@
+# gracie/utils/locks.py
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+class ReadWriteLock:
+    """
+    Lets any number of readers hold the lock together, or one writer alone.
+
+    Waiting writers go ahead of new readers so a steady stream of reads
+    cannot starve them. The writing thread may re-enter the lock for
+    writing or reading; a reader must not try to upgrade to a writer.
+    """
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        nested = False
+        with self._condition:
+            if self._writer == threading.get_ident():
+                nested = True
+            else:
+                while self._writer is not None or self._writers_waiting:
+                    self._condition.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            if not nested:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                self._writers_waiting += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._writers_waiting -= 1
+                self._writer, self._writer_depth = me, 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._condition.notify_all()
@@ -0,0 +1,253 @@
+# gracie/utils/metrics.py
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds, from 100us to 10s
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram.
+
+    Each bucket counts observations less than or equal to its upper bound;
+    larger values land in a final overflow bucket. Percentiles are
+    estimated by interpolating within the bucket that contains them.
+    """
+    def __init__(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._count += 1
+            self._sum += value
+            self._min = value if self._min is None else min(self._min, value)
+            self._max = value if self._max is None else max(self._max, value)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100) from the bucket counts."""
+        with self._lock:
+            if not self._count:
+                return 0.0
+            target = q / 100 * self._count
+            seen = 0
+            for i, count in enumerate(self._counts):
+                if count and seen + count >= target:
+                    lower = self.buckets[i - 1] if i > 0 else self._min
+                    upper = self.buckets[i] if i < len(self.buckets) else self._max
+                    lower, upper = max(lower, self._min), min(upper, self._max)
+                    return lower + (upper - lower) * (target - seen) / count
+                seen += count
+            return self._max
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._min = self._max = None
+
+    def snapshot(self) -> Dict:
+        """Summary statistics and cumulative bucket counts."""
+        cumulative: List[int] = []
+        with self._lock:
+            total = 0
+            for count in self._counts[:-1]:
+                total += count
+                cumulative.append(total)
+            summary = {
+                "count": self._count,
+                "sum": self._sum,
+                "min": self._min or 0.0,
+                "max": self._max or 0.0,
+                "buckets": dict(zip(self.buckets, cumulative))
+            }
+        summary.update({
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99)
+        })
+        return summary
+
+class Counter:
+    """Thread-safe monotonically increasing count."""
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._value = 0
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+class _Span:
+    """Times one stage; usable with ``with`` and ``async with``."""
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics: "StageMetrics", key: LabelKey):
+        self.metrics = metrics
+        self.key = key
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A generator closed early by its consumer has not failed
+        failed = exc_type is not None and not issubclass(exc_type, GeneratorExit)
+        self.metrics._finish(self.key, time.perf_counter() - self.start, failed)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+class StageMetrics:
+    """
+    Latency histograms and error counters per pipeline stage.
+
+    ``span(stage)`` times a block into the stage's histogram and counts it
+    as an error if an exception escapes; ``error(stage)`` counts failures
+    that are handled without raising. Stages may carry labels such as a
+    provider name. Snapshots feed ``get_stats`` and ``to_prometheus``
+    renders the Prometheus text exposition format, which OpenTelemetry
+    collectors can scrape as well.
+    """
+    def __init__(self, namespace: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.enabled = True
+        self._latency: Dict[LabelKey, Histogram] = {}
+        self._errors: Dict[LabelKey, Counter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(stage: str, labels: Dict[str, str]) -> LabelKey:
+        return stage, tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def span(self, stage: str, **labels) -> _Span:
+        return _Span(self, self._key(stage, labels))
+
+    def _finish(self, key: LabelKey, seconds: float, failed: bool):
+        if not self.enabled:
+            return
+        self._histogram(key).observe(seconds)
+        if failed:
+            self._counter(key).inc()
+
+    def observe(self, stage: str, seconds: float, **labels):
+        """Record a duration measured outside a span, such as time to first token."""
+        if self.enabled:
+            self._histogram(self._key(stage, labels)).observe(seconds)
+
+    def error(self, stage: str, **labels):
+        """Count a failure in stage that was handled rather than raised."""
+        if self.enabled:
+            self._counter(self._key(stage, labels)).inc()
+
+    def _histogram(self, key: LabelKey) -> Histogram:
+        histogram = self._latency.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._latency.setdefault(key, Histogram(f"{self.namespace}.{key[0]}", self.buckets))
+        return histogram
+
+    def _counter(self, key: LabelKey) -> Counter:
+        counter = self._errors.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._errors.setdefault(key, Counter(f"{self.namespace}.{key[0]}.errors"))
+        return counter
+
+    @staticmethod
+    def _matches(key: LabelKey, labels: Dict[str, str]) -> bool:
+        present = dict(key[1])
+        return all(present.get(name) == str(value) for name, value in labels.items())
+
+    @staticmethod
+    def _label_name(key: LabelKey, labels: Dict[str, str]) -> str:
+        extra = [f"{name}={value}" for name, value in key[1] if name not in labels]
+        return f"{key[0]}{{{','.join(extra)}}}" if extra else key[0]
+
+    def snapshot(self, **labels) -> Dict:
+        """Latency summaries (in seconds) and error counts by stage, optionally only those with the given labels."""
+        latency = {
+            self._label_name(key, labels): histogram.snapshot()
+            for key, histogram in list(self._latency.items()) if self._matches(key, labels)
+        }
+        errors = {
+            self._label_name(key, labels): counter.value
+            for key, counter in list(self._errors.items()) if self._matches(key, labels)
+        }
+        return {"latency": latency, "errors": errors}
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._errors.clear()
+
+    def to_prometheus(self) -> str:
+        lines = []
+        name = f"{self.namespace}_stage_seconds"
+        if self._latency:
+            lines += [f"# HELP {name} Time spent per stage.", f"# TYPE {name} histogram"]
+        for (stage, labels), histogram in sorted(self._latency.items()):
+            snapshot = histogram.snapshot()
+            labels = (("stage", stage),) + labels
+            for bound, count in snapshot["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(float(bound))),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {snapshot['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+
+        name = f"{self.namespace}_errors_total"
+        if self._errors:
+            lines += [f"# HELP {name} Failures per stage.", f"# TYPE {name} counter"]
+        for (stage, labels), counter in sorted(self._errors.items()):
+            lines.append(f"{name}{_format_labels((('stage', stage),) + labels)} {counter.value}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+def prometheus_text(*metrics: Optional[StageMetrics]) -> str:
+    """Concatenate the Prometheus exposition of several StageMetrics, skipping None."""
+    return "".join(item.to_prometheus() for item in metrics if item is not None)
@@ -0,0 +1,139 @@
+# gracie/utils/profiler.py
+import collections
+import signal
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .logger import setup_logger
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples every thread's stack on an interval.
+
+    Sampling runs in a daemon thread reading ``sys._current_frames``, so
+    the profiled code is not instrumented and the profiler can be started
+    and stopped at any time in a running process. Stacks are aggregated in
+    collapsed ``frame;frame;frame count`` form, which flame graph tools
+    read directly.
+    """
+    def __init__(self, interval_ms: float = 5.0, max_depth: int = 64):
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.logger = setup_logger("SamplingProfiler")
+        self._stacks: "collections.Counter[Tuple[str, ...]]" = collections.Counter()
+        self._samples = 0
+        self._started_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval_ms: Optional[float] = None) -> bool:
+        """Begin sampling; returns False if already running."""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            if interval_ms is not None:
+                self.interval = interval_ms / 1000
+            self._stop.clear()
+            self._started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+            self._thread.start()
+        self.logger.info(f"Sampling profiler started at {self.interval * 1000:g} ms")
+        return True
+
+    def stop(self) -> bool:
+        """Stop sampling, keeping collected stacks; returns False if not running."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return False
+        self._stop.set()
+        thread.join()
+        self.logger.info(f"Sampling profiler stopped after {self._samples} samples")
+        return True
+
+    def toggle(self) -> bool:
+        """Start if stopped, stop if running; returns whether it is now running."""
+        if not self.stop():
+            self.start()
+        return self.running
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            sampled = []
+            for thread_id, frame in frames.items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename}:{code.co_name}")
+                    frame = frame.f_back
+                sampled.append(tuple(reversed(stack)))
+            with self._lock:
+                self._stacks.update(sampled)
+                self._samples += 1
+
+    def top(self, limit: int = 20) -> List[Dict]:
+        """Functions by the share of samples in which they were executing (self time)."""
+        leaf: "collections.Counter[str]" = collections.Counter()
+        with self._lock:
+            total = sum(self._stacks.values())
+            for stack, count in self._stacks.items():
+                if stack:
+                    leaf[stack[-1]] += count
+        return [
+            {"function": function, "samples": count, "share": count / total}
+            for function, count in leaf.most_common(limit)
+        ]
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format for flame graph tools."""
+        with self._lock:
+            return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self._stacks.most_common())
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+    def install_signal_toggle(self, signum: int = getattr(signal, "SIGUSR2", 0), dump_path: Optional[str] = None):
+        """
+        Toggle sampling when the process receives signum.
+
+        Lets an operator profile a running service without a restart; when
+        sampling stops, stacks are written to dump_path if one is given.
+        Must be called from the main thread.
+        """
+        def handle(received, frame):
+            # Joining the sampler inside a signal handler could stall the main thread
+            threading.Thread(target=self._toggle_and_dump, args=(dump_path,), daemon=True).start()
+        signal.signal(signum, handle)
+
+    def _toggle_and_dump(self, dump_path: Optional[str]):
+        if not self.toggle() and dump_path:
+            self.dump(dump_path)
+            self.logger.info(f"Wrote profile to {dump_path}")
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self._samples,
+            "started_at": self._started_at,
+            "top": self.top(10)
+        }
+
+# Process-wide profiler, off until started
+profiler = SamplingProfiler()
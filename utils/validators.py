@@ -1,7 +1,12 @@
 # gracie/utils/validators.py
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import re
 
+# Compiled once; sanitize_input runs per record during bulk ingestion
+SPECIAL_CHARACTERS = re.compile(r'[^\w\s\-\.]')
+WHITESPACE = re.compile(r'\s+')
+CONTROL_CHARACTERS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
 class Validator:
     """Validation utilities"""
     @staticmethod
@@ -9,18 +14,54 @@ class Validator:
         """Validate topic data"""
         required_fields = ['name', 'definition']
         return all(field in topic_data for field in required_fields)
-    
+
+    @staticmethod
+    def topic_error(topic_data: Any) -> Optional[str]:
+        """Why a topic record cannot be ingested, or None if it can"""
+        if not isinstance(topic_data, dict):
+            return f"Expected an object, got {type(topic_data).__name__}"
+        if not Validator.validate_topic(topic_data):
+            return "Missing name or definition"
+        for field in ('name', 'definition'):
+            if not Validator.validate_embedding_input(topic_data[field]):
+                return f"Field '{field}' must be a non-empty string"
+        facts = topic_data.get('facts') or []
+        if not isinstance(facts, list) or not all(isinstance(fact, str) for fact in facts):
+            return "Field 'facts' must be a list of strings"
+        confidence = topic_data.get('confidence') or 0.0
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+            return "Field 'confidence' must be a number"
+        namespace = topic_data.get('namespace')
+        if namespace is not None and not Validator.validate_embedding_input(namespace):
+            return "Field 'namespace' must be a non-empty string"
+        return None
+
     @staticmethod
     def validate_embedding_input(text: str) -> bool:
         """Validate text for embedding generation"""
         if not text or not isinstance(text, str):
             return False
         return len(text.strip()) > 0
-        
+
     @staticmethod
     def sanitize_input(text: str) -> str:
         """Sanitize input text"""
         # Remove special characters
-        text = re.sub(r'[^\w\s\-\.]', '', text)
+        text = SPECIAL_CHARACTERS.sub('', text)
         # Remove extra whitespace
         return ' '.join(text.split())
+
+    @staticmethod
+    def clean_text(text: str) -> str:
+        """Strip control characters and collapse whitespace, keeping punctuation"""
+        return WHITESPACE.sub(' ', CONTROL_CHARACTERS.sub('', text)).strip()
+
+    @staticmethod
+    def normalize_key(text: str) -> str:
+        """Case- and whitespace-insensitive form of text for duplicate detection; punctuation is kept so "C++" and "C" differ"""
+        return ' '.join(text.casefold().split())
+
+    @staticmethod
+    def clean_facts(facts: List[str]) -> List[str]:
+        """Cleaned facts with empty ones dropped"""
+        return [fact for fact in map(Validator.clean_text, facts) if fact]